@@ -247,6 +247,74 @@ class OpenSearchClusterSettings(BaseModel):
         return self
 
 
+class OpenSearchVectorIndexConfig(BaseModel):
+    """
+    kNN layout of the embedding fields in the media index.
+
+    The defaults reproduce the original nmslib/float32 mapping. Setting
+    engine="faiss" with quantization="fp16" halves vector memory; faiss on
+    OpenSearch 2.15 needs space_type "innerproduct" (or "l2"). Those layouts
+    rank like cosine only for unit-length vectors, so pipelines deployed with
+    them store L2-normalised embeddings (see normalize_embeddings).
+    """
+
+    engine: str = "nmslib"
+    space_type: str = "cosinesimil"
+    quantization: str = "none"
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+    ef_search: Optional[int] = None
+
+    @field_validator("engine")
+    @classmethod
+    def validate_engine(cls, v):
+        if v not in ("nmslib", "faiss", "lucene"):
+            raise ValueError("engine must be one of: nmslib, faiss, lucene")
+        return v
+
+    @field_validator("quantization")
+    @classmethod
+    def validate_quantization(cls, v):
+        if v not in ("none", "fp16"):
+            raise ValueError("quantization must be one of: none, fp16")
+        return v
+
+    @model_validator(mode="after")
+    def check_engine_options(self):
+        if self.quantization != "none" and self.engine != "faiss":
+            raise ValueError("quantization requires engine 'faiss'")
+        if self.engine == "faiss" and self.space_type == "cosinesimil":
+            raise ValueError(
+                "faiss does not support cosinesimil on this OpenSearch version; "
+                "use innerproduct with normalised embeddings"
+            )
+        return self
+
+    @property
+    def normalize_embeddings(self) -> bool:
+        """Whether embedding nodes must L2-normalise vectors before storing."""
+        return self.engine == "faiss" or self.space_type == "innerproduct"
+
+
+class StepProfileConfig(BaseModel):
+    """
+    Opt-in profiling of pipeline steps (lambdas/common_libraries/step_profiler.py),
+    passed to every node function a pipeline deploys. ``pipelines`` is a list of
+    pipeline names ("*" for all); ``sample_rate`` the share of their
+    invocations that are profiled.
+    """
+
+    pipelines: List[str] = Field(default_factory=list)
+    sample_rate: float = 0.0
+
+    @field_validator("sample_rate")
+    @classmethod
+    def validate_sample_rate(cls, v):
+        if not 0 <= v <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        return v
+
+
 class UserConfig(BaseModel):
     email: str
     first_name: str
@@ -449,6 +517,10 @@ class CDKConfig(BaseModel):
     opensearch_cluster_settings: Optional[OpenSearchClusterSettings] = (
         None  # Can override presets
     )
+    opensearch_vector_index: OpenSearchVectorIndexConfig = Field(
+        default_factory=OpenSearchVectorIndexConfig
+    )
+    step_profile: StepProfileConfig = Field(default_factory=StepProfileConfig)
     authZ: AuthConfig = AuthConfig()
     vpc: VpcConfig = Field(default_factory=VpcConfig)
     db: DatabaseConfig = Field(default_factory=DatabaseConfig)
@@ -14,7 +14,7 @@ import os
 from decimal import Decimal
 from http import HTTPStatus
 from typing import Any, Dict
-from urllib.parse import urlparse
+from urllib.parse import quote, urlparse
 
 import boto3
 from aws_lambda_powertools import Logger, Metrics, Tracer
@@ -26,6 +26,7 @@ from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from botocore.exceptions import ClientError
 from pydantic import BaseModel, Field
+from representation_files import representation_keys
 
 # ── Powertools ───────────────────────────────────────────────────────────────
 logger = Logger(service="asset-deletion-service")
@@ -40,6 +41,7 @@ table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
 # ── OpenSearch settings ──────────────────────────────────────────────────────
 OPENSEARCH_ENDPOINT = os.getenv("OPENSEARCH_ENDPOINT", "")
 INDEX_NAME = os.getenv("INDEX_NAME", "media")
+CLIP_INDEX_NAME = os.getenv("CLIP_INDEX_NAME") or f"{INDEX_NAME}-clips"
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 OPENSEARCH_SERVICE = os.getenv("OPENSEARCH_SERVICE", "es")  # "es" for both ES & OS
 
@@ -169,13 +171,14 @@ def delete_s3_objects(asset: Dict[str, Any]) -> None:
 
         # Derived
         for rep in asset.get("DerivedRepresentations", []):
-            pl = rep.get("StorageInfo", {}).get("PrimaryLocation")
-            if not pl:
+            bucket, keys = representation_keys(rep)
+            if not keys:
                 continue
-            s3.delete_object(Bucket=pl["Bucket"], Key=pl["ObjectKey"]["FullPath"])
+            for key in keys:
+                s3.delete_object(Bucket=bucket, Key=key)
             logger.info(
                 "Deleted derived representation",
-                extra={"bucket": pl["Bucket"], "key": pl["ObjectKey"]["FullPath"]},
+                extra={"bucket": bucket, "key": keys[0], "objects": len(keys)},
             )
 
         # Transcript files
@@ -211,34 +214,42 @@ def delete_opensearch_docs(asset: Dict[str, Any]) -> None:
 
     query = {"query": {"term": {"DigitalSourceAsset.ID": dsa_id}}}
 
-    url = f"https://{host}/{INDEX_NAME}/_delete_by_query?refresh=true&conflicts=proceed"
-    logger.info(
-        "Executing _delete_by_query",
-        extra={"url": url, "query": query, "dsa_id": dsa_id},
-    )
-
-    status, body = _signed_request(
-        "POST",
-        url,
-        _credentials,
-        OPENSEARCH_SERVICE,
-        AWS_REGION,
-        payload=query,
-        timeout=60,
-    )
+    # Asset docs in the media index, clip docs on their routed shard
+    base_qs = "refresh=true&conflicts=proceed&ignore_unavailable=true"
+    deleted = 0
+    for url in (
+        f"https://{host}/{INDEX_NAME}/_delete_by_query?{base_qs}",
+        f"https://{host}/{CLIP_INDEX_NAME}/_delete_by_query?{base_qs}"
+        f"&routing={quote(dsa_id, safe='')}",
+    ):
+        logger.info(
+            "Executing _delete_by_query",
+            extra={"url": url, "query": query, "dsa_id": dsa_id},
+        )
 
-    if status not in (200, 202):
-        logger.error(
-            "OpenSearch deletion failed",
-            extra={"status": status, "body": body, "dsa_id": dsa_id},
+        status, body = _signed_request(
+            "POST",
+            url,
+            _credentials,
+            OPENSEARCH_SERVICE,
+            AWS_REGION,
+            payload=query,
+            timeout=60,
         )
-        raise AssetDeletionError(f"Failed to delete OpenSearch docs (status {status})")
 
-    deleted = 0
-    try:
-        deleted = json.loads(body).get("deleted", 0)
-    except (ValueError, AttributeError):
-        pass
+        if status not in (200, 202):
+            logger.error(
+                "OpenSearch deletion failed",
+                extra={"status": status, "body": body, "dsa_id": dsa_id},
+            )
+            raise AssetDeletionError(
+                f"Failed to delete OpenSearch docs (status {status})"
+            )
+
+        try:
+            deleted += json.loads(body).get("deleted", 0)
+        except (ValueError, AttributeError):
+            pass
 
     logger.info(
         "OpenSearch deletion complete",
@@ -30,6 +30,7 @@ from opensearchpy import (
     RequestsAWSV4SignerAuth,
     RequestsHttpConnection,
 )
+from rendition_negotiation import accepted_formats, pick_representation
 from utils import generate_presigned_url, replace_binary_data
 
 # Initialize AWS Lambda Powertools
@@ -41,6 +42,9 @@ metrics = Metrics(namespace="AssetDetailsService", service="asset-details-servic
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
 
+# Representations written by the video_sprites node
+SPRITE_PURPOSES = ("spriteSheet", "scrubSheet", "spriteIndex")
+
 
 # Initialize OpenSearch client
 def get_opensearch_client() -> OpenSearch:
@@ -198,7 +202,10 @@ def lambda_handler(
         asset_data = get_asset_details(asset_id)
 
         # Add any additional metadata or computed fields
-        enriched_asset = enrich_asset_data(asset_data)
+        accepted = accepted_formats(
+            event.get("headers"), event.get("queryStringParameters")
+        )
+        enriched_asset = enrich_asset_data(asset_data, accepted)
         print(enriched_asset)
 
         return create_response(
@@ -223,15 +230,41 @@ def lambda_handler(
         )
 
 
-def get_url_for_purpose(asset, purpose):
-    for rep in asset.get("DerivedRepresentations", []):
-        if rep.get("Purpose") == purpose:
-            storage = rep.get("StorageInfo", {}).get("PrimaryLocation", {})
-            if storage.get("StorageType") == "s3":
-                return generate_presigned_url(
-                    bucket=storage["Bucket"], key=storage["ObjectKey"]["FullPath"]
-                )
-    return None
+def get_url_for_purpose(asset, purpose, accepted=frozenset()):
+    """
+    Presign the smallest representation of *purpose* the client accepts and
+    move it ahead of the other formats of that purpose (clients take the
+    first match). Returns the URL, or None.
+    """
+    reps = asset.get("DerivedRepresentations", [])
+    chosen = pick_representation(reps, purpose, accepted)
+    if chosen is None:
+        return None
+    storage = chosen["StorageInfo"]["PrimaryLocation"]
+    chosen["URL"] = generate_presigned_url(
+        bucket=storage["Bucket"], key=storage["ObjectKey"]["FullPath"]
+    )
+    first = next(i for i, rep in enumerate(reps) if rep.get("Purpose") == purpose)
+    reps.remove(chosen)
+    reps.insert(first, chosen)
+    return chosen["URL"]
+
+
+def presign_hls(rep: Dict[str, Any]) -> None:
+    """
+    Presign the master playlist (``URL``) and every file of the ladder
+    (``URLs``, keyed by path relative to the master). Playlists reference
+    their files relatively, which a presigned master cannot authorise, so the
+    player maps each resolved request onto ``URLs`` (e.g. hls.js xhrSetup).
+    """
+    storage = rep["StorageInfo"]["PrimaryLocation"]
+    master = storage["ObjectKey"]["FullPath"]
+    prefix = master.rsplit("/", 1)[0]
+    rep["URL"] = generate_presigned_url(bucket=storage["Bucket"], key=master)
+    rep["URLs"] = {
+        name: generate_presigned_url(bucket=storage["Bucket"], key=f"{prefix}/{name}")
+        for name in rep.get("HlsSpec", {}).get("Files", [])
+    }
 
 
 @tracer.capture_method
@@ -247,13 +280,17 @@ def get_asset_clips(asset_id: str) -> List[Dict[str, Any]]:
     """
     try:
         client = get_opensearch_client()
-        index_name = os.environ["OPENSEARCH_INDEX"]
+        # Clips live in their own index behind the "-clips" alias; until
+        # migrate_clip_index.py has run they are still in the media index, so
+        # query both (and without routing: media-index clips are not routed)
+        media_index = os.environ["OPENSEARCH_INDEX"]
+        clip_index = os.environ.get("OPENSEARCH_CLIP_INDEX", f"{media_index}-clips")
 
         # Query for clips associated with this asset
         query = {
             "query": {
                 "bool": {
-                    "must": [
+                    "filter": [
                         {"term": {"DigitalSourceAsset.ID": asset_id}},
                         {"term": {"embedding_scope": "clip"}},
                     ]
@@ -264,7 +301,11 @@ def get_asset_clips(asset_id: str) -> List[Dict[str, Any]]:
             "sort": [{"start_timecode": {"order": "asc"}}],  # Sort by start time
         }
 
-        response = client.search(body=query, index=index_name)
+        response = client.search(
+            body=query,
+            index=f"{media_index},{clip_index}",
+            ignore_unavailable=True,
+        )
 
         clips = []
         for hit in response["hits"]["hits"]:
@@ -296,18 +337,24 @@ def get_asset_clips(asset_id: str) -> List[Dict[str, Any]]:
 
 
 @tracer.capture_method
-def enrich_asset_data(asset: Dict[str, Any]) -> Dict[str, Any]:
+def enrich_asset_data(
+    asset: Dict[str, Any], accepted: frozenset = frozenset()
+) -> Dict[str, Any]:
     """Enrich asset data with additional computed fields and handle binary data."""
     try:
-        thumbnail_url = get_url_for_purpose(asset, "thumbnail")
-        proxy_url = get_url_for_purpose(asset, "proxy")
-
-        # Add URLs to their respective DerivedRepresentations
+        # Add URLs to the representation chosen for each purpose
+        for purpose in ("thumbnail", "proxy"):
+            get_url_for_purpose(asset, purpose, accepted)
+        # The HLS ladder and the sprite set are used whole: presign every file
         for rep in asset.get("DerivedRepresentations", []):
-            if rep.get("Purpose") == "thumbnail" and thumbnail_url:
-                rep["URL"] = thumbnail_url
-            elif rep.get("Purpose") == "proxy" and proxy_url:
-                rep["URL"] = proxy_url
+            if rep.get("Purpose") == "hls":
+                presign_hls(rep)
+                asset["playlistUrl"] = rep["URL"]
+            elif rep.get("Purpose") in SPRITE_PURPOSES:
+                storage = rep["StorageInfo"]["PrimaryLocation"]
+                rep["URL"] = generate_presigned_url(
+                    bucket=storage["Bucket"], key=storage["ObjectKey"]["FullPath"]
+                )
 
         # Add computed fields
         asset["DigitalSourceAsset"]["ComputedFields"] = {
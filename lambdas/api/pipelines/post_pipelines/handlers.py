@@ -294,6 +294,11 @@ def create_pipeline(event: Dict[str, Any]) -> Dict[str, Any]:
                 if lambda_result:
                     lambda_arns[lambda_key] = lambda_result["function_arn"]
                     lambda_role_arns[lambda_key] = lambda_result["role_arn"]
+                    # tracked as a dependent resource so it is cleaned up too
+                    if lambda_result.get("large_memory_variant_arn"):
+                        lambda_arns[f"{lambda_key}_large_memory"] = lambda_result[
+                            "large_memory_variant_arn"
+                        ]
 
                     # Collect service roles if available
                     if (
@@ -1,3 +1,4 @@
+import json
 import os
 import re
 import time
@@ -207,6 +208,83 @@ def delete_lambda_function(function_name: str) -> None:
         logger.debug(f"Lambda function {function_name} does not exist")
 
 
+def create_large_memory_variant(
+    lambda_client: Any,
+    function_params: Dict[str, Any],
+    variant_config: Dict[str, Any],
+    role_name: str,
+) -> str:
+    """
+    Create the large-memory copy of an existing node Lambda function (same
+    code, role and environment, ``large_memory_variant`` settings from the
+    node YAML) and point the node function at it through
+    LARGE_MEMORY_FUNCTION_NAME. A variant that cannot be wired up is deleted
+    again, leaving the node function unchanged.
+
+    Args:
+        lambda_client: Lambda client
+        function_params: create_function parameters of the node function
+        variant_config: ``memory_size`` / ``handler`` / ``timeout`` overrides
+        role_name: Name of the node function's IAM role
+
+    Returns:
+        ARN of the variant function
+    """
+    variant_name = f"{function_params['FunctionName'][:58]}_large"
+    if check_lambda_exists(variant_name):
+        delete_lambda_function(variant_name)
+        wait_for_lambda_deletion(variant_name)
+
+    variant_params = {
+        **function_params,
+        "FunctionName": variant_name,
+        "MemorySize": int(variant_config.get("memory_size", 10240)),
+        "Handler": variant_config.get("handler", function_params["Handler"]),
+        "Timeout": int(variant_config.get("timeout", function_params["Timeout"])),
+    }
+    variant_arn = lambda_client.create_function(**variant_params)["FunctionArn"]
+    try:
+        lambda_client.get_waiter("function_active").wait(
+            FunctionName=variant_name,
+            WaiterConfig={"Delay": 5, "MaxAttempts": 12},
+        )
+
+        boto3.client("iam").put_role_policy(
+            RoleName=role_name,
+            PolicyName="InvokeLargeMemoryVariant",
+            PolicyDocument=json.dumps(
+                {
+                    "Version": "2012-10-17",
+                    "Statement": [
+                        {
+                            "Effect": "Allow",
+                            "Action": "lambda:InvokeFunction",
+                            "Resource": variant_arn,
+                        }
+                    ],
+                }
+            ),
+        )
+
+        # the variant itself has no variant, so it never delegates further
+        env_vars = function_params.get("Environment", {}).get("Variables", {})
+        lambda_client.update_function_configuration(
+            FunctionName=function_params["FunctionName"],
+            Environment={
+                "Variables": {**env_vars, "LARGE_MEMORY_FUNCTION_NAME": variant_name}
+            },
+        )
+        lambda_client.get_waiter("function_updated").wait(
+            FunctionName=function_params["FunctionName"],
+            WaiterConfig={"Delay": 5, "MaxAttempts": 12},
+        )
+    except Exception:
+        delete_lambda_function(variant_name)
+        raise
+    logger.info(f"Created large-memory variant '{variant_name}': {variant_arn}")
+    return variant_arn
+
+
 def create_service_roles_from_yaml(
     pipeline_name: str, node_id: str, yaml_data: Dict[str, Any]
 ) -> Dict[str, str]:
@@ -357,6 +435,7 @@ def create_lambda_function(
         - function_arn: ARN of the created Lambda function
         - role_arn: ARN of the IAM role created for the Lambda function
         - service_roles: Dictionary mapping service role names to ARNs (if any)
+        - large_memory_variant_arn: ARN of the large-memory variant (if any)
         Or None if creation was skipped
     """
     # Skip Lambda creation for flow-type and trigger-type nodes
@@ -470,6 +549,7 @@ def create_lambda_function(
 
     max_retries = 5  # Increased from 3 to 5
     retry_delay = 5  # Increased from 2 to 5 seconds
+    variant_arn = None
 
     try:
         # If function exists, delete it and wait for deletion to complete
@@ -520,6 +600,17 @@ def create_lambda_function(
                     "SERVICE": node.data.id,  # node Title
                     "STEP_NAME": node.data.label,  # friendly name of the node
                     "PIPELINE_NAME": pipeline_name,  # name of the pipeline
+                    # Opt-in step profiling (see common_libraries/step_profiler.py)
+                    "STEP_PROFILE_PIPELINES": os.environ.get(
+                        "STEP_PROFILE_PIPELINES", ""
+                    ),
+                    "STEP_PROFILE_SAMPLE_RATE": os.environ.get(
+                        "STEP_PROFILE_SAMPLE_RATE", "0"
+                    ),
+                    # Unit-length embeddings for faiss/innerproduct vector indexes
+                    "EMBEDDING_L2_NORMALIZE": os.environ.get(
+                        "EMBEDDING_L2_NORMALIZE", "false"
+                    ),
                 }
 
                 # Add IS_FIRST and IS_LAST if applicable
@@ -847,10 +938,27 @@ def create_lambda_function(
                 logger.info(f"Waiting {backoff_time} seconds before retry")
                 time.sleep(backoff_time)
 
+        # Large-memory variant (e.g. image nodes over their pixel budget). The
+        # node works without one, it just fails on inputs over its budget.
+        if lambda_config.get("large_memory_variant"):
+            try:
+                variant_arn = create_large_memory_variant(
+                    lambda_client,
+                    create_function_params,
+                    lambda_config["large_memory_variant"],
+                    role_name=function_name,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Failed to create large-memory variant of {function_name}, "
+                    f"deploying without it: {e}"
+                )
+
         return {
             "function_arn": function_arn,
             "role_arn": role_arn,
             "service_roles": service_roles,
+            "large_memory_variant_arn": variant_arn,
         }
     except Exception as e:
         # Use logger.exception which automatically includes the traceback
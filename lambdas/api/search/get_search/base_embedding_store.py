@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from api_utils import get_api_key
+from embedding_utils import EmbeddingValidationError, prepare_embedding
 
 
 @dataclass
@@ -118,9 +119,13 @@ class BaseEmbeddingStore(ABC):
                 res.text_embedding is not None
                 and res.text_embedding.segments is not None
             ):
-                embedding = list(res.text_embedding.segments[0].embeddings_float)
-                if not all(isinstance(x, (int, float)) for x in embedding):
-                    raise Exception("Invalid embedding format")
+                try:
+                    _, embedding = prepare_embedding(
+                        list(res.text_embedding.segments[0].embeddings_float),
+                        source="Query embedding",
+                    )
+                except EmbeddingValidationError as e:
+                    raise Exception(f"Invalid embedding format: {e}")
 
                 self.logger.info(
                     f"Generated embedding for query: {query_text} (length: {len(embedding)})"
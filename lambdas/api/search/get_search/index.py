@@ -20,12 +20,29 @@ from opensearchpy import (
     RequestsHttpConnection,
 )
 from pydantic import BaseModel, ConfigDict, Field, conint
+from rendition_negotiation import (
+    NEGOTIATED_FORMATS,
+    accepted_formats,
+    pick_representation,
+)
 from search_utils import (
     generate_presigned_url,
     generate_presigned_urls_batch,
     parse_search_query,
 )
 
+# Scrub sheets exist in one format (the video_sprites node's SPRITE_FORMAT,
+# e.g. WEBP) and are returned whatever the client states
+_UNNEGOTIATED_PURPOSES = {"scrubSheet"}
+
+
+def _accepted_for(purpose: str, accepted: frozenset) -> frozenset:
+    """Formats to pick *purpose* in: all of them for unnegotiated purposes."""
+    if purpose in _UNNEGOTIATED_PURPOSES:
+        return frozenset(NEGOTIATED_FORMATS)
+    return accepted
+
+
 # Global flag to enable/disable clip logic
 CLIP_LOGIC_ENABLED = True
 
@@ -140,6 +157,7 @@ class AssetSearchResult(BaseModelWithConfig):
     score: float
     thumbnailUrl: Optional[str] = None
     proxyUrl: Optional[str] = None
+    scrubUrl: Optional[str] = None
     clips: Optional[List[Dict[str, Any]]] = None
 
 
@@ -263,7 +281,6 @@ def build_search_query(params: SearchParams) -> Dict:
                 {"exists": {"field": "InventoryID"}},
                 {"bool": {"must_not": {"term": {"InventoryID": ""}}}},
             ],
-            "must_not": [{"term": {"embedding_scope": "clip"}}],
             "filter": [],
         }
     }
@@ -448,6 +465,8 @@ def build_search_query(params: SearchParams) -> Dict:
                 "DigitalSourceAsset.MainRepresentation.StorageInfo.PrimaryLocation.CreateDate",
                 "DigitalSourceAsset.CreateDate",
                 "DerivedRepresentations.Purpose",
+                "DerivedRepresentations.Format",
+                "DerivedRepresentations.SpriteSpec",
                 "DerivedRepresentations.StorageInfo.PrimaryLocation",
                 "FileHash",
                 "Metadata.Consolidated.type",
@@ -506,9 +525,13 @@ def add_common_fields(result: Dict, prefix: str = "") -> Dict:
     return result
 
 
-def collect_presigned_url_requests(hits: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+def collect_presigned_url_requests(
+    hits: List[Dict], accepted: frozenset = frozenset()
+) -> Tuple[List[Dict], List[Dict]]:
     """
     Collect all presigned URL requests from search hits without generating URLs.
+    Only the thumbnail and proxy chosen for the client (the smallest format it
+    accepts) and the scrub strip are requested.
     Returns tuple of (processed_hits_data, url_requests)
     """
     processed_hits = []
@@ -526,30 +549,27 @@ def collect_presigned_url_requests(hits: List[Dict]) -> Tuple[List[Dict], List[D
             "asset_id": asset_id,
             "thumbnail_request_id": None,
             "proxy_request_id": None,
+            "scrubSheet_request_id": None,
         }
 
-        # Collect URL requests for derived representations
-        for representation in derived_representations:
-            purpose = representation.get("Purpose")
-            rep_storage_info = representation.get("StorageInfo", {}).get(
-                "PrimaryLocation", {}
+        # Collect URL requests for the chosen derived representations
+        for purpose in ("thumbnail", "proxy", "scrubSheet"):
+            representation = pick_representation(
+                derived_representations, purpose, _accepted_for(purpose, accepted)
             )
+            if representation is None:
+                continue
+            rep_storage_info = representation["StorageInfo"]["PrimaryLocation"]
+            bucket = rep_storage_info.get("Bucket", "")
+            key = rep_storage_info.get("ObjectKey", {}).get("FullPath", "")
 
-            if rep_storage_info.get("StorageType") == "s3":
-                bucket = rep_storage_info.get("Bucket", "")
-                key = rep_storage_info.get("ObjectKey", {}).get("FullPath", "")
-
-                if bucket and key:
-                    request_id = f"{asset_id}_{purpose}_{len(url_requests)}"
+            if bucket and key:
+                request_id = f"{asset_id}_{purpose}_{len(url_requests)}"
 
-                    url_requests.append(
-                        {"request_id": request_id, "bucket": bucket, "key": key}
-                    )
-
-                    if purpose == "thumbnail":
-                        hit_data["thumbnail_request_id"] = request_id
-                    elif purpose == "proxy":
-                        hit_data["proxy_request_id"] = request_id
+                url_requests.append(
+                    {"request_id": request_id, "bucket": bucket, "key": key}
+                )
+                hit_data[f"{purpose}_request_id"] = request_id
 
         processed_hits.append(hit_data)
 
@@ -573,6 +593,10 @@ def process_search_hit_with_urls(
     if hit_data["proxy_request_id"]:
         proxy_url = presigned_urls.get(hit_data["proxy_request_id"])
 
+    scrub_url = None
+    if hit_data["scrubSheet_request_id"]:
+        scrub_url = presigned_urls.get(hit_data["scrubSheet_request_id"])
+
     # Create base result object
     result = AssetSearchResult(
         InventoryID=source.get("InventoryID", ""),
@@ -583,6 +607,7 @@ def process_search_hit_with_urls(
         score=hit["_score"],
         thumbnailUrl=thumbnail_url,
         proxyUrl=proxy_url,
+        scrubUrl=scrub_url,
     )
 
     # Convert to dictionary and add common fields
@@ -590,7 +615,7 @@ def process_search_hit_with_urls(
     return add_common_fields(result_dict)
 
 
-def process_search_hit(hit: Dict) -> Dict:
+def process_search_hit(hit: Dict, accepted: frozenset = frozenset()) -> Dict:
     """Process a single search hit and add presigned URL if thumbnail representation exists"""
     source = hit["_source"]
     digital_source_asset = source.get("DigitalSourceAsset", {})
@@ -601,29 +626,21 @@ def process_search_hit(hit: Dict) -> Dict:
     asset_id = digital_source_asset.get("ID", "unknown")
     logger.debug(f"Processing asset {asset_id} with score {hit.get('_score', 0)}")
 
-    thumbnail_url = None
-    proxy_url = None
-
-    # Process derived representations for thumbnails and proxies
-    for representation in derived_representations:
-        purpose = representation.get("Purpose")
-        rep_storage_info = representation.get("StorageInfo", {}).get(
-            "PrimaryLocation", {}
+    # Presign the thumbnail and proxy in the smallest format the client accepts,
+    # and the scrub strip for hover previews
+    urls = {}
+    for purpose in ("thumbnail", "proxy", "scrubSheet"):
+        representation = pick_representation(
+            derived_representations, purpose, _accepted_for(purpose, accepted)
         )
-
-        if rep_storage_info.get("StorageType") == "s3":
-            presigned_url = generate_presigned_url(
+        if representation is not None:
+            rep_storage_info = representation["StorageInfo"]["PrimaryLocation"]
+            urls[purpose] = generate_presigned_url(
                 bucket=rep_storage_info.get("Bucket", ""),
                 key=rep_storage_info.get("ObjectKey", {}).get("FullPath", ""),
             )
-
-            if purpose == "thumbnail":
-                thumbnail_url = presigned_url
-            elif purpose == "proxy":
-                proxy_url = presigned_url
-
-        if thumbnail_url and proxy_url:
-            break
+    thumbnail_url = urls.get("thumbnail")
+    proxy_url = urls.get("proxy")
 
     # Create base result object
     result = AssetSearchResult(
@@ -635,6 +652,7 @@ def process_search_hit(hit: Dict) -> Dict:
         score=hit["_score"],
         thumbnailUrl=thumbnail_url,
         proxyUrl=proxy_url,
+        scrubUrl=urls.get("scrubSheet"),
     )
 
     # Convert to dictionary and add common fields
@@ -712,7 +730,9 @@ def get_parent_asset(client, index_name, asset_id):
             "query": {
                 "bool": {
                     "must": [{"term": {"DigitalSourceAsset.ID.keyword": asset_id}}],
-                    "must_not": [{"term": {"embedding_scope": "clip"}}],
+                    # Asset documents only; clips not yet migrated to the clip index
+                    # have no InventoryID
+                    "filter": [{"exists": {"field": "InventoryID"}}],
                 }
             },
             "size": 1,
@@ -729,7 +749,9 @@ def get_parent_asset(client, index_name, asset_id):
         return None
 
 
-def process_semantic_results_parallel(hits: List[Dict]) -> List[Dict]:
+def process_semantic_results_parallel(
+    hits: List[Dict], accepted: frozenset = frozenset()
+) -> List[Dict]:
     """
     Process semantic search results using parallel processing for better performance.
     Group clips with their parent assets and keep only the top clips per parent.
@@ -786,7 +808,7 @@ def process_semantic_results_parallel(hits: List[Dict]) -> List[Dict]:
                 "query": {
                     "bool": {
                         "must": [{"terms": {"DigitalSourceAsset.ID": orphan_ids}}],
-                        "must_not": [{"term": {"embedding_scope": "clip"}}],
+                        "filter": [{"exists": {"field": "InventoryID"}}],
                     }
                 },
                 "size": len(orphan_ids),
@@ -817,7 +839,7 @@ def process_semantic_results_parallel(hits: List[Dict]) -> List[Dict]:
 
         try:
             parent_hit = parent_assets[asset_id]["hit"]
-            result = process_search_hit(parent_hit)
+            result = process_search_hit(parent_hit, accepted)
             parent_hit["_score"]
 
             if asset_id in clips_by_asset:
@@ -846,7 +868,7 @@ def process_semantic_results_parallel(hits: List[Dict]) -> List[Dict]:
 
     def process_standalone_hit(hit):
         try:
-            return process_search_hit(hit)
+            return process_search_hit(hit, accepted)
         except Exception as e:
             logger.warning(f"Error processing standalone hit: {str(e)}")
             return None
@@ -905,8 +927,12 @@ def create_search_metadata(
     )
 
 
-def perform_search(params: SearchParams) -> Dict:
-    """Perform search operation in OpenSearch with proper error handling."""
+def perform_search(params: SearchParams, accepted: frozenset = frozenset()) -> Dict:
+    """
+    Perform search operation in OpenSearch with proper error handling.
+    *accepted* holds the negotiated image formats (WEBP / AVIF) the client
+    accepts for thumbnails and proxies.
+    """
     overall_start = time.time()
     logger.info(f"[PERF] Starting search operation for query: {params.q}")
 
@@ -975,7 +1001,7 @@ def perform_search(params: SearchParams) -> Dict:
                     for hit in hits:
                         # Preserve the clips array before processing
                         clips = hit.get("clips", None)
-                        processed_hit = process_search_hit(hit)
+                        processed_hit = process_search_hit(hit, accepted)
                         # Restore the clips array after processing
                         processed_hit["clips"] = clips
                         processed_results.append(processed_hit)
@@ -987,7 +1013,9 @@ def perform_search(params: SearchParams) -> Dict:
                         "Using OpenSearch - processing clips with process_semantic_results_parallel"
                     )
                     semantic_processing_start = time.time()
-                    processed_results = process_semantic_results_parallel(hits)
+                    processed_results = process_semantic_results_parallel(
+                        hits, accepted
+                    )
                     logger.info(
                         f"[PERF] Semantic results processing took: {time.time() - semantic_processing_start:.3f}s"
                     )
@@ -1050,7 +1078,9 @@ def perform_search(params: SearchParams) -> Dict:
 
                 # Step 1: Collect all presigned URL requests
                 url_collection_start = time.time()
-                processed_hits_data, url_requests = collect_presigned_url_requests(hits)
+                processed_hits_data, url_requests = collect_presigned_url_requests(
+                    hits, accepted
+                )
                 logger.info(
                     f"[PERF] Semantic URL request collection took: {time.time() - url_collection_start:.3f}s"
                 )
@@ -1121,7 +1151,9 @@ def perform_search(params: SearchParams) -> Dict:
 
             # Step 1: Collect all presigned URL requests
             url_collection_start = time.time()
-            processed_hits_data, url_requests = collect_presigned_url_requests(hits)
+            processed_hits_data, url_requests = collect_presigned_url_requests(
+                hits, accepted
+            )
             logger.info(
                 f"[PERF] URL request collection took: {time.time() - url_collection_start:.3f}s"
             )
@@ -1231,8 +1263,10 @@ def handle_search():
             f"[PERF] Parameter validation took: {time.time() - param_start:.3f}s"
         )
 
+        accepted = accepted_formats(app.current_event.get("headers"), query_params)
+
         search_start = time.time()
-        result = perform_search(params)
+        result = perform_search(params, accepted)
         logger.info(f"[PERF] Search execution took: {time.time() - search_start:.3f}s")
 
         total_handler_time = time.time() - handler_start
@@ -161,10 +161,18 @@ class OpenSearchEmbeddingStore(BaseEmbeddingStore):
         try:
             client = self._get_client()
             index_name = os.environ["OPENSEARCH_INDEX"]
+            # Clip embeddings live in their own index behind the "-clips" alias
+            clip_index_name = os.environ.get(
+                "OPENSEARCH_CLIP_INDEX", f"{index_name}-clips"
+            )
 
             self.logger.info("Executing OpenSearch semantic query")
             opensearch_start = time.time()
-            response = client.search(body=query, index=index_name)
+            response = client.search(
+                body=query,
+                index=f"{index_name},{clip_index_name}",
+                ignore_unavailable=True,
+            )
             opensearch_time = time.time() - opensearch_start
             self.logger.info(
                 f"[PERF] OpenSearch query execution took: {opensearch_time:.3f}s"
@@ -24,6 +24,7 @@ from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
 from pydantic import BaseModel, Field
+from representation_files import representation_keys
 
 # Initialize AWS Lambda Powertools
 logger = Logger(service="asset-deletion-service")
@@ -123,7 +124,8 @@ def delete_s3_objects(asset: Dict[str, Any]) -> None:
                 },
             )
 
-            s3.delete_object(Bucket=derived_bucket, Key=derived_key)
+            for key in representation_keys(derived)[1]:
+                s3.delete_object(Bucket=derived_bucket, Key=key)
 
     except ClientError as e:
         logger.error(f"S3 deletion error: {str(e)}")
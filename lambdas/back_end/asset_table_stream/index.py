@@ -12,6 +12,7 @@ from aws_lambda_powertools.utilities.data_classes.dynamo_db_stream_event import
 )
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from opensearchpy import AWSV4SignerAuth, OpenSearch, RequestsHttpConnection
+from representation_files import representation_keys
 
 # Initialize logger with default level WARNING, but check environment variable
 log_level = os.environ.get("LOG_LEVEL", "DEBUG").upper()
@@ -281,7 +282,8 @@ def delete_s3_objects(asset_data: Dict) -> None:
                             "operation": "delete_derived_representation",
                         },
                     )
-                    s3.delete_object(Bucket=derived_bucket, Key=derived_key)
+                    for key in representation_keys(derived)[1]:
+                        s3.delete_object(Bucket=derived_bucket, Key=key)
                     logger.info(
                         "Successfully deleted derived representation",
                         extra={
@@ -0,0 +1,179 @@
+"""
+Compare kNN recall@k and latency of two embedding index layouts.
+
+Operator tool – typically run after ``migrate_vector_index.py`` with the old
+concrete index as ``--baseline`` and the new one as ``--candidate``:
+
+    python lambdas/back_end/create_os_index/benchmark_vector_index.py \\
+        --endpoint https://search-xxx.us-east-1.es.amazonaws.com \\
+        --baseline media --candidate media-20250101120000 --k 10 --queries 200
+
+Query vectors are embeddings sampled from the baseline index. Ground truth is
+an exact (brute-force) cosine search on the baseline via the k-NN
+``knn_score`` script, so both layouts are scored against the same reference.
+The reindex keeps document IDs, which is what makes the hit sets comparable.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+import boto3
+from migrate_vector_index import get_client
+from opensearchpy import OpenSearch
+
+
+def sample_query_vectors(
+    client: OpenSearch, index: str, field: str, count: int, seed: int
+) -> List[List[float]]:
+    resp = client.search(
+        index=index,
+        body={
+            "size": count,
+            "_source": [field],
+            "query": {
+                "function_score": {
+                    "query": {"exists": {"field": field}},
+                    "random_score": {"seed": seed, "field": "_seq_no"},
+                }
+            },
+        },
+    )
+    return [hit["_source"][field] for hit in resp["hits"]["hits"]]
+
+
+def exact_top_k(
+    client: OpenSearch,
+    index: str,
+    field: str,
+    vector: List[float],
+    k: int,
+    space_type: str,
+) -> List[str]:
+    resp = client.search(
+        index=index,
+        body={
+            "size": k,
+            "_source": False,
+            "query": {
+                "script_score": {
+                    "query": {"exists": {"field": field}},
+                    "script": {
+                        "source": "knn_score",
+                        "lang": "knn",
+                        "params": {
+                            "field": field,
+                            "query_value": vector,
+                            "space_type": space_type,
+                        },
+                    },
+                }
+            },
+        },
+    )
+    return [hit["_id"] for hit in resp["hits"]["hits"]]
+
+
+def approx_top_k(
+    client: OpenSearch, index: str, field: str, vector: List[float], k: int
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    resp = client.search(
+        index=index,
+        body={
+            "size": k,
+            "_source": False,
+            "query": {"knn": {field: {"vector": vector, "k": k}}},
+        },
+    )
+    return {
+        "ids": [hit["_id"] for hit in resp["hits"]["hits"]],
+        "client_ms": (time.perf_counter() - start) * 1000,
+        "took_ms": resp.get("took", 0),
+    }
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def benchmark(
+    client: OpenSearch,
+    baseline: str,
+    candidate: str,
+    field: str = "embedding",
+    k: int = 10,
+    queries: int = 100,
+    space_type: str = "cosinesimil",
+    seed: int = 42,
+) -> Dict[str, Any]:
+    vectors = sample_query_vectors(client, baseline, field, queries, seed)
+    if not vectors:
+        raise RuntimeError(f"No documents with '{field}' in {baseline}")
+
+    # Warm both graphs so the first queries don't measure native-library loading
+    for index in (baseline, candidate):
+        client.transport.perform_request("GET", f"/_plugins/_knn/warmup/{index}")
+
+    report: Dict[str, Any] = {"k": k, "queries": len(vectors)}
+    truth = [exact_top_k(client, baseline, field, v, k, space_type) for v in vectors]
+
+    for label, index in (("baseline", baseline), ("candidate", candidate)):
+        recalls, client_ms, took_ms = [], [], []
+        for vector, expected in zip(vectors, truth):
+            result = approx_top_k(client, index, field, vector, k)
+            expected_set = set(expected)
+            if expected_set:
+                recalls.append(len(expected_set & set(result["ids"])) / len(expected_set))
+            client_ms.append(result["client_ms"])
+            took_ms.append(result["took_ms"])
+        report[label] = {
+            "index": index,
+            f"recall@{k}": round(statistics.mean(recalls), 4) if recalls else None,
+            "took_ms_p50": _percentile(took_ms, 50),
+            "took_ms_p95": _percentile(took_ms, 95),
+            "client_ms_p50": round(_percentile(client_ms, 50), 2),
+            "client_ms_p95": round(_percentile(client_ms, 95), 2),
+        }
+
+    stats = client.indices.stats(index=f"{baseline},{candidate}", metric="store")
+    for label in ("baseline", "candidate"):
+        idx = report[label]["index"]
+        report[label]["store_bytes"] = stats["indices"][idx]["primaries"]["store"][
+            "size_in_bytes"
+        ]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--endpoint", required=True)
+    parser.add_argument("--region", default=boto3.Session().region_name)
+    parser.add_argument("--baseline", required=True)
+    parser.add_argument("--candidate", required=True)
+    parser.add_argument("--field", default="embedding")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--space-type", default="cosinesimil")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    client = get_client(args.endpoint, args.region)
+    report = benchmark(
+        client,
+        args.baseline,
+        args.candidate,
+        field=args.field,
+        k=args.k,
+        queries=args.queries,
+        space_type=args.space_type,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Dedicated index for clip-level embedding documents (embedding_scope=clip).
+
+Clips are routed by DigitalSourceAsset.ID, so all clips of one asset sit on a
+single shard, and are always addressed through the ``<media index>-clips``
+alias so that the concrete index behind it can be replaced online.
+"""
+
+from typing import Any, Dict
+
+from vector_index_profile import knn_index_settings, knn_vector_field
+
+CLIP_ALIAS_SUFFIX = "-clips"
+
+
+def clip_alias(media_index: str) -> str:
+    return f"{media_index}{CLIP_ALIAS_SUFFIX}"
+
+
+def clip_index_name(media_index: str, generation: int = 1) -> str:
+    return f"{clip_alias(media_index)}-{generation:06d}"
+
+
+def clip_index_body(media_index: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "settings": {"index": knn_index_settings(profile)},
+        "aliases": {clip_alias(media_index): {"is_write_index": True}},
+        "mappings": {
+            "_routing": {"required": True},
+            "properties": {
+                "type": {"type": "keyword"},
+                "embedding_scope": {"type": "keyword"},
+                "embedding_option": {"type": "keyword"},
+                "start_timecode": {"type": "keyword"},
+                "end_timecode": {"type": "keyword"},
+                "timestamp": {"type": "date"},
+                "DigitalSourceAsset": {
+                    "type": "object",
+                    "properties": {"ID": {"type": "keyword"}},
+                },
+                "embedding": knn_vector_field(profile),
+            },
+        },
+    }
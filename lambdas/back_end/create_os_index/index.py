@@ -5,10 +5,15 @@ import time
 import boto3
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
+from clip_index import clip_index_body, clip_index_name
 from lambda_utils import lambda_handler_decorator, logger
 from requests import request
-
-VECTOR_DIMENSION = 1024  # Twelve Labs embeddings dimension
+from vector_index_profile import (
+    VECTOR_DIMENSION,
+    knn_index_settings,
+    knn_vector_field,
+    load_profile,
+)
 
 
 def index_exists(
@@ -247,8 +252,16 @@ def handler(event, context):
         "accept": "application/json",
     }
 
+    vector_profile = load_profile()
+    logger.info("Vector index profile", extra={"profile": vector_profile})
+
     payload = {
-        "settings": {"index": {"knn": True, "mapping.total_fields.limit": 6000}},
+        "settings": {
+            "index": {
+                **knn_index_settings(vector_profile),
+                "mapping.total_fields.limit": 6000,
+            }
+        },
         "mappings": {
             "properties": {
                 "type": {"type": "text"},
@@ -259,15 +272,7 @@ def handler(event, context):
                 "start_timecode": {"type": "keyword"},
                 "end_timecode": {"type": "keyword"},
                 "embedding_scope": {"type": "keyword"},
-                "embedding": {
-                    "type": "knn_vector",
-                    "dimension": 1024,
-                    "method": {
-                        "name": "hnsw",
-                        "space_type": "cosinesimil",
-                        "engine": "nmslib",
-                    },
-                },
+                "embedding": knn_vector_field(vector_profile),
                 "DerivedRepresentations": {
                     "type": "nested",
                     "properties": {
@@ -383,15 +388,7 @@ def handler(event, context):
                         "start_timecode": {"type": "keyword"},
                         "end_timecode": {"type": "keyword"},
                         "embedding_scope": {"type": "keyword"},
-                        "embedding": {
-                            "type": "knn_vector",
-                            "dimension": 1024,
-                            "method": {
-                                "name": "hnsw",
-                                "space_type": "cosinesimil",
-                                "engine": "nmslib",
-                            },
-                        },
+                        "embedding": knn_vector_field(vector_profile),
                         "EmbeddedMetadata": {"type": "object", "dynamic": True},
                     },
                 },
@@ -412,14 +409,32 @@ def handler(event, context):
     logger.info(f"Creating {len(indexes)} indexes", extra={"indexes": indexes})
 
     for index_name in indexes:
+        index_name = index_name.strip()
         logger.info("Processing index", extra={"index_name": index_name})
         success = create_index_with_retry(
-            host, index_name.strip(), payload, headers, credentials, service, region
+            host, index_name, payload, headers, credentials, service, region
         )
         if not success:
             msg = f"Failed to create index {index_name} after multiple retries"
             logger.error(msg)
             raise Exception(msg)
 
+        # Clip embeddings live in their own index, behind the <index>-clips alias
+        clip_index = clip_index_name(index_name)
+        logger.info("Processing clip index", extra={"index_name": clip_index})
+        success = create_index_with_retry(
+            host,
+            clip_index,
+            clip_index_body(index_name, vector_profile),
+            headers,
+            credentials,
+            service,
+            region,
+        )
+        if not success:
+            msg = f"Failed to create clip index {clip_index} after multiple retries"
+            logger.error(msg)
+            raise Exception(msg)
+
     logger.info("Successfully created all indexes")
     return {"statusCode": 200, "body": "All indexes created successfully"}
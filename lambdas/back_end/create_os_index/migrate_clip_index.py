@@ -0,0 +1,115 @@
+"""
+Move clip embedding documents out of the media index into the routed clip index.
+
+Operator tool – run once per deployment that predates the dedicated clip index
+(requires ``opensearch-py``):
+
+    python lambdas/back_end/create_os_index/migrate_clip_index.py \\
+        --endpoint https://search-xxx.us-east-1.es.amazonaws.com --index media
+
+Steps:
+    1. create ``<index>-clips-000001`` behind the ``<index>-clips`` write alias
+       if the alias does not exist yet, re-using the media index's embedding
+       field layout;
+    2. reindex segment documents (``embedding_scope`` clip / audio) into the
+       alias, setting ``_routing`` to DigitalSourceAsset.ID (IDs and versions
+       are kept, so the copy can be re-run safely);
+    3. delete the copied clips from the media index.
+
+The embedding nodes write new clips to the alias and semantic search reads
+``<index>,<index>-clips``, so search keeps returning clips while this runs.
+"""
+
+import argparse
+import json
+import sys
+
+import boto3
+from clip_index import clip_alias, clip_index_body, clip_index_name
+from migrate_vector_index import get_client, wait_for_task
+from opensearchpy import OpenSearch
+from vector_index_profile import load_profile
+
+# Segment documents written by the embedding nodes (video clips and audio segments)
+_CLIP_QUERY = {"terms": {"embedding_scope": ["clip", "audio"]}}
+
+_ROUTING_SCRIPT = (
+    "if (ctx._source.DigitalSourceAsset == null"
+    " || ctx._source.DigitalSourceAsset.ID == null) { ctx.op = 'noop' }"
+    " else { ctx._routing = ctx._source.DigitalSourceAsset.ID }"
+)
+
+
+def _media_embedding_profile(client: OpenSearch, index: str) -> dict:
+    """Derive a vector profile from the media index's existing embedding mapping."""
+    _, body = next(iter(client.indices.get_mapping(index=index).items()))
+    field = body["mappings"]["properties"]["embedding"]
+    method = field.get("method", {})
+    params = method.get("parameters", {})
+    profile = {
+        "engine": method.get("engine", "nmslib"),
+        "space_type": method.get("space_type", "cosinesimil"),
+        "dimension": field.get("dimension"),
+        "quantization": (
+            "fp16" if params.get("encoder", {}).get("name") == "sq" else "none"
+        ),
+    }
+    for key in ("m", "ef_construction", "ef_search"):
+        if key in params:
+            profile[key] = params[key]
+    return load_profile(json.dumps(profile))
+
+
+def ensure_clip_index(client: OpenSearch, media_index: str) -> str:
+    alias = clip_alias(media_index)
+    if client.indices.exists_alias(name=alias):
+        return alias
+    target = clip_index_name(media_index)
+    profile = _media_embedding_profile(client, media_index)
+    client.indices.create(index=target, body=clip_index_body(media_index, profile))
+    print(f"Created {target} behind alias {alias}", file=sys.stderr)
+    return alias
+
+
+def migrate(client: OpenSearch, media_index: str) -> dict:
+    alias = ensure_clip_index(client, media_index)
+
+    task = client.reindex(
+        body={
+            "conflicts": "proceed",
+            "source": {"index": media_index, "query": _CLIP_QUERY},
+            "dest": {"index": alias, "version_type": "external"},
+            "script": {"lang": "painless", "source": _ROUTING_SCRIPT},
+        },
+        wait_for_completion=False,
+        refresh=True,
+    )
+    copied = wait_for_task(client, task["task"])
+
+    deleted = client.delete_by_query(
+        index=media_index,
+        body={"query": _CLIP_QUERY},
+        conflicts="proceed",
+        refresh=True,
+        slices="auto",
+    )
+    return {
+        "clip_alias": alias,
+        "copied": copied.get("created", 0) + copied.get("updated", 0),
+        "deleted_from_media": deleted.get("deleted", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--endpoint", required=True)
+    parser.add_argument("--region", default=boto3.Session().region_name)
+    parser.add_argument("--index", default="media")
+    args = parser.parse_args()
+
+    client = get_client(args.endpoint, args.region)
+    print(json.dumps(migrate(client, args.index), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Re-index the media index into a new kNN vector layout behind an alias.
+
+Operator tool – run with credentials that can reach the domain and with
+``opensearch-py`` installed:
+
+    python lambdas/back_end/create_os_index/migrate_vector_index.py \\
+        --endpoint https://search-xxx.us-east-1.es.amazonaws.com \\
+        --alias media \\
+        --profile '{"engine": "faiss", "space_type": "innerproduct",
+                    "quantization": "fp16", "m": 16,
+                    "ef_construction": 256, "ef_search": 256}'
+
+Steps:
+    1. create ``<alias>-<timestamp>`` with the source settings and mappings,
+       every embedding field re-laid-out with the profile;
+    2. reindex with external versioning (server-side task, polled);
+    3. catch-up passes copy documents created or updated meanwhile – the
+       DynamoDB ingestion pipeline and the embedding nodes keep writing;
+    4. atomically point the alias at the new index.
+
+Copies into a faiss or innerproduct layout L2-normalise every embedding on the
+way (reindex script), matching what the embedding nodes store for it.
+
+While the alias name is still a concrete index (first migration) step 4
+must drop that index in the same alias call, so ``--delete-source`` is
+required to perform the swap; without it the tool stops after step 3.
+Deletes that happen during the copy are not propagated.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from opensearchpy import AWSV4SignerAuth, OpenSearch, RequestsHttpConnection
+from vector_index_profile import (
+    apply_profile,
+    knn_index_settings,
+    load_profile,
+    normalize_script,
+)
+
+# Settings that are copied from the source index; everything else is either
+# generated by OpenSearch (uuid, creation_date, …) or comes from the profile.
+_COPIED_SETTINGS = ("number_of_shards", "number_of_replicas", "mapping", "analysis")
+
+
+def get_client(endpoint: str, region: str, service: str = "es") -> OpenSearch:
+    host = endpoint.split("://")[-1].rstrip("/")
+    auth = AWSV4SignerAuth(boto3.Session().get_credentials(), region, service)
+    return OpenSearch(
+        hosts=[{"host": host, "port": 443}],
+        http_auth=auth,
+        use_ssl=True,
+        verify_certs=True,
+        connection_class=RequestsHttpConnection,
+        timeout=120,
+        http_compress=True,
+    )
+
+
+def resolve_source(client: OpenSearch, alias: str) -> Tuple[str, bool]:
+    """Return (concrete source index, whether *alias* is already an alias)."""
+    if client.indices.exists_alias(name=alias):
+        targets = list(client.indices.get_alias(name=alias).keys())
+        if len(targets) != 1:
+            raise RuntimeError(f"Alias {alias} points to {targets}; expected one")
+        return targets[0], True
+    if not client.indices.exists(index=alias):
+        raise RuntimeError(f"Neither an index nor an alias named {alias} exists")
+    return alias, False
+
+
+def build_target_body(
+    client: OpenSearch, source: str, profile: Dict[str, Any]
+) -> Dict[str, Any]:
+    src_settings = client.indices.get_settings(index=source)[source]["settings"][
+        "index"
+    ]
+    mappings = client.indices.get_mapping(index=source)[source]["mappings"]
+    apply_profile(mappings, profile)
+
+    settings = {k: src_settings[k] for k in _COPIED_SETTINGS if k in src_settings}
+    settings.update(knn_index_settings(profile))
+    return {"settings": {"index": settings}, "mappings": mappings}
+
+
+def wait_for_task(client: OpenSearch, task_id: str) -> Dict[str, Any]:
+    """Poll a server-side reindex / delete-by-query task until it completes."""
+    while True:
+        status = client.tasks.get(task_id=task_id)
+        if status.get("completed"):
+            response = status.get("response", {})
+            if response.get("failures"):
+                raise RuntimeError(f"Task failures: {response['failures'][:5]}")
+            return response
+        progress = status.get("task", {}).get("status", {})
+        print(
+            f"  task {task_id}: {progress.get('created', 0)} created, "
+            f"{progress.get('updated', 0)} updated of {progress.get('total', '?')}",
+            file=sys.stderr,
+        )
+        time.sleep(10)
+
+
+def run_reindex(
+    client: OpenSearch,
+    source: str,
+    target: str,
+    script: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Server-side reindex; unchanged documents are skipped as version conflicts."""
+    body: Dict[str, Any] = {
+        "conflicts": "proceed",
+        "source": {"index": source},
+        "dest": {"index": target, "version_type": "external"},
+    }
+    if script:
+        body["script"] = script
+    task = client.reindex(
+        body=body,
+        wait_for_completion=False,
+        refresh=True,
+    )
+    return wait_for_task(client, task["task"])
+
+
+def migrate(
+    client: OpenSearch,
+    alias: str,
+    profile: Dict[str, Any],
+    delete_source: bool = False,
+    catch_up_threshold: int = 100,
+    max_catch_up_passes: int = 5,
+    target: Optional[str] = None,
+) -> Dict[str, Any]:
+    source, is_alias = resolve_source(client, alias)
+    target = target or f"{alias}-{time.strftime('%Y%m%d%H%M%S')}"
+    print(f"Migrating {source} -> {target} (alias {alias})", file=sys.stderr)
+
+    body = build_target_body(client, source, profile)
+    replicas = body["settings"]["index"].get("number_of_replicas", "1")
+    # Bulk-load without replicas or refreshes, restored after the copy
+    body["settings"]["index"].update(
+        {"number_of_replicas": 0, "refresh_interval": "-1"}
+    )
+    client.indices.create(index=target, body=body)
+    script = normalize_script(profile)
+
+    first = run_reindex(client, source, target, script)
+    print(f"Initial copy: {first.get('created', 0)} documents", file=sys.stderr)
+
+    for attempt in range(max_catch_up_passes):
+        delta = run_reindex(client, source, target, script)
+        changed = delta.get("created", 0) + delta.get("updated", 0)
+        print(f"Catch-up pass {attempt + 1}: {changed} changed", file=sys.stderr)
+        if changed <= catch_up_threshold:
+            break
+
+    client.indices.put_settings(
+        index=target,
+        body={"index": {"number_of_replicas": replicas, "refresh_interval": None}},
+    )
+    client.indices.refresh(index=target)
+
+    if is_alias:
+        actions = [
+            {"remove": {"index": source, "alias": alias}},
+            {"add": {"index": target, "alias": alias, "is_write_index": True}},
+        ]
+    elif delete_source:
+        actions = [
+            {"add": {"index": target, "alias": alias, "is_write_index": True}},
+            {"remove_index": {"index": source}},
+        ]
+    else:
+        print(
+            f"{alias} is a concrete index; re-run with --delete-source to swap it "
+            f"for an alias onto {target}",
+            file=sys.stderr,
+        )
+        return {"source": source, "target": target, "swapped": False}
+
+    # Final catch-up immediately before the swap keeps the write gap short
+    run_reindex(client, source, target, script)
+    client.indices.update_aliases(body={"actions": actions})
+    return {"source": source, "target": target, "swapped": True}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--endpoint", required=True)
+    parser.add_argument("--region", default=boto3.Session().region_name)
+    parser.add_argument("--alias", default="media")
+    parser.add_argument("--profile", required=True, help="profile JSON")
+    parser.add_argument("--target", help="target index name")
+    parser.add_argument("--delete-source", action="store_true")
+    args = parser.parse_args()
+
+    client = get_client(args.endpoint, args.region)
+    result = migrate(
+        client,
+        args.alias,
+        load_profile(args.profile),
+        delete_source=args.delete_source,
+        target=args.target,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
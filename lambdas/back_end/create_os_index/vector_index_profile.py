@@ -0,0 +1,153 @@
+"""
+kNN vector layout for the embedding fields of the media index.
+
+The profile comes from ``opensearch_vector_index`` in config.json and reaches the
+index-creation Lambda as the VECTOR_INDEX_PROFILE env-var (JSON). The migration
+and benchmark tools in this directory build their target mappings from the same
+functions so that every index carrying embeddings is laid out identically.
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+VECTOR_DIMENSION = 1024  # Twelve Labs embeddings dimension
+
+# The original layout: nmslib HNSW, cosine, float32, engine-default graph params
+LEGACY_PROFILE: Dict[str, Any] = {
+    "engine": "nmslib",
+    "space_type": "cosinesimil",
+    "quantization": "none",
+}
+
+# Space types each engine accepts on the OpenSearch 2.15 domains we deploy.
+# faiss has no cosinesimil before 2.19; with L2-normalised embeddings
+# innerproduct ranks identically to cosine.
+ENGINE_SPACE_TYPES = {
+    "nmslib": {"cosinesimil", "l2", "innerproduct", "l1", "linf"},
+    "faiss": {"l2", "innerproduct"},
+    "lucene": {"cosinesimil", "l2", "innerproduct"},
+}
+
+# Quantization encoders per engine. "fp16" is faiss scalar quantization and
+# halves graph/vector memory while keeping float32 input on the wire.
+QUANTIZATION_ENCODERS = {
+    "none": None,
+    "fp16": {"name": "sq", "parameters": {"type": "fp16", "clip": True}},
+}
+
+# Paths of all knn_vector fields in the media mapping
+EMBEDDING_FIELD_PATHS = ("embedding", "DigitalAsset.embedding")
+
+
+def load_profile(raw: Optional[str] = None) -> Dict[str, Any]:
+    """Parse and validate a profile, filling unset keys from LEGACY_PROFILE."""
+    if raw is None:
+        raw = os.getenv("VECTOR_INDEX_PROFILE", "")
+
+    profile: Dict[str, Any] = {**LEGACY_PROFILE, "dimension": VECTOR_DIMENSION}
+    if raw:
+        overrides = json.loads(raw) if isinstance(raw, str) else dict(raw)
+        profile.update({k: v for k, v in overrides.items() if v is not None})
+
+    engine = profile["engine"]
+    if engine not in ENGINE_SPACE_TYPES:
+        raise ValueError(f"Unsupported kNN engine: {engine}")
+    if profile["space_type"] not in ENGINE_SPACE_TYPES[engine]:
+        raise ValueError(
+            f"Space type {profile['space_type']} is not supported by {engine}"
+        )
+    if profile["quantization"] not in QUANTIZATION_ENCODERS:
+        raise ValueError(f"Unsupported quantization: {profile['quantization']}")
+    if profile["quantization"] != "none" and engine != "faiss":
+        raise ValueError("Quantization requires the faiss engine")
+    for key in ("m", "ef_construction", "ef_search"):
+        if key in profile and int(profile[key]) <= 0:
+            raise ValueError(f"{key} must be positive")
+    return profile
+
+
+# Reindex script scaling every embedding field to unit length (zero vectors
+# and documents without the field are left alone)
+_NORMALIZE_SOURCE = """
+for (String path : params.paths) {
+  String[] parts = path.splitOnToken('.');
+  def parent = ctx._source;
+  for (int i = 0; i < parts.length - 1 && parent instanceof Map; i++) {
+    parent = parent.get(parts[i]);
+  }
+  if (!(parent instanceof Map)) { continue; }
+  def vector = parent.get(parts[parts.length - 1]);
+  if (!(vector instanceof List) || vector.isEmpty()) { continue; }
+  double norm = 0;
+  for (def x : vector) { norm += x * x; }
+  if (norm == 0) { continue; }
+  norm = Math.sqrt(norm);
+  List unit = new ArrayList();
+  for (def x : vector) { unit.add(x / norm); }
+  parent.put(parts[parts.length - 1], unit);
+}
+"""
+
+
+def needs_unit_vectors(profile: Dict[str, Any]) -> bool:
+    """Whether the layout ranks like cosine only for L2-normalised embeddings."""
+    return profile["engine"] == "faiss" or profile["space_type"] == "innerproduct"
+
+
+def normalize_script(profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Reindex script normalising stored embeddings for *profile* (or None)."""
+    if not needs_unit_vectors(profile):
+        return None
+    return {
+        "lang": "painless",
+        "source": _NORMALIZE_SOURCE,
+        "params": {"paths": list(EMBEDDING_FIELD_PATHS)},
+    }
+
+
+def knn_vector_field(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """knn_vector mapping for one embedding field."""
+    parameters: Dict[str, Any] = {}
+    for key in ("m", "ef_construction"):
+        if key in profile:
+            parameters[key] = int(profile[key])
+    if profile["engine"] == "faiss" and "ef_search" in profile:
+        parameters["ef_search"] = int(profile["ef_search"])
+
+    encoder = QUANTIZATION_ENCODERS[profile["quantization"]]
+    if encoder:
+        parameters["encoder"] = encoder
+
+    method: Dict[str, Any] = {
+        "name": "hnsw",
+        "space_type": profile["space_type"],
+        "engine": profile["engine"],
+    }
+    if parameters:
+        method["parameters"] = parameters
+
+    return {
+        "type": "knn_vector",
+        "dimension": int(profile["dimension"]),
+        "method": method,
+    }
+
+
+def knn_index_settings(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Index-level kNN settings (nmslib reads ef_search from here)."""
+    settings: Dict[str, Any] = {"knn": True}
+    if profile["engine"] == "nmslib" and "ef_search" in profile:
+        settings["knn.algo_param.ef_search"] = int(profile["ef_search"])
+    return settings
+
+
+def apply_profile(mappings: Dict[str, Any], profile: Dict[str, Any]) -> None:
+    """Replace every embedding field in *mappings* (in place) with the profile layout."""
+    for path in EMBEDDING_FIELD_PATHS:
+        props = mappings.get("properties", {})
+        parts = path.split(".")
+        for part in parts[:-1]:
+            props = props.get(part, {}).get("properties", {})
+        if parts[-1] in props:
+            props[parts[-1]] = knn_vector_field(profile)
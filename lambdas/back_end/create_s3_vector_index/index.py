@@ -4,6 +4,7 @@ import time
 
 import boto3
 from lambda_utils import lambda_handler_decorator, logger
+from vector_metadata_schema import index_matches_schema, metadata_configuration
 
 VECTOR_DIMENSION = 1024  # Twelve Labs embeddings dimension
 MAX_VECTOR_DIMENSION = 4096  # S3 Vector maximum supported dimension
@@ -183,6 +184,21 @@ def create_vector_index_with_retry(
                 "Index already exists – skipping creation",
                 extra={"bucket_name": bucket_name, "index_name": index_name},
             )
+            # The metadata configuration is fixed at creation; older indexes are
+            # moved onto the schema with tools/migrate_vector_metadata.py
+            index = s3_vector_client.get_index(
+                vectorBucketName=bucket_name, indexName=index_name
+            ).get("index", {})
+            if not index_matches_schema(index):
+                logger.warning(
+                    "Existing index does not use the vector metadata schema",
+                    extra={
+                        "bucket_name": bucket_name,
+                        "index_name": index_name,
+                        "metadataConfiguration": index.get("metadataConfiguration"),
+                        "expected": metadata_configuration(),
+                    },
+                )
             return True
 
     logger.info(
@@ -191,6 +207,7 @@ def create_vector_index_with_retry(
             "bucket_name": bucket_name,
             "index_name": index_name,
             "dimension": dimension,
+            "metadata_configuration": metadata_configuration(),
         },
     )
 
@@ -203,6 +220,7 @@ def create_vector_index_with_retry(
                 dimension=dimension,
                 dataType="float32",  # Using float32 for embeddings
                 distanceMetric="cosine",  # Default distance metric
+                metadataConfiguration=metadata_configuration(),
             )
 
             logger.info(
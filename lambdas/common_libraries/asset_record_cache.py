@@ -0,0 +1,213 @@
+"""
+Read-through cache of asset records for one pipeline execution.
+
+Within an execution the same asset record is read by most steps. The record a
+step wrote is passed forward in the envelope (``updatedAsset`` / ``assets``);
+the middleware seeds this cache with it, so the next step reads it without a
+DynamoDB call. Writes go through :meth:`AssetRecordCache.update` /
+:meth:`AssetRecordCache.modify`, which bump a ``RecordVersion`` attribute,
+make the write conditional on the version they started from, and keep the
+``ReturnValues="ALL_NEW"`` image instead of reading the record back. A
+version conflict (another branch wrote meanwhile) re-reads the record and
+retries. Not every writer of the asset table bumps the version (rename,
+ingest, the JS metadata extractor), so :meth:`AssetRecordCache.modify`
+always builds on a consistent read rather than the envelope copy.
+
+The cache is kept per container and cleared when the execution changes.
+"""
+
+import os
+import re
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+VERSION_ATTRIBUTE = "RecordVersion"
+
+_SET_CLAUSE = re.compile(r"\bSET\s+", re.IGNORECASE)
+
+
+def _version(record: Optional[Dict[str, Any]]) -> int:
+    if not record:
+        return -1
+    return int(record.get(VERSION_ATTRIBUTE, 0))
+
+
+def _to_dynamo(value: Any) -> Any:
+    """Envelope records went through JSON (floats); DynamoDB needs Decimals."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamo(v) for v in value]
+    return value
+
+
+class VersionConflictError(Exception):
+    """The record kept changing between re-read and conditional write."""
+
+
+class AssetRecordCache:
+    """Asset records of the current execution, keyed by InventoryID."""
+
+    def __init__(self, table: Any, max_conflict_retries: int = 3):
+        self.table = table
+        self.max_conflict_retries = max_conflict_retries
+        self._execution_id: Optional[str] = None
+        self._records: Dict[str, Dict[str, Any]] = {}
+        # envelope copies, converted to DynamoDB types on first use
+        self._seeded: Dict[str, Dict[str, Any]] = {}
+        self.hits = self.misses = 0
+
+    # ----------------------------------------------------------------- scope
+    def begin_execution(self, execution_id: Optional[str]) -> None:
+        """Drop everything cached for another (or an unknown) execution."""
+        if not execution_id or execution_id != self._execution_id:
+            self._records.clear()
+            self._seeded.clear()
+        self._execution_id = execution_id or None
+
+    def seed(self, records: Iterable[Any]) -> None:
+        """Remember records passed in the envelope (newest version wins)."""
+        for record in records:
+            if not isinstance(record, dict) or not record.get("InventoryID"):
+                continue
+            key = record["InventoryID"]
+            if self._records.get(key) is record:
+                continue
+            known = self._seeded.get(key) or self._records.get(key)
+            if known is None or _version(record) >= _version(known):
+                self._records.pop(key, None)
+                self._seeded[key] = record
+
+    # ------------------------------------------------------------------ read
+    def get(self, inventory_id: str, *, refresh: bool = False) -> Optional[Dict]:
+        """The asset record; *refresh* forces a consistent DynamoDB read."""
+        if not refresh:
+            if inventory_id in self._seeded:
+                self._records[inventory_id] = _to_dynamo(
+                    self._seeded.pop(inventory_id)
+                )
+            if inventory_id in self._records:
+                self.hits += 1
+                return self._records[inventory_id]
+
+        self.misses += 1
+        self._seeded.pop(inventory_id, None)
+        item = self.table.get_item(
+            Key={"InventoryID": inventory_id}, ConsistentRead=refresh
+        ).get("Item")
+        if item is None:
+            self._records.pop(inventory_id, None)
+        else:
+            self._records[inventory_id] = item
+        return item
+
+    # ----------------------------------------------------------------- write
+    def update(self, inventory_id: str, **update_kwargs: Any) -> Dict[str, Any]:
+        """
+        ``update_item`` with the given UpdateExpression / ExpressionAttribute*
+        / ConditionExpression; returns the new record. Does not read the
+        record first: the version condition applies only if it is cached.
+        """
+        return self._write(inventory_id, lambda _record: update_kwargs, read=False)
+
+    def modify(
+        self,
+        inventory_id: str,
+        build: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Read-modify-write: *build* gets the current record (a consistent
+        read, never the cached copy) and returns the update_item arguments.
+        On a version conflict it is called again with the re-read record.
+        """
+        return self._write(inventory_id, build, read=True)
+
+    def _write(
+        self,
+        inventory_id: str,
+        build: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+        read: bool,
+    ) -> Dict[str, Any]:
+        if read:
+            record = self.get(inventory_id, refresh=True)
+        else:
+            if inventory_id in self._seeded:
+                self.get(inventory_id)  # converts the envelope copy
+            record = self._records.get(inventory_id)
+        for _ in range(self.max_conflict_retries + 1):
+            params = self._versioned(build(record), record)
+            try:
+                item = self.table.update_item(
+                    Key={"InventoryID": inventory_id},
+                    ReturnValues="ALL_NEW",
+                    **params,
+                )["Attributes"]
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code != "ConditionalCheckFailedException":
+                    raise
+                expected = _version(record) if record is not None else None
+                record = self.get(inventory_id, refresh=True)
+                current = _version(record) if record is not None else None
+                if current == expected:
+                    raise  # the caller's own ConditionExpression failed
+                continue
+            self._records[inventory_id] = item
+            return item
+        raise VersionConflictError(f"Asset {inventory_id} kept changing")
+
+    @staticmethod
+    def _versioned(
+        params: Dict[str, Any], record: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Add the version bump and the version condition to *params*."""
+        params = dict(params)
+        names = dict(params.get("ExpressionAttributeNames") or {})
+        values = dict(params.get("ExpressionAttributeValues") or {})
+        names["#recordVersion"] = VERSION_ATTRIBUTE
+        values[":recordVersionZero"] = 0
+        values[":recordVersionOne"] = 1
+
+        bump = (
+            "#recordVersion = "
+            "if_not_exists(#recordVersion, :recordVersionZero) + :recordVersionOne"
+        )
+        expression = params["UpdateExpression"]
+        if _SET_CLAUSE.search(expression):
+            expression = _SET_CLAUSE.sub(f"SET {bump}, ", expression, count=1)
+        else:
+            expression = f"SET {bump} {expression}"
+        params["UpdateExpression"] = expression
+
+        if record is not None:
+            if VERSION_ATTRIBUTE in record:
+                values[":recordVersionExpected"] = record[VERSION_ATTRIBUTE]
+                condition = "#recordVersion = :recordVersionExpected"
+            else:
+                condition = "attribute_not_exists(#recordVersion)"
+            if params.get("ConditionExpression"):
+                condition = f"({params['ConditionExpression']}) AND {condition}"
+            params["ConditionExpression"] = condition
+
+        params["ExpressionAttributeNames"] = names
+        params["ExpressionAttributeValues"] = values
+        return params
+
+
+_cache: Optional[AssetRecordCache] = None
+
+
+def get_asset_cache(table_name: Optional[str] = None) -> Optional[AssetRecordCache]:
+    """The container's cache for MEDIALAKE_ASSET_TABLE (None if not set)."""
+    global _cache
+    table_name = table_name or os.getenv("MEDIALAKE_ASSET_TABLE")
+    if not table_name:
+        return None
+    if _cache is None or _cache.table.name != table_name:
+        _cache = AssetRecordCache(boto3.resource("dynamodb").Table(table_name))
+    return _cache
@@ -0,0 +1,101 @@
+"""
+Shared embedding validation for the vector nodes and search.
+
+Embeddings arrive as JSON lists of numbers. They are converted to one float32
+NumPy matrix per call and checked in vectorised form (numeric type, dimension,
+NaN/Inf, norm) instead of element by element in Python. The returned values are
+what both the OpenSearch and the S3 Vectors writers send, so a vector is
+validated once however many stores it goes to.
+
+NumPy is not part of this layer; Lambdas that import this module list it in
+their own requirements.txt.
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Below this L2 norm a vector carries no direction (cosine is undefined)
+MIN_EMBEDDING_NORM = 1e-6
+
+
+class EmbeddingValidationError(ValueError):
+    """An embedding payload is not a usable vector."""
+
+
+def prepare_embeddings(
+    vectors: Sequence[Any],
+    *,
+    dimension: Optional[int] = None,
+    normalize: bool = False,
+    source: str = "embedding",
+) -> Tuple[np.ndarray, List[List[float]]]:
+    """
+    Validate a batch of embeddings.
+
+    Returns ``(matrix, values)``: the float32 ``(n, dim)`` matrix and the
+    per-vector lists to hand to the writers. Without *normalize* the values are
+    the input lists themselves (already validated, nothing re-serialised);
+    with it they are the L2-normalised rows.
+    """
+    if not vectors:
+        raise EmbeddingValidationError(f"No {source} vectors provided")
+
+    for i, vector in enumerate(vectors):
+        if not isinstance(vector, (list, tuple)) or not vector:
+            raise EmbeddingValidationError(
+                f"{source} {i} must be a non-empty list of numbers"
+            )
+
+    lengths = {len(v) for v in vectors}
+    if len(lengths) != 1:
+        raise EmbeddingValidationError(
+            f"{source} vectors have mixed dimensions: {sorted(lengths)}"
+        )
+    dim = lengths.pop()
+    if dimension is not None and dim != dimension:
+        raise EmbeddingValidationError(
+            f"{source} dimension is {dim}, expected {dimension}"
+        )
+
+    # Anything but ints/floats (strings, None, nested lists, bools) ends up as
+    # an object, string or bool array and is rejected without a Python loop.
+    raw = np.asarray(vectors)
+    if raw.ndim != 2 or raw.dtype.kind not in "iuf":
+        raise EmbeddingValidationError(
+            f"{source} vectors must contain only numbers (got {raw.dtype})"
+        )
+    with np.errstate(over="ignore"):  # overflow becomes Inf, reported below
+        matrix = raw.astype(np.float32, copy=False)
+
+    finite = np.isfinite(matrix).all(axis=1)
+    if not finite.all():
+        bad = np.flatnonzero(~finite)[:5].tolist()
+        raise EmbeddingValidationError(
+            f"{source} vectors contain NaN/Inf (or overflow float32) at {bad}"
+        )
+
+    norms = np.linalg.norm(matrix, axis=1)
+    degenerate = norms < MIN_EMBEDDING_NORM
+    if degenerate.any():
+        bad = np.flatnonzero(degenerate)[:5].tolist()
+        raise EmbeddingValidationError(f"{source} vectors have zero norm at {bad}")
+
+    if normalize:
+        matrix = matrix / norms[:, np.newaxis]
+        return matrix, matrix.tolist()
+    return matrix, [v if isinstance(v, list) else list(v) for v in vectors]
+
+
+def prepare_embedding(
+    vector: Any,
+    *,
+    dimension: Optional[int] = None,
+    normalize: bool = False,
+    source: str = "embedding",
+) -> Tuple[np.ndarray, List[float]]:
+    """Single-vector form of :func:`prepare_embeddings`."""
+    matrix, values = prepare_embeddings(
+        [vector], dimension=dimension, normalize=normalize, source=source
+    )
+    return matrix[0], values[0]
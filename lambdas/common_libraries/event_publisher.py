@@ -0,0 +1,270 @@
+"""
+Background EventBridge sender for pipeline step outputs.
+
+Entries are queued by the handler and sent by one daemon thread per container,
+up to 10 entries / 256 KB per ``PutEvents`` call. Entries EventBridge rejects
+as throttled or internal errors are retried with backoff; others are dropped
+and counted.
+
+With :meth:`EventPublisher.start_post_invoke_flush` (called during init) the
+queue is flushed by an internal Lambda extension once the handler has
+returned: the invocation's response goes to the caller straight away and the
+execution environment stays thawed until the extension is done, so the
+``PutEvents`` round trip is off the step's critical path. Without it (not in
+Lambda, registration failed) the caller flushes before returning, bounded by
+the Lambda deadline; anything still queued then is sent when the container
+is next thawed.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# PutEvents limits
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+_EXTENSION_API = "http://{api}/2020-01-01/extension"
+
+_RETRYABLE_ENTRY_ERRORS = {
+    "ThrottlingException",
+    "InternalException",
+    "InternalFailure",
+}
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """PutEvents size of an entry (as EventBridge counts it, near enough)."""
+    size = 14  # Time
+    for field in ("Source", "DetailType", "Detail"):
+        size += len(entry.get(field, "").encode("utf-8"))
+    return size + sum(len(r.encode("utf-8")) for r in entry.get("Resources", []))
+
+
+class EventPublisher:
+    """Bounded queue of PutEvents entries drained by a background thread."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        max_queue: int = 100,
+        max_attempts: int = 5,
+        logger: Optional[Any] = None,
+    ):
+        self.client = client
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.logger = logger
+
+        self._queue: deque = deque()  # (entry, enqueued_at, attempts)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # Request IDs of invocations whose handler returned; set up by
+        # start_post_invoke_flush, waited on by the extension
+        self._done: Optional[threading.Condition] = None
+        self._done_ids: set = set()
+
+        # Collected by the invocation for metrics (see drain_stats)
+        self._lags_ms: List[float] = []
+        self._failed = 0
+
+    # ---------------------------------------------------------------- producer
+    def submit(self, entry: Dict[str, Any], timeout: float = 0.0) -> bool:
+        """Queue *entry*; waits up to *timeout* for room. False if dropped."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(self._queue) >= self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._failed += 1
+                    return False
+                self._cond.wait(remaining)
+            self._queue.append((entry, time.monotonic(), 0))
+            self._ensure_thread()
+            self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float) -> int:
+        """Wait up to *timeout* seconds for the queue to drain; returns pending."""
+        deadline = time.monotonic() + max(timeout, 0.0)
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+        return self.pending()
+
+    def pending(self) -> int:
+        """Entries queued or being sent."""
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def drain_stats(self) -> Dict[str, Any]:
+        """Publish lags (ms) and failed entries since the last call."""
+        with self._cond:
+            stats = {"lags_ms": self._lags_ms, "failed": self._failed}
+            self._lags_ms, self._failed = [], 0
+        return stats
+
+    # ------------------------------------------------------- post-invoke flush
+    @property
+    def deferred(self) -> bool:
+        """True when the extension flushes after each invocation."""
+        return self._done is not None
+
+    def start_post_invoke_flush(
+        self, name: str = "event-publisher", margin_s: float = 1.0
+    ) -> bool:
+        """
+        Register an internal extension that flushes the queue after each
+        invocation, up to *margin_s* before its deadline. Only possible during
+        the init phase; returns False when not running in Lambda or when
+        registration fails (the caller then flushes itself).
+        """
+        api = os.getenv("AWS_LAMBDA_RUNTIME_API")
+        if not api or self._done is not None:
+            return self._done is not None
+        request = urllib.request.Request(
+            f"{_EXTENSION_API.format(api=api)}/register",
+            data=json.dumps({"events": ["INVOKE"]}).encode(),
+            headers={"Lambda-Extension-Name": name},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=2) as response:
+                extension_id = response.headers["Lambda-Extension-Identifier"]
+        except Exception as exc:  # noqa: BLE001
+            self._log_error(f"Extension registration failed: {exc}")
+            return False
+        self._done = threading.Condition()
+        threading.Thread(
+            target=self._extension_loop,
+            args=(api, extension_id, margin_s),
+            name="event-publisher-extension",
+            daemon=True,
+        ).start()
+        return True
+
+    def invocation_done(self, request_id: str) -> None:
+        """Tell the extension the handler of *request_id* has returned."""
+        if self._done is not None:
+            with self._done:
+                self._done_ids.add(request_id)
+                self._done.notify_all()
+
+    def _extension_loop(self, api: str, extension_id: str, margin_s: float) -> None:
+        next_event = urllib.request.Request(
+            f"{_EXTENSION_API.format(api=api)}/event/next",
+            headers={"Lambda-Extension-Identifier": extension_id},
+        )
+        while True:
+            # Asking for the next event tells Lambda this extension is done
+            # with the previous invocation; blocks until the next one starts
+            with urllib.request.urlopen(next_event) as response:
+                event = json.loads(response.read())
+            if event.get("eventType") != "INVOKE":
+                return
+            # Wait for this invocation's handler (a handler that overran the
+            # deadline is timed out by Lambda anyway), then flush what it
+            # queued; IDs of earlier invocations reported late are dropped
+            request_id = event.get("requestId")
+            deadline = event.get("deadlineMs", 0) / 1000
+            with self._done:
+                returned = self._done.wait_for(
+                    lambda: request_id in self._done_ids,
+                    timeout=max(deadline - time.time(), 0),
+                )
+                self._done_ids.clear()
+            if returned:
+                self.flush(deadline - margin_s - time.time())
+
+    # ---------------------------------------------------------------- consumer
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="event-publisher", daemon=True
+            )
+            self._thread.start()
+
+    def _next_batch(self) -> List[tuple]:
+        """Pop up to one PutEvents call's worth of entries (lock held)."""
+        batch, size = [], 0
+        while self._queue and len(batch) < MAX_BATCH_ENTRIES:
+            item_size = entry_size(self._queue[0][0])
+            if batch and size + item_size > MAX_BATCH_BYTES:
+                break
+            batch.append(self._queue.popleft())
+            size += item_size
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                batch = self._next_batch()
+                self._in_flight = len(batch)
+                self._cond.notify_all()  # room in the queue
+
+            statuses = self._send(batch)
+            sent_at = time.monotonic()
+            retry = [item for item, st in zip(batch, statuses) if st == "retry"]
+
+            with self._cond:
+                for (_, enqueued, _), status in zip(batch, statuses):
+                    if status == "sent":
+                        self._lags_ms.append((sent_at - enqueued) * 1000)
+                    elif status == "failed":
+                        self._failed += 1
+                for entry, enqueued, attempts in reversed(retry):
+                    if attempts + 1 >= self.max_attempts:
+                        self._failed += 1
+                        self._log_error(
+                            f"Dropping {entry.get('DetailType')} event after "
+                            f"{self.max_attempts} attempts"
+                        )
+                    else:
+                        self._queue.appendleft((entry, enqueued, attempts + 1))
+                self._in_flight = 0
+                self._cond.notify_all()
+
+            if retry:
+                attempt = max(a for _, _, a in retry)
+                time.sleep(random.uniform(0, min(0.1 * 2**attempt, 2.0)))
+
+    def _send(self, batch: List[tuple]) -> List[str]:
+        """Send one batch; returns "sent" / "retry" / "failed" per entry."""
+        try:
+            response = self.client.put_events(Entries=[e for e, _, _ in batch])
+        except Exception as exc:  # noqa: BLE001
+            self._log_error(f"EventBridge publish failed: {exc}")
+            return ["retry"] * len(batch)
+
+        if not response.get("FailedEntryCount"):
+            return ["sent"] * len(batch)
+        statuses = []
+        for result in response.get("Entries", []):
+            code = result.get("ErrorCode")
+            if not code:
+                statuses.append("sent")
+            elif code in _RETRYABLE_ENTRY_ERRORS:
+                statuses.append("retry")
+            else:
+                statuses.append("failed")
+                self._log_error(
+                    f"EventBridge rejected step output event: {code} "
+                    f"{result.get('ErrorMessage', '')}"
+                )
+        return statuses
+
+    def _log_error(self, message: str) -> None:
+        if self.logger:
+            self.logger.error(message)
@@ -0,0 +1,255 @@
+"""
+Compressed, content-addressed store for step payloads that are too large to
+pass through Step Functions / EventBridge.
+
+Objects are written under ``steps/<pipelineExecutionId>/<stepName>/<sha256>``
+so a step never overwrites another step's output and writing the same payload
+twice (retries, re-runs of a step) is a HEAD request instead of an upload.
+
+Payloads are compressed with gzip (or zstd, when ``EXTERNAL_PAYLOAD_CODEC=zstd``
+and the ``zstandard`` package is available). A JSON list is written as one
+compressed member/frame per item; both formats decode a concatenation of
+members as a whole, so the object still decompresses to the plain JSON list,
+while a small ``.index.json`` sidecar with the member byte ranges lets a
+consumer fetch a single item with a ranged GET (see :meth:`load_item`).
+
+Locations are the ``stepExternalPayloadLocation`` dicts the middleware
+already passes around; older locations without ``encoding`` (plain JSON
+written under the execution id) are still readable.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+KEY_PREFIX = "steps"
+
+_EXTENSIONS = {"gzip": ".json.gz", "zstd": ".json.zst"}
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+def _resolve_codec(codec: Optional[str]) -> str:
+    codec = (codec or os.getenv("EXTERNAL_PAYLOAD_CODEC") or "gzip").lower()
+    if codec not in _EXTENSIONS:
+        raise ValueError(f"Unsupported external payload codec: {codec}")
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec
+
+
+def _compress(raw: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+    return gzip.compress(raw, compresslevel=_GZIP_LEVEL, mtime=0)
+
+
+def _decompress(body: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd payload but the zstandard package is missing")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(body), read_across_frames=True
+        )
+        return reader.read()
+    return gzip.decompress(body)
+
+
+class ExternalPayloadStore:
+    """Writer/reader for off-loaded step payloads in one bucket."""
+
+    def __init__(
+        self,
+        bucket: str,
+        s3_client: Optional[Any] = None,
+        codec: Optional[str] = None,
+    ):
+        self.bucket = bucket
+        self.s3 = s3_client or boto3.client("s3")
+        self.codec = _resolve_codec(codec)
+        # sidecar index key -> member byte ranges, for repeated load_item calls
+        self._ranges: Dict[str, List[List[int]]] = {}
+
+    # ------------------------------------------------------------------ write
+    def put(
+        self,
+        raw: bytes,
+        *,
+        execution_id: str,
+        step_name: str,
+        items: Optional[List[bytes]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store the JSON bytes *raw* and return its location.
+
+        *items*, when given, are the encoded elements of a JSON list such that
+        ``raw == b"[" + b", ".join(items) + b"]"``; the object is then written
+        item by item so single items can be range-read.
+        """
+        digest = hashlib.sha256(raw).hexdigest()
+        key = "/".join(
+            (KEY_PREFIX, execution_id, step_name, digest + _EXTENSIONS[self.codec])
+        )
+        location: Dict[str, Any] = {
+            "bucket": self.bucket,
+            "key": key,
+            "encoding": self.codec,
+            "sha256": digest,
+            "size": len(raw),
+        }
+        if items is not None:
+            location["itemCount"] = len(items)
+            location["indexKey"] = f"{key}.index.json"
+
+        if self._exists(key):
+            return location
+
+        if items is None:
+            body = _compress(raw, self.codec)
+        else:
+            members = [
+                _compress((b"[" if i == 0 else b", ") + item, self.codec)
+                for i, item in enumerate(items)
+            ]
+            members.append(_compress(b"]" if items else b"[]", self.codec))
+            ranges, offset = [], 0
+            for member in members[:-1]:
+                ranges.append([offset, offset + len(member)])
+                offset += len(member)
+            body = b"".join(members)
+            # Sidecar first: an object that exists always has its index
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=location["indexKey"],
+                Body=json.dumps(ranges, separators=(",", ":")).encode(),
+                ContentType="application/json",
+            )
+
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ContentType="application/json",
+            ContentEncoding=self.codec,
+            Metadata={"sha256": digest, "uncompressed-size": str(len(raw))},
+        )
+        return location
+
+    def put_json(
+        self,
+        data: Any,
+        *,
+        execution_id: str,
+        step_name: str,
+        default: Optional[Callable[[Any], Any]] = None,
+    ) -> Dict[str, Any]:
+        """Encode *data* and :meth:`put` it (lists are stored item by item)."""
+        if isinstance(data, list):
+            items = [json.dumps(item, default=default).encode() for item in data]
+            raw = b"[" + b", ".join(items) + b"]"
+            return self.put(
+                raw, execution_id=execution_id, step_name=step_name, items=items
+            )
+        return self.put(
+            json.dumps(data, default=default).encode(),
+            execution_id=execution_id,
+            step_name=step_name,
+        )
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            # Without s3:ListBucket a missing key is reported as 403; either
+            # way upload, and a real permission problem fails the put instead
+            if e.response.get("Error", {}).get("Code") in (
+                "404",
+                "403",
+                "NoSuchKey",
+                "NotFound",
+            ):
+                return False
+            raise
+
+    # ------------------------------------------------------------------- read
+    def load_bytes(self, location: Dict[str, Any]) -> bytes:
+        """The uncompressed JSON bytes at *location*."""
+        obj = self.s3.get_object(Bucket=location["bucket"], Key=location["key"])
+        body = obj["Body"].read()
+        encoding = location.get("encoding")
+        return _decompress(body, encoding) if encoding else body
+
+    def load(self, location: Dict[str, Any]) -> Any:
+        """The whole payload at *location* (dict or list)."""
+        return json.loads(self.load_bytes(location))
+
+    def load_item(self, location: Dict[str, Any], index: int) -> Any:
+        """
+        Element *index* of a list payload.
+
+        Stored item by item, only that item's bytes are fetched (ranged GET);
+        otherwise the whole payload is loaded and indexed.
+        """
+        index_key = location.get("indexKey")
+        if not index_key:
+            data = self.load(location)
+            return data[index] if isinstance(data, list) else data
+
+        ranges = self._ranges.get(index_key)
+        if ranges is None:
+            obj = self.s3.get_object(Bucket=location["bucket"], Key=index_key)
+            ranges = self._ranges[index_key] = json.loads(obj["Body"].read())
+        start, end = ranges[index]
+        obj = self.s3.get_object(
+            Bucket=location["bucket"],
+            Key=location["key"],
+            Range=f"bytes={start}-{end - 1}",
+        )
+        raw = _decompress(obj["Body"].read(), location["encoding"])
+        # drop the "[" or "," that precedes the item (whitespace is fine)
+        return json.loads(raw[1:])
+
+    def lazy(self, location: Dict[str, Any]) -> "LazyPayload":
+        """A handle that fetches the payload (or single items) on first use."""
+        return LazyPayload(self, location)
+
+
+class LazyPayload:
+    """Deferred view of an off-loaded payload."""
+
+    def __init__(self, store: ExternalPayloadStore, location: Dict[str, Any]):
+        self.store = store
+        self.location = location
+        self._value: Any = None
+        self._loaded = False
+
+    @property
+    def value(self) -> Any:
+        if not self._loaded:
+            self._value = self.store.load(self.location)
+            self._loaded = True
+        return self._value
+
+    def __len__(self) -> int:
+        if "itemCount" in self.location:
+            return self.location["itemCount"]
+        return len(self.value)
+
+    def __getitem__(self, index: int) -> Any:
+        if self._loaded or "indexKey" not in self.location:
+            return self.value[index]
+        if index < 0:
+            index += len(self)
+        return self.store.load_item(self.location, index)
@@ -1,5 +1,4 @@
 # middleware.py
-import copy
 import json
 import os
 import time
@@ -9,9 +8,14 @@ from decimal import Decimal
 from typing import Any, Callable, Dict, Optional, TypeVar
 
 import boto3
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.middleware_factory import lambda_handler_decorator
-from botocore.exceptions import ClientError  # already imported? keep just once
+from botocore.exceptions import ClientError
+from event_publisher import EventPublisher
+from external_payload_store import ExternalPayloadStore
+from step_profiler import StepProfiler, should_profile
 
 R = TypeVar("R")
 
@@ -25,6 +29,64 @@ def _json_default(o):
     raise TypeError
 
 
+def _encode(o: Any) -> bytes:
+    return json.dumps(o, default=_json_default).encode()
+
+
+def _envelope_bytes(
+    meta_raw: bytes, data_raw: bytes, assets_raw: bytes, map_raw: Optional[bytes]
+) -> bytes:
+    """
+    Join separately encoded parts into the bytes json.dumps would produce for
+    {"metadata": ..., "payload": {"data": ..., "assets": ..., "map": ...}}.
+    """
+    parts = [
+        b'{"metadata": ',
+        meta_raw,
+        b', "payload": {"data": ',
+        data_raw,
+        b', "assets": ',
+        assets_raw,
+    ]
+    if map_raw is not None:
+        parts += [b', "map": ', map_raw]
+    parts.append(b"}}")
+    return b"".join(parts)
+
+
+# Bytes _envelope_bytes adds around the encoded parts (without / with map)
+_ENVELOPE_OVERHEAD = len(_envelope_bytes(b"", b"", b"", None))
+_MAP_OVERHEAD = len(b', "map": ')
+
+
+def _event_asset(asset: Any) -> Any:
+    """
+    The part of an asset record that step-output rules match on
+    (detail.payload.assets.DigitalSourceAsset.Type, MainRepresentation.Format
+    and, for triggers with a Prefix, MainRepresentation.StorageInfo
+    .PrimaryLocation.ObjectKey.Path; see post_pipelines/eventbridge.py).
+    Records without an InventoryID cannot be re-read, so they are kept whole.
+    """
+    if not isinstance(asset, Mapping) or not asset.get("InventoryID"):
+        return asset
+    trimmed: Dict[str, Any] = {"InventoryID": asset["InventoryID"]}
+    dsa = asset.get("DigitalSourceAsset")
+    if isinstance(dsa, Mapping):
+        main = dsa.get("MainRepresentation") or {}
+        location = (main.get("StorageInfo") or {}).get("PrimaryLocation") or {}
+        main_trimmed: Dict[str, Any] = {"Format": main.get("Format")}
+        if location.get("ObjectKey") is not None:
+            main_trimmed["StorageInfo"] = {
+                "PrimaryLocation": {"ObjectKey": location["ObjectKey"]}
+            }
+        trimmed["DigitalSourceAsset"] = {
+            "ID": dsa.get("ID"),
+            "Type": dsa.get("Type"),
+            "MainRepresentation": main_trimmed,
+        }
+    return trimmed
+
+
 def safe_pop(d: Any, key: str, default: Any = "") -> Any:
     if isinstance(d, Mapping):
         return d.pop(key, default)
@@ -52,6 +114,26 @@ class LambdaMiddleware:
         {metadata, payload:{data, assets, map:{item}}}
     and guarantees that metadata.pipelineExecutionId / metadata.pipelineId
     survive every hop (Step Functions wrappers, Map iterators, etc.).
+
+    The incoming event is owned by this invocation, so the standardised event
+    and the output share its sub-objects (assets, map block, data) rather than
+    copying them. The output is encoded once; the same bytes decide the S3
+    off-load, become the off-loaded object and make up the EventBridge detail.
+
+    Step-output events carry the full metadata, the data when it is small and
+    only the matched-on fields of each asset (metadata.eventTrimmed); a
+    pipeline started by such an event re-reads the assets from DynamoDB. They
+    are sent by a background EventPublisher that an internal Lambda extension
+    flushes after the response has been returned
+    (STEP_OUTPUT_PUBLISH_DEFERRED, default on); without the extension the
+    handler flushes before returning, bounded by the Lambda deadline. Publish
+    lag / failures of earlier invocations are recorded as metrics at the start
+    of the next one, so the handler's log_metrics emits them.
+
+    Invocations selected by step_profiler.should_profile (STEP_PROFILE_*)
+    run the inner handler under a profiler; the profile is written to the
+    external payload bucket under the pipelineTraceId and located by
+    metadata.stepProfileLocation.
     """
 
     # --------------------------------------------------------------------- init
@@ -77,7 +159,18 @@ class LambdaMiddleware:
         self.max_retries = max_retries
 
         self.eb = boto3.client("events")
+        self.publisher = EventPublisher(
+            self.eb,
+            max_queue=int(os.getenv("STEP_OUTPUT_PUBLISH_QUEUE_SIZE", "100")),
+        )
+        # Data larger than this is left out of the step-output event
+        self.event_max_data_bytes = int(
+            os.getenv("STEP_OUTPUT_EVENT_MAX_DATA_BYTES", str(8 * 1024))
+        )
+        # Time kept back from the Lambda deadline when flushing the publisher
+        self.publish_margin_ms = int(os.getenv("STEP_OUTPUT_PUBLISH_MARGIN_MS", "1000"))
         self.s3 = boto3.client("s3")
+        self.payload_store = ExternalPayloadStore(self.external_payload_bucket, self.s3)
 
         # Service metadata
         self.service = os.getenv("SERVICE", "undefined_service")
@@ -88,16 +181,19 @@ class LambdaMiddleware:
 
         # Observability
         self.logger = Logger(service=self.service)
+        self.publisher.logger = self.logger
+        if os.getenv("STEP_OUTPUT_PUBLISH_DEFERRED", "true").lower() == "true":
+            self.publisher.start_post_invoke_flush(
+                margin_s=self.publish_margin_ms / 1000
+            )
         self.metrics = Metrics(namespace="MediaLake", service=self.service)
         self.tracer = Tracer(service=self.service)
 
-        # DynamoDB (optional)
+        # DynamoDB (optional); reads go through the per-execution record cache
+        # that nodes share via asset_record_cache.get_asset_cache()
         self.assets_table_name = assets_table_name or os.getenv("MEDIALAKE_ASSET_TABLE")
-        if self.assets_table_name:
-            self.ddb = boto3.resource("dynamodb")
-            self.assets_table = self.ddb.Table(self.assets_table_name)
-        else:
-            self.ddb = self.assets_table = None
+        self.asset_cache = get_asset_cache(self.assets_table_name)
+        self.assets_table = self.asset_cache.table if self.asset_cache else None
 
     # ---------------------------------------------------------- private helpers
     @staticmethod
@@ -114,12 +210,14 @@ class LambdaMiddleware:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # DDB asset fetch
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-    def _fetch_asset_record(self, inventory_id: str) -> Optional[Dict[str, Any]]:
-        if not self.assets_table:
+    def _fetch_asset_record(
+        self, inventory_id: str, execution_id: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        if not self.asset_cache:
             return None
         try:
-            resp = self.assets_table.get_item(Key={"InventoryID": inventory_id})
-            return resp.get("Item")
+            self.asset_cache.begin_execution(execution_id)
+            return self.asset_cache.get(inventory_id)
         except Exception as exc:  # noqa: BLE001
             self.logger.error(f"DDB lookup failed for {inventory_id}: {exc}")
             return None
@@ -138,14 +236,10 @@ class LambdaMiddleware:
         meta = ev.get("metadata", {})
         if meta.get("stepExternalPayload") == "True":
             loc = meta.get("stepExternalPayloadLocation", {})
-            bucket = loc.get("bucket")
-            key = loc.get("key")
 
             data: Any = {}
-            if bucket and key:
-                obj = self.s3.get_object(Bucket=bucket, Key=key)
-                body = obj["Body"].read().decode("utf-8")
-                data = json.loads(body)  # dict OR list – keep as-is
+            if loc.get("bucket") and loc.get("key"):
+                data = self.payload_store.load(loc)  # dict OR list – keep as-is
 
             return {
                 "metadata": meta,
@@ -155,7 +249,7 @@ class LambdaMiddleware:
                 },
             }
 
-        self.logger.info("Original input event", extra={"event": ev})
+        self.logger.debug("Original input event", extra={"event": ev})
 
         # ── 1. Step-Functions top-level wrapper (payload present) ───────────
         if (
@@ -164,8 +258,7 @@ class LambdaMiddleware:
             and isinstance(ev.get("payload"), dict)
         ):
             exec_id, pipe_id = _pick_pipeline_ids(ev)
-            inner_event = copy.deepcopy(ev["payload"])
-            std_inner = self._standardize_input(inner_event)
+            std_inner = self._standardize_input(ev["payload"])
             std_inner.setdefault("metadata", {})
             std_inner["metadata"]["pipelineExecutionId"] = exec_id
             std_inner["metadata"]["pipelineId"] = pipe_id
@@ -174,22 +267,21 @@ class LambdaMiddleware:
 
         # ── 2. Map/Task wrapper containing inventory_id ─────────────────────
         if isinstance(ev.get("item"), dict) and ev["item"].get("inventory_id"):
-            item_obj = copy.deepcopy(ev["item"])
+            # did the Map placeholder indicate off-load? (shallow copy without
+            # the off-load flags; the item's values are shared, not copied)
+            item_obj = {
+                k: v
+                for k, v in ev["item"].items()
+                if k not in ("stepExternalPayload", "stepExternalPayloadLocation")
+            }
             inventory_id = item_obj["inventory_id"]
-
-            # did the Map placeholder indicate off-load?
-            step_ext = item_obj.pop("stepExternalPayload", False)
-            step_ext_loc = item_obj.pop("stepExternalPayloadLocation", {})
+            step_ext = ev["item"].get("stepExternalPayload", False)
+            step_ext_loc = ev["item"].get("stepExternalPayloadLocation", {})
 
             if step_ext:
-                bucket = step_ext_loc.get("bucket")
-                key = step_ext_loc.get("key")
                 data = {}
-
-                if bucket and key:
-                    obj = self.s3.get_object(Bucket=bucket, Key=key)
-                    body = obj["Body"].read().decode("utf-8")
-                    data = json.loads(body)
+                if step_ext_loc.get("bucket") and step_ext_loc.get("key"):
+                    data = self.payload_store.load(step_ext_loc)
 
                 meta = {
                     "service": self.service,
@@ -208,8 +300,8 @@ class LambdaMiddleware:
                 }
 
             # ---- normal Map/Task path ----
-            asset_rec = self._fetch_asset_record(inventory_id)
             exec_id, pipe_id = _pick_pipeline_ids(ev)
+            asset_rec = self._fetch_asset_record(inventory_id, exec_id)
 
             meta = {
                 "service": self.service,
@@ -250,6 +342,16 @@ class LambdaMiddleware:
                 exec_id, pipe_id = _pick_pipeline_ids(ev)
                 detail.setdefault("pipelineExecutionId", exec_id)
                 detail.setdefault("pipelineId", pipe_id)
+                if detail["metadata"].get("eventTrimmed"):
+                    # step-output event: assets carry only their match fields
+                    detail["payload"]["assets"] = [
+                        (
+                            self._fetch_asset_record(a["InventoryID"], exec_id) or a
+                            if isinstance(a, dict) and a.get("InventoryID")
+                            else a
+                        )
+                        for a in detail["payload"]["assets"]
+                    ]
                 return detail
 
         # ── 3) Plain EventBridge envelope (detail *not* standardised) ─────────
@@ -271,7 +373,7 @@ class LambdaMiddleware:
                 "metadata": meta,
                 "payload": {
                     "data": {},
-                    "assets": [copy.deepcopy(ev["detail"])],
+                    "assets": [ev["detail"]],
                 },
             }
 
@@ -292,25 +394,31 @@ class LambdaMiddleware:
         if isinstance(ev.get("payload"), dict) and isinstance(
             ev["payload"].get("assets"), list
         ):
-            payload["assets"] = copy.deepcopy(ev["payload"]["assets"])
+            payload["assets"] = ev["payload"]["assets"]
         elif isinstance(ev.get("assets"), list):
-            payload["assets"] = copy.deepcopy(ev["assets"])
+            payload["assets"] = ev["assets"]
 
         if isinstance(ev.get("payload"), dict) and isinstance(
             ev["payload"].get("map"), dict
         ):
-            payload["map"] = copy.deepcopy(ev["payload"]["map"])
+            payload["map"] = ev["payload"]["map"]
         elif isinstance(ev.get("map"), dict):
-            payload["map"] = copy.deepcopy(ev["map"])
+            payload["map"] = ev["map"]
 
         return {"metadata": meta, "payload": payload}
 
-    # ---------------------------------------------------------------- make_out
-    # ---------------------------------------------------------------- make_out
     # ---------------------------------------------------------------- make_out
     def _make_output(
-        self, result: Any, orig: Dict[str, Any], step_start: float
-    ) -> Dict[str, Any]:
+        self,
+        result: Any,
+        orig: Dict[str, Any],
+        step_start: float,
+        profile_location: Optional[Dict[str, Any]] = None,
+    ) -> tuple[Dict[str, Any], bytes]:
+        """
+        Build the output envelope and its JSON encoding (returned together so
+        the encoding can be published without serialising the envelope again).
+        """
 
         # ───────────────────────── 0. Metadata build (unchanged) ─────────────────────────
         now = time.time()
@@ -363,8 +471,10 @@ class LambdaMiddleware:
             "stepExternalPayload": "False",
             "stepExternalPayloadLocation": {},
         }
+        if profile_location:
+            meta["stepProfileLocation"] = profile_location
 
-        # ───────────────────────── 1. Assets gather (unchanged) ─────────────────────────
+        # ───────────────────────── 1. Assets gather (shared, not copied) ─────────────────
         def _inner_assets(obj: Any) -> list:
             if (
                 isinstance(obj, dict)
@@ -372,11 +482,11 @@ class LambdaMiddleware:
                 and isinstance(obj.get("payload"), dict)
                 and isinstance(obj["payload"].get("assets"), list)
             ):
-                return copy.deepcopy(obj["payload"]["assets"])
-            return [copy.deepcopy(obj)]
+                return list(obj["payload"]["assets"])
+            return [obj]
 
         if isinstance(result, dict) and "updatedAsset" in result:
-            assets = [copy.deepcopy(result.pop("updatedAsset"))]
+            assets = [result.pop("updatedAsset")]
         else:
             asset_from_detail = (
                 orig.get("input", {}).get("detail")
@@ -388,9 +498,9 @@ class LambdaMiddleware:
                 if isinstance(orig.get("payload"), dict) and isinstance(
                     orig["payload"].get("assets"), list
                 ):
-                    prev_assets = copy.deepcopy(orig["payload"]["assets"])
+                    prev_assets = list(orig["payload"]["assets"])
                 elif isinstance(orig.get("assets"), list):
-                    prev_assets = copy.deepcopy(orig["assets"])
+                    prev_assets = list(orig["assets"])
             assets = prev_assets + (
                 _inner_assets(asset_from_detail) if asset_from_detail else []
             )
@@ -400,7 +510,7 @@ class LambdaMiddleware:
         if isinstance(orig.get("payload"), dict) and isinstance(
             orig["payload"].get("map"), dict
         ):
-            map_block = copy.deepcopy(orig["payload"]["map"])
+            map_block = orig["payload"]["map"]
 
         # initial payload
         payload: Dict[str, Any] = {"data": data, "assets": assets}
@@ -408,22 +518,38 @@ class LambdaMiddleware:
             payload["map"] = map_block
 
         # ───────────────────────── 2. Off-load logic ─────────────────────────
-        candidate_raw = json.dumps(
-            {"metadata": meta, "payload": payload}, default=_json_default
-        ).encode()
-        if len(candidate_raw) > self.max_response_size:
-
-            # a) off-load only DATA blob
-            key = meta["pipelineExecutionId"]
-            self.s3.put_object(
-                Bucket=self.external_payload_bucket,
-                Key=key,
-                Body=json.dumps(payload["data"], default=_json_default).encode(),
-                ContentType="application/json",
+        # Encode part by part and stop once the envelope is known to be too
+        # large: the off-loaded envelope drops assets and map, so they are
+        # never encoded in that case.
+        # Lists are encoded item by item (same bytes) so an off-load can be
+        # stored with per-item ranges
+        item_raws = None
+        if isinstance(data, list):
+            item_raws = [_encode(item) for item in data]
+            data_raw = b"[" + b", ".join(item_raws) + b"]"
+        else:
+            data_raw = _encode(data)
+        size = _ENVELOPE_OVERHEAD + len(_encode(meta)) + len(data_raw)
+        assets_raw = map_raw = None
+        if size <= self.max_response_size:
+            assets_raw = _encode(assets)
+            size += len(assets_raw)
+        if size <= self.max_response_size and map_block:
+            map_raw = _encode(map_block)
+            size += _MAP_OVERHEAD + len(map_raw)
+
+        if size > self.max_response_size:
+
+            # a) off-load only DATA blob (already encoded above), compressed
+            #    under a content-hash key for this step
+            location = self.payload_store.put(
+                data_raw,
+                execution_id=meta["pipelineExecutionId"] or meta["pipelineTraceId"],
+                step_name=self.step_name,
+                items=item_raws,
             )
             self.logger.info(
-                "[middleware] Off-loaded data to S3",
-                extra={"bucket": self.external_payload_bucket, "key": key},
+                "[middleware] Off-loaded data to S3", extra={"location": location}
             )
 
             # b) create lightweight placeholders
@@ -438,10 +564,7 @@ class LambdaMiddleware:
                 {
                     "inventory_id": inv_id,
                     "stepExternalPayload": True,
-                    "stepExternalPayloadLocation": {
-                        "bucket": self.external_payload_bucket,
-                        "key": key,
-                    },
+                    "stepExternalPayloadLocation": location,
                 }
             ]
 
@@ -451,58 +574,154 @@ class LambdaMiddleware:
             payload.pop("map", None)  # drop map block entirely
 
             meta["stepExternalPayload"] = "True"
-            meta["stepExternalPayloadLocation"] = {
-                "bucket": self.external_payload_bucket,
-                "key": key,
-            }
+            meta["stepExternalPayloadLocation"] = location
+            data_raw, assets_raw, map_raw = _encode(placeholder_list), b"[]", None
 
         # ───────────────────────── 3. Return ─────────────────────────
         final_out = {"metadata": meta, "payload": payload}
-        final_size = len(json.dumps(final_out, default=_json_default).encode())
+        final_size = (
+            _ENVELOPE_OVERHEAD + len(_encode(meta)) + len(data_raw) + len(assets_raw)
+        )
+        if map_raw is not None:
+            final_size += _MAP_OVERHEAD + len(map_raw)
         self.logger.info(
             "[middleware] Final output size (bytes)", extra={"bytes": final_size}
         )
-        print(final_out)
-        return final_out
+        return final_out, data_raw
 
     # ---------------------------------------------------------------- publish
-    def _publish(self, out: Dict[str, Any]):
+    def _event_detail(self, out: Dict[str, Any], data_raw: bytes) -> str:
+        """Step-output event detail, reusing the encoded data."""
+        meta_raw = _encode({**out["metadata"], "eventTrimmed": True})
+        if len(data_raw) > self.event_max_data_bytes:
+            data_raw = b"{}"
+        assets_raw = _encode([_event_asset(a) for a in out["payload"]["assets"]])
+        return _envelope_bytes(meta_raw, data_raw, assets_raw, None).decode()
+
+    def _publish(self, out: Dict[str, Any], data_raw: bytes, ctx: Any) -> None:
+        """
+        Queue the step-output event. The extension sends it after the
+        response; without one, flush within the invocation deadline.
+        """
+        remaining_ms = (
+            ctx.get_remaining_time_in_millis()
+            if hasattr(ctx, "get_remaining_time_in_millis")
+            else 30_000
+        )
+        budget_s = max(remaining_ms - self.publish_margin_ms, 0) / 1000
+        deadline = time.monotonic() + budget_s
+        self.publisher.submit(
+            {
+                "Source": self.service,
+                "DetailType": f"{self.step_name}Output",
+                "Detail": self._event_detail(out, data_raw),
+                "EventBusName": self.event_bus_name,
+            },
+            timeout=deadline - time.monotonic(),
+        )
+        if self.publisher.deferred:
+            return
+        pending = self.publisher.flush(deadline - time.monotonic())
+        if pending:
+            self.logger.warning(
+                "[middleware] Step-output events still queued at the deadline",
+                extra={"pending": pending},
+            )
+
+    def _record_publish_stats(self) -> None:
+        """Metrics for the events sent since the previous invocation."""
+        stats = self.publisher.drain_stats()
+        for lag in stats["lags_ms"]:
+            self.metrics.add_metric(
+                name="StepOutputPublishLag", unit=MetricUnit.Milliseconds, value=lag
+            )
+        if stats["failed"]:
+            self.metrics.add_metric(
+                name="StepOutputPublishFailures",
+                unit=MetricUnit.Count,
+                value=stats["failed"],
+            )
+        pending = self.publisher.pending()
+        if pending:
+            self.metrics.add_metric(
+                name="StepOutputPublishPending", unit=MetricUnit.Count, value=pending
+            )
+
+    # ---------------------------------------------------------------- profile
+    def _start_profiler(self) -> Optional[StepProfiler]:
+        if not should_profile(self.pipe_name):
+            return None
         try:
-            self.eb.put_events(
-                Entries=[
-                    {
-                        "Source": self.service,
-                        "DetailType": f"{self.step_name}Output",
-                        "Detail": json.dumps(out, default=_json_default),
-                        "EventBusName": self.event_bus_name,
-                    }
-                ]
+            profiler = StepProfiler(self.s3, self.external_payload_bucket)
+            profiler.start()
+            return profiler
+        except Exception as exc:  # noqa: BLE001
+            self.logger.warning(f"[middleware] Profiler not started: {exc}")
+            return None
+
+    def _finish_profiler(
+        self, profiler: Optional[StepProfiler], event: Dict[str, Any], ctx: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Upload the profile; a failure here never fails the step."""
+        if profiler is None:
+            return None
+        meta = event.setdefault("metadata", {})
+        trace_id = meta.setdefault("pipelineTraceId", str(uuid.uuid4()))
+        try:
+            location = profiler.stop_and_upload(
+                trace_id,
+                self.step_name,
+                getattr(ctx, "aws_request_id", None) or str(uuid.uuid4()),
             )
         except Exception as exc:  # noqa: BLE001
-            self.logger.error(f"EventBridge publish failed: {exc}")
+            self.logger.warning(f"[middleware] Profile upload failed: {exc}")
+            return None
+        self.logger.info("[middleware] Step profile written", extra=location)
+        return location
 
     # ----------------------------------------------------------------- caller
     def __call__(self, handler: Callable[..., R]) -> Callable[..., R]:
         @lambda_handler_decorator
         def wrap(inner, event, ctx):
-            raw = self._true_original(event)
-            standard_event = self._standardize_input(copy.deepcopy(raw))
+            try:
+                return run(inner, event, ctx)
+            finally:
+                self.publisher.invocation_done(getattr(ctx, "aws_request_id", None))
 
+        def run(inner, event, ctx):
+            self._record_publish_stats()
+            raw = self._true_original(event)
+            standard_event = self._standardize_input(raw)
+            if self.asset_cache:
+                # the envelope carries the latest records of this execution
+                self.asset_cache.begin_execution(
+                    standard_event["metadata"].get("pipelineExecutionId")
+                )
+                self.asset_cache.seed(standard_event["payload"].get("assets") or [])
+
+            profiler = self._start_profiler()
             start = time.time()
             retries = 0
-            while True:
-                try:
-                    result = inner(standard_event, ctx)
-                    break
-                except Exception:  # noqa: BLE001
-                    if retries < self.max_retries:
-                        retries += 1
-                        time.sleep(min(2**retries, 30))
-                        continue
-                    raise
-
-            out = self._make_output(result, standard_event, start)
-            self._publish(out)
+            try:
+                while True:
+                    try:
+                        result = inner(standard_event, ctx)
+                        break
+                    except Exception:  # noqa: BLE001
+                        if retries < self.max_retries:
+                            retries += 1
+                            time.sleep(min(2**retries, 30))
+                            continue
+                        raise
+            finally:
+                profile_location = self._finish_profiler(
+                    profiler, standard_event, ctx
+                )
+
+            out, data_raw = self._make_output(
+                result, standard_event, start, profile_location
+            )
+            self._publish(out, data_raw, ctx)
             return out
 
         return wrap(handler)
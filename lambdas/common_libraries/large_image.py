@@ -0,0 +1,234 @@
+"""
+Memory-bounded decoding of still images for the image nodes.
+
+* Sources larger than ``IMAGE_STREAM_THRESHOLD_BYTES`` are streamed to /tmp
+  instead of being read into memory; Pillow then reads (and for raw TIFF /
+  BMP data, memory-maps) the file.
+* :func:`decode` decodes at the smallest size that still covers the largest
+  rendition: JPEG through ``draft()`` (DCT scaling by 1/2, 1/4, 1/8), raw
+  strip/tile formats (uncompressed TIFF, BMP, PPM…) band by band with
+  ``reduce()`` applied to each band, everything else fully decoded and then
+  ``reduce()``-d.
+* The pixels that will be held decoded at once are checked against a pixel
+  budget (``IMAGE_PIXEL_BUDGET``, or derived from the function's memory);
+  over budget raises :class:`ImageTooLargeError`, and :func:`delegate` runs
+  the event on the node's large-memory variant (``LARGE_MEMORY_FUNCTION_NAME``)
+  when the pipeline created one.
+
+Pillow is imported here, so only nodes that ship it import this module.
+"""
+
+import io
+import json
+import math
+import os
+import tempfile
+from decimal import Decimal
+from itertools import groupby
+from typing import Any, Optional, Tuple, Union
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from PIL import Image
+
+# Decoded bytes per pixel (RGBA) times the copies alive at once: decoded
+# source, resized rendition, encoder buffers
+_BYTES_PER_PIXEL = 4
+_WORKING_COPIES = 4
+
+_BANDED_MODES = {"L", "LA", "RGB", "RGBA", "CMYK"}
+_READ_BLOCK = 1024 * 1024
+
+STREAM_THRESHOLD = int(os.getenv("IMAGE_STREAM_THRESHOLD_BYTES", str(64 << 20)))
+
+# The budget is enforced here, not by Pillow's decompression-bomb check
+Image.MAX_IMAGE_PIXELS = None
+
+
+class ImageTooLargeError(Exception):
+    """The decode would exceed this function's pixel budget."""
+
+    def __init__(self, pixels: int, budget: int):
+        super().__init__(f"Decoding {pixels} px exceeds the budget of {budget} px")
+        self.pixels = pixels
+        self.budget = budget
+
+
+def pixel_budget() -> int:
+    """Pixels this function may hold decoded (env override or memory based)."""
+    if os.getenv("IMAGE_PIXEL_BUDGET"):
+        return int(os.environ["IMAGE_PIXEL_BUDGET"])
+    memory_mb = int(os.getenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "1024"))
+    return memory_mb * (1 << 20) // (_BYTES_PER_PIXEL * _WORKING_COPIES)
+
+
+# ---------------------------------------------------------------------------
+# Source
+# ---------------------------------------------------------------------------
+
+
+def fetch(
+    s3: Any, bucket: str, key: str
+) -> Tuple[Union[str, io.BytesIO], Optional[str]]:
+    """
+    The source object as something ``Image.open`` accepts: a /tmp path for
+    large objects (returned again as the second item, to delete), otherwise
+    an in-memory buffer.
+    """
+    size = s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    if size <= STREAM_THRESHOLD:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        return io.BytesIO(body), None
+
+    suffix = os.path.splitext(key)[1]
+    fd, path = tempfile.mkstemp(suffix=suffix, dir="/tmp")
+    os.close(fd)
+    s3.download_file(
+        bucket,
+        key,
+        path,
+        Config=TransferConfig(multipart_chunksize=16 << 20, max_concurrency=4),
+    )
+    return path, path
+
+
+# ---------------------------------------------------------------------------
+# Decode
+# ---------------------------------------------------------------------------
+
+
+def reduce_factor(size: Tuple[int, int], target: Optional[Tuple[int, int]]) -> int:
+    """Largest integer factor that keeps *size* at or above *target*."""
+    if not target:
+        return 1
+    return max(1, min(size[0] // max(target[0], 1), size[1] // max(target[1], 1)))
+
+
+def _bandable(img: Image.Image) -> bool:
+    return (
+        len(img.tile) > 1
+        and img.mode in _BANDED_MODES
+        and all(tile[0] == "raw" for tile in img.tile)
+        and getattr(img, "fp", None) is not None
+    )
+
+
+def _decode_tile(img: Image.Image, band: Image.Image, tile: Any, y0: int) -> None:
+    """Decode one raw tile of *img* into *band* (whose top row is *y0*)."""
+    name, (x0, ty0, x1, ty1), offset, args = tile[:4]
+    decoder = Image._getdecoder(img.mode, name, args, img.decoderconfig)
+    try:
+        decoder.setimage(band.im, (x0, ty0 - y0, x1, ty1 - y0))
+        img.fp.seek(offset)
+        buf = b""
+        while True:
+            chunk = img.fp.read(_READ_BLOCK)
+            if not chunk:
+                break
+            buf += chunk
+            consumed, _ = decoder.decode(buf)
+            if consumed < 0:
+                break
+            buf = buf[consumed:]
+    finally:
+        decoder.cleanup()
+
+
+def _decode_banded(img: Image.Image, factor: int) -> Image.Image:
+    """
+    Decode a raw strip/tile image one band (row of tiles) at a time, reducing
+    each band as it is decoded; only the output and one band are in memory.
+    Rows that do not fill a whole reduction block carry over to the next band.
+    """
+    width, height = img.size
+    out = Image.new(img.mode, (math.ceil(width / factor), math.ceil(height / factor)))
+    tiles = sorted(img.tile, key=lambda t: (t[1][1], t[1][0]))
+    y_out = 0
+    carry: Optional[Image.Image] = None
+
+    for (y0, y1), band_tiles in groupby(tiles, key=lambda t: (t[1][1], t[1][3])):
+        band = Image.new(img.mode, (width, y1 - y0))
+        for tile in band_tiles:
+            _decode_tile(img, band, tile, y0)
+        if carry is not None:
+            merged = Image.new(img.mode, (width, carry.height + band.height))
+            merged.paste(carry, (0, 0))
+            merged.paste(band, (0, carry.height))
+            band = merged
+        usable = band.height - band.height % factor
+        if usable:
+            part = band.crop((0, 0, width, usable)).reduce(factor)
+            out.paste(part, (0, y_out))
+            y_out += part.height
+        carry = (
+            band.crop((0, usable, width, band.height)) if usable < band.height else None
+        )
+
+    if carry is not None:
+        out.paste(carry.reduce(factor), (0, y_out))
+    img.tile = []
+    return out
+
+
+def decode(
+    img: Image.Image,
+    target: Optional[Tuple[int, int]] = None,
+    budget: Optional[int] = None,
+) -> Image.Image:
+    """
+    Decode the opened (not yet loaded) *img* at no less than *target*
+    (the largest rendition; ``None`` for full resolution).
+
+    Raises :class:`ImageTooLargeError` before decoding when the pixels held
+    at once would exceed *budget* (default :func:`pixel_budget`).
+    """
+    budget = budget or pixel_budget()
+
+    if target and img.format == "JPEG":
+        # DCT scaling: the decoder itself produces the reduced image
+        img.draft(img.mode, target)
+
+    factor = reduce_factor(img.size, target)
+    if factor > 1 and _bandable(img):
+        out_pixels = math.ceil(img.width / factor) * math.ceil(img.height / factor)
+        band_pixels = img.width * max(t[1][3] - t[1][1] for t in img.tile)
+        if out_pixels + band_pixels > budget:
+            raise ImageTooLargeError(out_pixels + band_pixels, budget)
+        return _decode_banded(img, factor)
+
+    if img.width * img.height > budget:
+        raise ImageTooLargeError(img.width * img.height, budget)
+    img.load()
+    return img.reduce(factor) if factor > 1 else img
+
+
+# ---------------------------------------------------------------------------
+# Large-memory variant
+# ---------------------------------------------------------------------------
+
+
+def large_variant_available() -> bool:
+    return bool(os.getenv("LARGE_MEMORY_FUNCTION_NAME"))
+
+
+def _json_default(o):
+    if isinstance(o, Decimal):
+        return int(o) if o % 1 == 0 else float(o)
+    raise TypeError
+
+
+def delegate(event: Any) -> Any:
+    """
+    Run the (standardised) event on the large-memory variant of this node
+    and return its result; the variant's handler has no middleware, so the
+    result is wrapped and published by this invocation's middleware.
+    """
+    response = boto3.client("lambda").invoke(
+        FunctionName=os.environ["LARGE_MEMORY_FUNCTION_NAME"],
+        InvocationType="RequestResponse",
+        Payload=json.dumps(event, default=_json_default).encode(),
+    )
+    payload = json.loads(response["Payload"].read() or b"null")
+    if response.get("FunctionError"):
+        raise RuntimeError(f"Large-memory variant failed: {payload}")
+    return payload
@@ -0,0 +1,69 @@
+"""
+Pick the derived representation to hand to a client.
+
+Image renditions may be stored in several formats under the same Purpose
+(e.g. a JPEG thumbnail plus WebP / AVIF alternates). A client states which
+image formats it can display through the ``Accept`` header (``image/webp``,
+``image/avif``) and/or an ``imageFormats`` query parameter (``webp,avif``);
+of the representations it accepts, the smallest is returned. The web UI
+sends ``imageFormats=webp``, since a browser's Accept header for API requests
+names no image types. JPEG / PNG and non-image formats are always acceptable,
+so clients that state nothing get what they got before alternates existed.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+# Formats only returned to clients that ask for them
+NEGOTIATED_FORMATS = {"WEBP", "AVIF"}
+
+_MIME_FORMATS = {"image/webp": "WEBP", "image/avif": "AVIF"}
+
+
+def accepted_formats(
+    headers: Optional[Mapping[str, str]] = None,
+    query: Optional[Mapping[str, str]] = None,
+) -> Set[str]:
+    """The negotiated formats (upper case) the client accepts."""
+    formats: Set[str] = set()
+    for name, value in (headers or {}).items():
+        if name.lower() == "accept" and value:
+            for part in value.split(","):
+                mime = part.split(";")[0].strip().lower()
+                if mime in _MIME_FORMATS:
+                    formats.add(_MIME_FORMATS[mime])
+    for value in ((query or {}).get("imageFormats") or "").split(","):
+        if value.strip().upper() in NEGOTIATED_FORMATS:
+            formats.add(value.strip().upper())
+    return formats
+
+
+def _size(rep: Dict[str, Any]) -> float:
+    info = rep.get("StorageInfo", {}).get("PrimaryLocation", {}).get("FileInfo", {})
+    size = info.get("Size")
+    return float(size) if size is not None else float("inf")
+
+
+def candidates(
+    reps: Iterable[Dict[str, Any]], purpose: str, accepted: Set[str]
+) -> List[Dict[str, Any]]:
+    """S3 representations of *purpose* the client can use, smallest first."""
+    usable = [
+        rep
+        for rep in reps
+        if rep.get("Purpose") == purpose
+        and rep.get("StorageInfo", {}).get("PrimaryLocation", {}).get("StorageType")
+        == "s3"
+        and (
+            str(rep.get("Format", "")).upper() not in NEGOTIATED_FORMATS
+            or str(rep.get("Format", "")).upper() in accepted
+        )
+    ]
+    return sorted(usable, key=_size)  # stable: equal sizes keep record order
+
+
+def pick_representation(
+    reps: Iterable[Dict[str, Any]], purpose: str, accepted: Set[str]
+) -> Optional[Dict[str, Any]]:
+    """The smallest representation of *purpose* the client accepts."""
+    found = candidates(reps, purpose, accepted)
+    return found[0] if found else None
@@ -0,0 +1,29 @@
+"""
+S3 objects that make up a derived representation.
+
+Most representations are the single object at
+``StorageInfo.PrimaryLocation``. An HLS ladder (``Purpose`` "hls", written by
+check_media_convert_status) points there at its master playlist and lists
+the other playlists and media files in ``HlsSpec.Files``, relative to the
+master's prefix. Everything that deletes an asset's objects goes through
+:func:`representation_keys` so that no file of a representation is left
+behind.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def representation_keys(rep: Dict[str, Any]) -> Tuple[Optional[str], List[str]]:
+    """Bucket and every object key of *rep* (primary first; empty if none)."""
+    location = (rep or {}).get("StorageInfo", {}).get("PrimaryLocation") or {}
+    bucket = location.get("Bucket")
+    key = location.get("ObjectKey", {}).get("FullPath")
+    if not bucket or not key:
+        return bucket, []
+
+    keys = [key]
+    prefix = key.rsplit("/", 1)[0]
+    for name in rep.get("HlsSpec", {}).get("Files", []):
+        if f"{prefix}/{name}" != key:
+            keys.append(f"{prefix}/{name}")
+    return bucket, keys
@@ -0,0 +1,226 @@
+"""
+Opt-in profiling of a pipeline step's handler.
+
+Two modes:
+
+* ``sampling`` (default) – a daemon thread snapshots the stacks of the
+  handler's threads every ``interval_ms`` (``sys._current_frames``); the
+  handler itself runs unmodified, so the overhead is the sampler's own CPU
+  time (well under 1 % at 10 ms). Output is a speedscope JSON document (one
+  sampled profile per thread) or Brendan Gregg's collapsed-stack text.
+* ``cprofile`` – deterministic ``cProfile`` of the handler thread, written
+  as a ``pstats`` dump (snakeviz, ``python -m pstats``). Exact call counts,
+  noticeably slower handler.
+
+Whether an invocation is profiled is decided by :func:`should_profile` from
+``STEP_PROFILE_PIPELINES`` (comma separated pipeline names, ``*`` for all)
+and ``STEP_PROFILE_SAMPLE_RATE`` (0–1).
+"""
+
+import cProfile
+import io
+import json
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+KEY_PREFIX = "profiles"
+
+_CONTENT_TYPES = {
+    "speedscope": ("application/json", ".speedscope.json"),
+    "collapsed": ("text/plain", ".collapsed.txt"),
+    "pstats": ("application/octet-stream", ".pstats"),
+}
+
+
+def should_profile(pipeline_name: str) -> bool:
+    """Profile this invocation? (pipeline opt-in list, then sample rate)"""
+    pipelines = {
+        p.strip() for p in os.getenv("STEP_PROFILE_PIPELINES", "").split(",")
+    } - {""}
+    if "*" in pipelines or pipeline_name in pipelines:
+        return True
+    rate = float(os.getenv("STEP_PROFILE_SAMPLE_RATE", "0") or 0)
+    return rate > 0 and random.random() < rate
+
+
+def _frame_name(code: Any) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{code.co_name} ({module}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for the threads of one invocation."""
+
+    def __init__(self, interval_ms: float = 10.0):
+        self.interval = interval_ms / 1000
+        # (thread name, stack tuple root→leaf) -> samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._names: Dict[int, str] = {}
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="step-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        code_names: Dict[Any, str] = {}
+        while not self._stop.wait(self.interval):
+            self._names.update(
+                (t.ident, t.name) for t in threading.enumerate() if t.ident
+            )
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    name = code_names.get(code)
+                    if name is None:
+                        name = code_names[code] = _frame_name(code)
+                    stack.append(name)
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[(self._names.get(ident, str(ident)), tuple(stack))] += 1
+            self.samples += 1
+
+    # ---------------------------------------------------------------- output
+    def collapsed(self) -> bytes:
+        """``thread;frame;frame count`` lines (flamegraph.pl, speedscope)."""
+        lines = [
+            ";".join((thread,) + stack) + f" {count}"
+            for (thread, stack), count in self.stacks.most_common()
+        ]
+        return "\n".join(lines).encode()
+
+    def speedscope(self, name: str) -> bytes:
+        """A speedscope file with one sampled profile per thread."""
+        frames: Dict[str, int] = {}
+        by_thread: Dict[str, Tuple[list, list]] = {}
+        for (thread, stack), count in self.stacks.items():
+            samples, weights = by_thread.setdefault(thread, ([], []))
+            samples.append([frames.setdefault(f, len(frames)) for f in stack])
+            weights.append(round(count * self.interval * 1000, 3))
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+            for thread, (samples, weights) in by_thread.items()
+        ]
+        return json.dumps(
+            {
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "name": name,
+                "exporter": "medialake-step-profiler",
+                "shared": {"frames": [{"name": f} for f in frames]},
+                "profiles": profiles,
+            },
+            separators=(",", ":"),
+        ).encode()
+
+
+class StepProfiler:
+    """
+    Profile one handler invocation and upload the result.
+
+    Usage::
+
+        profiler = StepProfiler(s3_client, bucket)
+        profiler.start()
+        try:
+            ...
+        finally:
+            location = profiler.stop_and_upload(trace_id, step_name, request_id)
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        bucket: str,
+        mode: Optional[str] = None,
+        interval_ms: Optional[float] = None,
+        output_format: Optional[str] = None,
+    ):
+        self.s3 = s3_client
+        self.bucket = bucket
+        self.mode = (mode or os.getenv("STEP_PROFILE_MODE") or "sampling").lower()
+        self.interval_ms = interval_ms or float(
+            os.getenv("STEP_PROFILE_INTERVAL_MS", "10")
+        )
+        self.format = (
+            "pstats"
+            if self.mode == "cprofile"
+            else (output_format or os.getenv("STEP_PROFILE_FORMAT") or "speedscope")
+        )
+        if self.format not in _CONTENT_TYPES:
+            raise ValueError(f"Unsupported profile format: {self.format}")
+        self._sampler: Optional[SamplingProfiler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._wall = self._cpu = 0.0
+
+    def start(self) -> None:
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = SamplingProfiler(self.interval_ms)
+            self._sampler.start()
+
+    def stop(self, name: str) -> Tuple[bytes, Dict[str, Any]]:
+        """Stop profiling; returns the encoded profile and a summary."""
+        summary: Dict[str, Any] = {
+            "mode": self.mode,
+            "format": self.format,
+            "wallSeconds": round(time.perf_counter() - self._wall, 3),
+            "cpuSeconds": round(time.process_time() - self._cpu, 3),
+        }
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.create_stats()
+            buf = io.BytesIO()
+            # same bytes pstats.Stats.dump_stats writes
+            marshal.dump(self._cprofile.stats, buf)
+            return buf.getvalue(), summary
+
+        self._sampler.stop()
+        summary["samples"] = self._sampler.samples
+        summary["intervalMs"] = self.interval_ms
+        if self.format == "collapsed":
+            return self._sampler.collapsed(), summary
+        return self._sampler.speedscope(name), summary
+
+    def stop_and_upload(
+        self, trace_id: str, step_name: str, request_id: str
+    ) -> Dict[str, Any]:
+        """Stop, upload to ``profiles/<trace>/<step>-<request>`` and locate it."""
+        name = f"{step_name}-{request_id}"
+        body, summary = self.stop(name)
+        content_type, extension = _CONTENT_TYPES[self.format]
+        key = "/".join((KEY_PREFIX, trace_id, name + extension))
+        self.s3.put_object(
+            Bucket=self.bucket, Key=key, Body=body, ContentType=content_type
+        )
+        return {"bucket": self.bucket, "key": key, **summary}
@@ -0,0 +1,73 @@
+"""
+Metadata schema for vectors stored in the S3 Vectors indexes.
+
+Only keys that queries filter on are filterable; everything else a vector
+carries (segment offsets, timecodes, timestamps) is stored as non-filterable
+metadata, which does not count against the filterable-metadata size limit and
+keeps filtered queries cheap. S3 Vectors fixes the non-filterable keys when an
+index is created, so the same configuration is used by the index-creation
+custom resource and by the vector store node when it creates an index itself.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+# Keys used in query filters (search filters on inventory_id)
+FILTERABLE_METADATA_KEYS = (
+    "inventory_id",
+    "content_type",
+    "embedding_scope",
+    "embedding_option",
+)
+
+# Returned with results, never filtered on
+NON_FILTERABLE_METADATA_KEYS = (
+    "start_offset_sec",
+    "end_offset_sec",
+    "start_timecode",
+    "end_timecode",
+    "timestamp",
+)
+
+# S3 Vectors per-vector limits
+MAX_FILTERABLE_METADATA_BYTES = 2 * 1024
+MAX_TOTAL_METADATA_BYTES = 40 * 1024
+
+
+def metadata_configuration() -> Dict[str, List[str]]:
+    """``metadataConfiguration`` argument for ``create_index``."""
+    return {"nonFilterableMetadataKeys": list(NON_FILTERABLE_METADATA_KEYS)}
+
+
+def index_matches_schema(index: Dict[str, Any]) -> bool:
+    """Whether a ``get_index`` description has exactly our non-filterable keys."""
+    configured = (index.get("metadataConfiguration") or {}).get(
+        "nonFilterableMetadataKeys"
+    ) or []
+    return set(configured) == set(NON_FILTERABLE_METADATA_KEYS)
+
+
+def _size(values: Dict[str, Any]) -> int:
+    return len(json.dumps(values, separators=(",", ":")).encode("utf-8"))
+
+
+def conform_metadata(metadata: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Restrict *metadata* to the schema and check the size limits.
+
+    Returns the conforming metadata and the keys that were dropped (unknown
+    keys and None values). Raises ValueError if the filterable or total
+    metadata would exceed the service limits.
+    """
+    known = set(FILTERABLE_METADATA_KEYS) | set(NON_FILTERABLE_METADATA_KEYS)
+    conformed = {k: v for k, v in metadata.items() if k in known and v is not None}
+    dropped = [k for k in metadata if k not in conformed]
+
+    filterable = {k: v for k, v in conformed.items() if k in FILTERABLE_METADATA_KEYS}
+    if _size(filterable) > MAX_FILTERABLE_METADATA_BYTES:
+        raise ValueError(
+            f"Filterable metadata exceeds {MAX_FILTERABLE_METADATA_BYTES} bytes"
+        )
+    if _size(conformed) > MAX_TOTAL_METADATA_BYTES:
+        raise ValueError(f"Vector metadata exceeds {MAX_TOTAL_METADATA_BYTES} bytes")
+    return conformed, dropped
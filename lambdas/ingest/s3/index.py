@@ -21,10 +21,12 @@ from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.auth import SigV4Auth
 from botocore.awsrequest import AWSRequest
 from botocore.config import Config
+from representation_files import representation_keys
 
 # OpenSearch configuration
 OPENSEARCH_ENDPOINT = os.environ.get("OPENSEARCH_ENDPOINT", "")
 OPENSEARCH_INDEX = os.environ.get("INDEX_NAME", "media")
+OPENSEARCH_CLIP_INDEX = os.environ.get("CLIP_INDEX_NAME") or f"{OPENSEARCH_INDEX}-clips"
 OPENSEARCH_SERVICE = os.environ.get("OPENSEARCH_SERVICE", "es")
 AWS_REGION = os.environ.get("REGION", "")
 
@@ -387,11 +389,9 @@ class AssetProcessor:
 
         # Extract derived representations
         for rep in asset_record.get("DerivedRepresentations", []):
-            storage_info = rep.get("StorageInfo", {}).get("PrimaryLocation", {})
-            if storage_info:
-                bucket = storage_info.get("Bucket")
-                key = storage_info.get("ObjectKey", {}).get("FullPath")
-                if bucket and key and not (bucket == main_bucket and key == main_key):
+            bucket, keys = representation_keys(rep)
+            for key in keys:
+                if not (bucket == main_bucket and key == main_key):
                     files_to_delete.append((bucket, key))
 
         # Extract transcript files
@@ -436,13 +436,20 @@ class AssetProcessor:
             return
 
         host = OPENSEARCH_ENDPOINT.lstrip("https://").lstrip("http://")
-        url = f"https://{host}/{OPENSEARCH_INDEX}/_delete_by_query?refresh=true&conflicts=proceed"
         query = {"query": {"term": {"DigitalSourceAsset.ID": asset_id}}}
 
-        status, body = self._signed_request("POST", url, payload=query)
-        if status not in (200, 202):
-            logger.error(f"OpenSearch deletion failed (status={status}): {body}")
-        else:
+        # Asset docs in the media index, clip docs on their routed shard
+        base_qs = "refresh=true&conflicts=proceed&ignore_unavailable=true"
+        routing = urllib.parse.quote(asset_id, safe="")
+        for url in (
+            f"https://{host}/{OPENSEARCH_INDEX}/_delete_by_query?{base_qs}",
+            f"https://{host}/{OPENSEARCH_CLIP_INDEX}/_delete_by_query?{base_qs}"
+            f"&routing={routing}",
+        ):
+            status, body = self._signed_request("POST", url, payload=query)
+            if status not in (200, 202):
+                logger.error(f"OpenSearch deletion failed (status={status}): {body}")
+                continue
             deleted = 0
             try:
                 deleted = json.loads(body).get("deleted", 0)
@@ -2,15 +2,14 @@ import decimal
 import json
 import os
 import re
-import subprocess
 from decimal import Decimal
-from pathlib import Path
 from typing import Any, Dict
 
 import boto3
+import media_probe
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from lambda_middleware import lambda_middleware
-from pymediainfo import MediaInfo
 
 # ── config / clients ───────────────────────────────────────────────
 logger = Logger()
@@ -20,10 +19,7 @@ SIGNED_URL_TIMEOUT = 60
 TABLE_NAME = os.environ["MEDIALAKE_ASSET_TABLE"]
 
 s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
-asset_table = dynamodb.Table(TABLE_NAME)
-
-TMP_DIR = Path("/tmp")
+asset_cache = get_asset_cache(TABLE_NAME)
 
 
 # ── helper: strip Decimal → int/float ──────────────────────────────
@@ -141,27 +137,6 @@ def _sanitize_field_value(value: Any, field_name: str = "") -> Any:
 
 
 # ── helpers: analysis tools ────────────────────────────────────────
-def run_ffprobe(file_path: str) -> Dict[str, Any]:
-    cmd = [
-        "/opt/bin/ffprobe",
-        "-v",
-        "error",
-        "-show_streams",
-        "-show_format",
-        "-print_format",
-        "json",
-        file_path,
-    ]
-    res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    if res.returncode:
-        raise RuntimeError("ffprobe failed: " + res.stderr.decode())
-    return json.loads(res.stdout.decode())
-
-
-def run_mediainfo(file_path: str) -> Dict[str, Any]:
-    return json.loads(MediaInfo.parse(file_path, output="JSON"))
-
-
 def merge_metadata(ff: Dict, mi: Dict) -> Dict[str, Any]:
     merged = {"general": {}, "video": [], "audio": []}
     ff_fmt = ff.get("format", {})
@@ -233,18 +208,16 @@ def lambda_handler(event, context):
 
         inv_id = clean_asset_id(inv_raw)
 
-        # download
+        # analyse straight from S3 (ffprobe + MediaInfo run concurrently)
         src = asset["DigitalSourceAsset"]["MainRepresentation"]
         bucket = src["StorageInfo"]["PrimaryLocation"]["Bucket"]
         key = src["StorageInfo"]["PrimaryLocation"]["ObjectKey"]["FullPath"]
-        local = TMP_DIR / Path(key).name
-        s3_client.download_file(bucket, key, str(local))
-        steps.setdefault(inv_id, {})["S3_download"] = "Success"
-
-        # analyse
-        ff = run_ffprobe(str(local))
+        ff, mi, probe_stats = media_probe.probe(
+            s3_client, bucket, key, url_expires=SIGNED_URL_TIMEOUT
+        )
+        logger.info("Probed source", extra={"key": key, **probe_stats})
+        steps.setdefault(inv_id, {})["Probe_source"] = probe_stats["source"]
         steps[inv_id]["FFProbe"] = "Success"
-        mi = run_mediainfo(str(local))
         steps[inv_id]["MediaInfo"] = "Success"
         merged = merge_metadata(ff, mi)
 
@@ -257,29 +230,25 @@ def lambda_handler(event, context):
             "Channels": first_audio.get("channels"),
         }
 
-        # fetch existing metadata, merge and decimalize
-        existing_emb = (
-            asset_table.get_item(Key={"InventoryID": inv_id})
-            .get("Item", {})
-            .get("Metadata", {})
-            .get("EmbeddedMetadata", {})
-        )
-        merged_emb = {**existing_emb, "audio": merged.get("audio", [])}
-        merged_emb_decimal = _decimalize(merged_emb)
-
-        # store in DDB (now using only Decimals for numbers)
-        asset_table.update_item(
-            Key={"InventoryID": inv_id},
-            UpdateExpression="SET #md.#em = :m",
-            ExpressionAttributeNames={"#md": "Metadata", "#em": "EmbeddedMetadata"},
-            ExpressionAttributeValues={":m": merged_emb_decimal},
-        )
-        steps[inv_id]["DDB_update"] = "Success"
+        # merge into the existing embedded metadata and store in DDB (only
+        # Decimals for numbers); the written record is returned by the update
+        def _merge_audio(record, audio=merged.get("audio", [])):
+            existing_emb = (
+                (record or {}).get("Metadata", {}).get("EmbeddedMetadata", {})
+            )
+            return {
+                "UpdateExpression": "SET #md.#em = :m",
+                "ExpressionAttributeNames": {
+                    "#md": "Metadata",
+                    "#em": "EmbeddedMetadata",
+                },
+                "ExpressionAttributeValues": {
+                    ":m": _decimalize({**existing_emb, "audio": audio})
+                },
+            }
 
-        # verify
-        updated_item = asset_table.get_item(Key={"InventoryID": inv_id}).get("Item", {})
-        updated_assets[inv_id] = updated_item
-        steps[inv_id]["DDB_get"] = "Success"
+        updated_assets[inv_id] = asset_cache.modify(inv_id, _merge_audio)
+        steps[inv_id]["DDB_update"] = "Success"
 
     # strip Decimal objects before returning
     return {
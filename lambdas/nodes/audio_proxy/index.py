@@ -7,6 +7,7 @@ import time
 from typing import Any, Dict, List
 
 import boto3
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
@@ -19,8 +20,7 @@ tracer = Tracer()
 
 # ── AWS clients ─────────────────────────────────────────────────────────────
 s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
-asset_table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 
 
 # ── helpers ─────────────────────────────────────────────────────────────────
@@ -204,10 +204,8 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext) -> Dict[str, Any]:
 
         result = create_response_output(s3_tmpl, api_tmpl_bucket, response, event)
 
-        # DDB fetch & Decimal-strip
-        updated_item = asset_table.get_item(
-            Key={"InventoryID": clean_inventory_id}
-        ).get("Item", {})
+        # record fetch (usually the copy passed in the envelope) & Decimal-strip
+        updated_item = asset_cache.get(clean_inventory_id) or {}
         result["updatedAsset"] = _strip_decimals(updated_item)
 
         return result
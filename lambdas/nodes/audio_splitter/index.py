@@ -2,37 +2,60 @@
 Audio Chunker Lambda
 ────────────────────
 • Splits an input MP3 (or any ffmpeg-readable source) into 10-second chunks
-  that are **always** ≤ MAX_CHUNK_SIZE_MB.
-• Uploads each chunk to S3 and returns their metadata.
+  that are **always** ≤ MAX_CHUNK_SIZE_MB, in a single ffmpeg pass through
+  the segment muxer at the CBR computed for one chunk.
+• Chunk start/end times come from the muxer's segment list (no per-chunk
+  probe).
+• Silence: ffmpeg ``silencedetect`` runs in the same pass; each chunk gets
+  its silent seconds / ratio, and chunks at or above SILENT_CHUNK_RATIO are
+  marked ``silent`` (SILENT_CHUNKS=mark) or dropped before upload
+  (SILENT_CHUNKS=drop) so downstream Map iterations and API calls only see
+  audible content. With ALIGN_TO_SPEECH the silences are detected first and
+  each cut moves back to the middle of the last pause in the second half of
+  its chunk.
+• Uploads the chunks to S3 concurrently and returns their metadata.
 
 ENV
 ───
 MAX_CHUNK_SIZE_MB           default 10.5
 CHUNK_DURATION              default 10   (seconds)
+SILENT_CHUNKS               off | mark | drop   default off
+SILENCE_THRESHOLD_DB        default -50  (dBFS, silencedetect noise level)
+SILENCE_MIN_DURATION        default 0.5  (seconds)
+SILENT_CHUNK_RATIO          default 0.95 (share of a chunk that is silent)
+ALIGN_TO_SPEECH             default false
+UPLOAD_WORKERS              default 8
 MEDIA_ASSETS_BUCKET_NAME    default source bucket
 EVENT_BUS_NAME              optional (for @lambda_middleware)
 """
 
 from __future__ import annotations
 
+import csv
 import json
-import math
 import os
 import re
+import shutil
 import subprocess
 import tempfile
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
 import requests
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
+from botocore.config import Config
 from lambda_middleware import lambda_middleware
 from nodes_utils import format_duration  # your existing helper
 
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "8"))
+
 # ── Powertools & AWS clients ────────────────────────────────────────────────
 logger = Logger()
 tracer = Tracer()
-s3_client = boto3.client("s3")
+metrics = Metrics(namespace="MediaLake", service="audio_splitter")
+s3_client = boto3.client("s3", config=Config(max_pool_connections=UPLOAD_WORKERS))
 
 # ── Configuration ───────────────────────────────────────────────────────────
 MAX_CHUNK_SIZE_MB = float(os.getenv("MAX_CHUNK_SIZE_MB", "10.5"))
@@ -42,62 +65,92 @@ MAX_CHUNK_SIZE_BYTES = int(MAX_CHUNK_SIZE_MB * 1024 * 1024)
 ALLOWED_CBR = [320, 256, 224, 192, 160, 128, 96, 64, 48, 32, 24]  # kbps
 SAFE_MARGIN = 0.97  # 3 % head-room for ID3/container overhead
 
+SILENCE_THRESHOLD_DB = float(os.getenv("SILENCE_THRESHOLD_DB", "-50"))
+SILENCE_MIN_DURATION = float(os.getenv("SILENCE_MIN_DURATION", "0.5"))
+SILENT_CHUNK_RATIO = float(os.getenv("SILENT_CHUNK_RATIO", "0.95"))
 
-# ── Helpers ─────────────────────────────────────────────────────────────────
-def get_audio_duration(path: str) -> float:
-    """Return duration of file (seconds) via ffmpeg probe."""
-    cmd = ["/opt/bin/ffmpeg", "-i", path]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    match = re.search(r"Duration:\s+(\d+):(\d+):(\d+\.\d+)", proc.stderr or "")
-    if not match:
-        logger.error("Could not parse duration from ffmpeg output")
-        return 0.0
-    h, m, s = int(match[1]), int(match[2]), float(match[3])
-    return h * 3600 + m * 60 + s
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+_DURATION_RE = re.compile(r"Duration:\s+(\d+):(\d+):(\d+\.\d+)")
 
 
+# ── Helpers ─────────────────────────────────────────────────────────────────
 def get_file_size_mb(path: str) -> float:
     return os.path.getsize(path) / (1024 * 1024)
 
 
-def encode_audio_segment(
-    input_path: str,
-    output_path: str,
-    start_time: float,
-    duration: float,
-    extra_args: List[str],
-) -> Tuple[bool, float]:
+def _silencedetect_filter() -> str:
+    return (
+        f"silencedetect=noise={SILENCE_THRESHOLD_DB}dB:d={SILENCE_MIN_DURATION}"
+    )
+
+
+def parse_silences(stderr: str) -> List[Tuple[float, float]]:
+    """(start, end) silences from silencedetect output; open end = inf."""
+    silences: List[Tuple[float, float]] = []
+    start: Optional[float] = None
+    for kind, value in _SILENCE_RE.findall(stderr):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    if start is not None:
+        silences.append((start, float("inf")))
+    return silences
+
+
+def detect_silence(input_path: str) -> Tuple[List[Tuple[float, float]], float]:
+    """Decode-only silencedetect pass; returns (silences, total duration)."""
+    cmd = [
+        "/opt/bin/ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        input_path,
+        "-map",
+        "0:a:0",
+        "-af",
+        _silencedetect_filter(),
+        "-f",
+        "null",
+        "-",
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"FFmpeg silencedetect failed: {proc.stderr.strip()}")
+    match = _DURATION_RE.search(proc.stderr)
+    total = (
+        int(match[1]) * 3600 + int(match[2]) * 60 + float(match[3]) if match else 0.0
+    )
+    return parse_silences(proc.stderr), total
+
+
+def speech_aligned_cuts(
+    silences: List[Tuple[float, float]], total: float, chunk_duration: float
+) -> List[float]:
     """
-    Encode one segment with the given ffmpeg args (bit-rate, mono, etc.)
-    Returns (success, actual_duration).
+    Cut times at most *chunk_duration* apart, each moved back to the middle
+    of the last silence ending up in the second half of its chunk.
     """
-    cmd = (
-        [
-            "/opt/bin/ffmpeg",
-            "-hide_banner",
-            "-loglevel",
-            "error",
-            "-ss",
-            str(start_time),
-            "-i",
-            input_path,
-            "-t",
-            str(duration),
-            "-f",
-            "mp3",
-            "-c:a",
-            "libmp3lame",
+    cuts: List[float] = []
+    start = 0.0
+    while start + chunk_duration < total:
+        nominal = start + chunk_duration
+        mids = [
+            (a + min(b, total)) / 2
+            for a, b in silences
+            if start + chunk_duration / 2 <= (a + min(b, total)) / 2 <= nominal
         ]
-        + extra_args
-        + ["-y", output_path]
-    )
+        start = max(mids) if mids else nominal
+        cuts.append(round(start, 3))
+    return cuts
 
-    try:
-        subprocess.check_call(cmd)
-        return True, get_audio_duration(output_path)
-    except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg encoding failed: {e}")
-        return False, 0.0
+
+def silent_seconds(
+    silences: List[Tuple[float, float]], start: float, end: float
+) -> float:
+    """Seconds of [start, end) covered by silence."""
+    return sum(max(0.0, min(b, end) - max(a, start)) for a, b in silences)
 
 
 def compute_target_bitrate(duration_s: float) -> Tuple[int, List[str]]:
@@ -125,40 +178,95 @@ def compute_target_bitrate(duration_s: float) -> Tuple[int, List[str]]:
     )
 
 
-def create_size_constrained_segment(
+def segment_audio(
     input_path: str,
-    output_path: str,
-    start_time: float,
-    target_duration: float,
-) -> Tuple[bool, float, str]:
+    output_dir: str,
+    base_name: str,
+    chunk_duration: int,
+    extra_args: List[str],
+    detect: bool = False,
+    cuts: Optional[List[float]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Tuple[float, float]]]:
     """
-    Encode once with the mathematically derived bit-rate. Guaranteed or fail.
+    Decode the input once and let ffmpeg's segment muxer cut it into
+    *chunk_duration* MP3 chunks (or at *cuts*) encoded with *extra_args*
+    (bit-rate, mono…). With *detect*, silencedetect runs in the same pass.
+    Returns one entry per chunk, in order, timed from the segment list, and
+    the detected silences.
     """
-    try:
-        kbps, ffmpeg_args = compute_target_bitrate(target_duration)
-    except RuntimeError as e:
-        logger.error(str(e))
-        return False, 0.0, "failed"
-
-    success, actual_dur = encode_audio_segment(
-        input_path, output_path, start_time, target_duration, ffmpeg_args
+    list_path = os.path.join(output_dir, "segments.csv")
+    stem = base_name.replace("%", "%%")  # literal % in the output pattern
+    pattern = os.path.join(output_dir, f"{stem}_segment_%03d.mp3")
+    cmd = (
+        [
+            "/opt/bin/ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-loglevel",
+            "info" if detect else "error",
+            "-i",
+            input_path,
+            "-map",
+            "0:a:0",
+        ]
+        + (["-af", _silencedetect_filter()] if detect else [])
+        + ["-c:a", "libmp3lame"]
+        + extra_args
+        + ["-f", "segment"]
+        + (
+            ["-segment_times", ",".join(str(t) for t in cuts)]
+            if cuts
+            else ["-segment_time", str(chunk_duration)]
+        )
+        + [
+            "-segment_format",
+            "mp3",
+            "-segment_start_number",
+            "1",
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            list_path,
+            "-segment_list_type",
+            "csv",
+            "-y",
+            pattern,
+        ]
     )
-    if not success:
-        return False, 0.0, "ffmpeg_error"
-
-    if os.path.getsize(output_path) > MAX_CHUNK_SIZE_BYTES:
-        logger.error(
-            f"File still too large at {kbps} kbps "
-            f"({get_file_size_mb(output_path):.2f} MB)."
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"FFmpeg segmentation failed: {proc.stderr.strip()}")
+
+    segments: List[Dict[str, Any]] = []
+    with open(list_path, newline="") as f:
+        for name, start, end in csv.reader(f):
+            path = os.path.join(output_dir, name)
+            start_s, end_s = float(start), float(end)
+            segments.append(
+                {
+                    "filename": os.path.basename(name),
+                    "path": path,
+                    "start_time": start_s,
+                    "duration": end_s - start_s,
+                    "size_mb": get_file_size_mb(path),
+                }
+            )
+    return segments, parse_silences(proc.stderr) if detect else []
+
+
+def upload_segments(
+    segments: List[Dict[str, Any]], bucket: str, prefix: str
+) -> List[str]:
+    """Upload all chunks concurrently; returns their keys in order."""
+    keys = [f"{prefix}/{seg['filename']}" for seg in segments]
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        list(
+            pool.map(
+                lambda item: s3_client.upload_file(item[0]["path"], bucket, item[1]),
+                zip(segments, keys),
+            )
         )
-        return False, actual_dur, "failed"
-
-    return True, actual_dur, f"{kbps}kbps"
-
-
-def ensure_tmp_dir(path: str = "/tmp/segments") -> str:
-    os.makedirs(path, exist_ok=True)
-    return path
+    return keys
 
 
 def _bad_request(msg: str) -> Dict[str, Any]:
@@ -175,6 +283,7 @@ def _error(code: int, msg: str) -> Dict[str, Any]:
 @lambda_middleware(event_bus_name=os.getenv("EVENT_BUS_NAME", "default-event-bus"))
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
+@metrics.log_metrics
 def lambda_handler(event: Dict[str, Any], context) -> Any:  # noqa: C901 (long fn)
     try:
         logger.info("Incoming event", extra={"event": event})
@@ -223,6 +332,16 @@ def lambda_handler(event: Dict[str, Any], context) -> Any:  # noqa: C901 (long f
             chunk_duration = 10
             logger.warning("Invalid CHUNK_DURATION – defaulting to 10 s")
 
+        silent_mode = (
+            os.getenv("SILENT_CHUNKS") or str(data.get("silentChunks", "off"))
+        ).lower()
+        if silent_mode not in ("off", "mark", "drop"):
+            logger.warning(f"Invalid SILENT_CHUNKS {silent_mode!r} – using off")
+            silent_mode = "off"
+        align = (
+            os.getenv("ALIGN_TO_SPEECH") or str(data.get("alignToSpeech", "false"))
+        ).lower() in ("1", "true", "yes")
+
         # ── Download ─────────────────────────────────────────────────────
         input_path = os.path.join(tempfile.gettempdir(), os.path.basename(source_key))
         if use_s3_direct:
@@ -238,53 +357,89 @@ def lambda_handler(event: Dict[str, Any], context) -> Any:  # noqa: C901 (long f
             with open(input_path, "wb") as f:
                 f.write(r.content)
 
-        # ── Segment ──────────────────────────────────────────────────────
-        total_duration = get_audio_duration(input_path)
-        output_dir = ensure_tmp_dir()
-        base_name = os.path.splitext(os.path.basename(source_key))[0]
-
-        num_segments = math.ceil(total_duration / chunk_duration)
-        segments: List[Dict[str, Any]] = []
-
-        for i in range(num_segments):
-            start = i * chunk_duration
-            dur = min(chunk_duration, total_duration - start)
-            if dur <= 0:
-                break
-
-            seg_name = f"{base_name}_segment_{i+1:03d}.mp3"
-            seg_path = os.path.join(output_dir, seg_name)
+        # ── Segment (one ffmpeg pass) ────────────────────────────────────
+        try:
+            kbps, ffmpeg_args = compute_target_bitrate(chunk_duration)
+        except RuntimeError as e:
+            return _error(500, str(e))
 
-            logger.info(
-                f"Creating seg {i+1}/{num_segments} (start={start:.2f}s, "
-                f"duration={dur:.2f}s)"
+        output_dir = tempfile.mkdtemp(prefix="segments-", dir="/tmp")
+        base_name = os.path.splitext(os.path.basename(source_key))[0]
+        try:
+            cuts: Optional[List[float]] = None
+            silences: List[Tuple[float, float]] = []
+            if align:
+                silences, total = detect_silence(input_path)
+                cuts = speech_aligned_cuts(silences, total, chunk_duration)
+                logger.info(
+                    f"Aligned {len(cuts)} cuts to {len(silences)} pauses",
+                    extra={"total_duration": total},
+                )
+            segments, detected = segment_audio(
+                input_path,
+                output_dir,
+                base_name,
+                chunk_duration,
+                ffmpeg_args,
+                detect=silent_mode != "off" and not align,
+                cuts=cuts,
             )
-
-            ok, real_dur, qual = create_size_constrained_segment(
-                input_path, seg_path, start, dur
+            silences = silences or detected
+            for i, seg in enumerate(segments, 1):
+                if os.path.getsize(seg["path"]) > MAX_CHUNK_SIZE_BYTES:
+                    return _error(
+                        500,
+                        f"Segment {i} still too large at {kbps} kbps "
+                        f"({seg['size_mb']:.2f} MB)",
+                    )
+                seg["index"] = i
+                seg["silent_seconds"] = silent_seconds(
+                    silences, seg["start_time"], seg["start_time"] + seg["duration"]
+                )
+                seg["silent"] = silent_mode != "off" and (
+                    seg["silent_seconds"] >= SILENT_CHUNK_RATIO * seg["duration"]
+                )
+            logger.info(
+                f"Created {len(segments)} segments at {kbps} kbps in one pass"
             )
-            if not ok:
-                return _error(500, f"Failed to create segment {i+1}")
 
-            segments.append(
-                {
-                    "filename": seg_name,
-                    "path": seg_path,
-                    "start_time": start,
-                    "duration": real_dur,
-                    "quality": qual,
-                    "size_mb": get_file_size_mb(seg_path),
-                }
-            )
+            # ── Silence pruning ──────────────────────────────────────────
+            if silent_mode != "off":
+                silent = [seg for seg in segments if seg["silent"]]
+                skipped_seconds = sum(seg["duration"] for seg in silent)
+                total_silence = sum(seg["silent_seconds"] for seg in segments)
+                if silent_mode == "drop":
+                    segments = [seg for seg in segments if not seg["silent"]]
+                logger.info(
+                    f"{len(silent)} silent chunks ({skipped_seconds:.2f}s) "
+                    f"{'dropped' if silent_mode == 'drop' else 'marked'}",
+                    extra={
+                        "silent_chunks": len(silent),
+                        "silent_seconds": skipped_seconds,
+                        "total_silence_seconds": total_silence,
+                    },
+                )
+                if silent_mode == "drop":
+                    metrics.add_metric(
+                        name="SilentChunksSkipped",
+                        unit=MetricUnit.Count,
+                        value=len(silent),
+                    )
+                    metrics.add_metric(
+                        name="SilentSecondsSkipped",
+                        unit=MetricUnit.Seconds,
+                        value=skipped_seconds,
+                    )
+
+            # ── Upload & Build Response ──────────────────────────────────
+            upload_bucket = os.getenv("MEDIA_ASSETS_BUCKET_NAME", source_bucket)
+            keys = upload_segments(segments, upload_bucket, f"chunks/{asset_id}")
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.remove(input_path)
 
-        # ── Upload & Build Response ──────────────────────────────────────
-        upload_bucket = os.getenv("MEDIA_ASSETS_BUCKET_NAME", source_bucket)
         chunk_meta: List[Dict[str, Any]] = []
-
-        for idx, seg in enumerate(segments, 1):
-            seg_key = f"chunks/{asset_id}/{seg['filename']}"
-            s3_client.upload_file(seg["path"], upload_bucket, seg_key)
-
+        for seg, seg_key in zip(segments, keys):
             start = seg["start_time"]
             end = start + seg["duration"]
 
@@ -293,16 +448,18 @@ def lambda_handler(event: Dict[str, Any], context) -> Any:  # noqa: C901 (long f
                     "bucket": upload_bucket,
                     "key": seg_key,
                     "url": f"s3://{upload_bucket}/{seg_key}",
-                    "index": idx,
+                    "index": seg["index"],
                     "start_time": start,
                     "end_time": end,
                     "start_time_formatted": format_duration(start),
                     "end_time_formatted": format_duration(end),
                     "duration": seg["duration"],
                     "duration_formatted": format_duration(seg["duration"]),
-                    "size_bytes": os.path.getsize(seg["path"]),
+                    "size_bytes": int(seg["size_mb"] * 1024 * 1024),
                     "size_mb": seg["size_mb"],
-                    "quality_used": seg["quality"],
+                    "quality_used": f"{kbps}kbps",
+                    "silent_seconds": round(seg["silent_seconds"], 3),
+                    "silent": seg["silent"],
                     "mediaType": "Audio",
                     "asset_id": asset_id,
                     "inventory_id": inventory_id,
@@ -1,15 +1,49 @@
+"""
+Audio thumbnail node: waveform PNG plus a compact peaks file for players.
+
+ffmpeg reads the source through a presigned URL and pipes mono 16-bit PCM;
+:class:`PeakDecimator` folds every block into min/max buckets with NumPy
+and halves its resolution whenever it holds twice the target count, so
+memory stays bounded whatever the duration. From the same peaks:
+
+* ``waveform`` – the PNG thumbnail (``width`` x ``height``);
+* ``waveformPeaks`` – a BBC audiowaveform ``.dat`` file (version 1, 8-bit by
+  default: interleaved min/max per bucket after a 20-byte header) that
+  peaks.js / waveform-data.js read directly; a few KB per asset.
+
+ENV
+───
+WAVEFORM_SAMPLE_RATE  default 22050  (decode rate, Hz)
+WAVEFORM_PEAKS        default 2048   (peaks file holds 2048–4095 buckets)
+WAVEFORM_PEAK_BITS    default 8      (8 or 16)
+"""
+
+import io
 import json
 import os
+import struct
 import subprocess
-import tempfile
+import threading
+from typing import List, Optional, Tuple
 
 import boto3
+import numpy as np
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from PIL import Image
 
 logger = Logger()
 tracer = Tracer()
 
+FFMPEG_BIN = "/opt/bin/ffmpeg"
+SIGNED_URL_TIMEOUT = 3600
+SAMPLE_RATE = int(os.getenv("WAVEFORM_SAMPLE_RATE", "22050"))
+PEAK_BUCKETS = int(os.getenv("WAVEFORM_PEAKS", "2048"))
+PEAK_BITS = int(os.getenv("WAVEFORM_PEAK_BITS", "8"))
+READ_BYTES = 1 << 20  # PCM read from the pipe per block
+WAVEFORM_COLOR = (49, 130, 206, 255)
+
 
 def clean_asset_id(input_string: str) -> str:
     parts = input_string.split(":")
@@ -19,34 +53,178 @@ def clean_asset_id(input_string: str) -> str:
     return f"asset:uuid:{uuid}"
 
 
-def generate_waveform_thumbnail(
-    mp3_file_path, thumbnail_output_path, width=800, height=100
-):
+class PeakDecimator:
     """
-    Use the waveform tool (from https://github.com/andrewrk/waveform) to generate a waveform image.
-    This is just a stub—adjust the command line options as needed.
+    Streaming min/max peaks with bounded memory.
+
+    Samples are folded into buckets of ``samples_per_bucket``; once there
+    are ``2 * max_buckets`` buckets, neighbours are merged and the bucket
+    size doubles. The unfinished bucket is kept as (count, min, max) only.
     """
-    command = [
-        "waveform",
-        mp3_file_path,
-        "--png",
-        thumbnail_output_path,
-        "--png-width",
-        str(width),
-        "--png-height",
-        str(height),
+
+    def __init__(self, max_buckets: int, samples_per_bucket: int = 32):
+        self.max_buckets = max_buckets
+        self.samples_per_bucket = samples_per_bucket
+        self.samples = 0
+        self._mins = []
+        self._maxs = []
+        self._buckets = 0
+        self._carry: Optional[Tuple[int, int, int]] = None  # count, min, max
+
+    def feed(self, pcm: np.ndarray) -> None:
+        self.samples += len(pcm)
+        spb = self.samples_per_bucket
+        if self._carry:
+            count, lo, hi = self._carry
+            head, pcm = pcm[: spb - count], pcm[spb - count :]
+            if len(head):
+                lo, hi = min(lo, int(head.min())), max(hi, int(head.max()))
+            count += len(head)
+            if count < spb:
+                self._carry = (count, lo, hi)
+                return
+            self._append(np.array([lo], np.int16), np.array([hi], np.int16))
+            self._carry = None
+
+        full = len(pcm) // spb * spb
+        if full:
+            blocks = pcm[:full].reshape(-1, spb)
+            self._append(blocks.min(axis=1), blocks.max(axis=1))
+        if full < len(pcm):
+            rest = pcm[full:]
+            self._carry = (len(rest), int(rest.min()), int(rest.max()))
+        while self._buckets >= 2 * self.max_buckets:
+            self._halve()
+
+    def _append(self, mins: np.ndarray, maxs: np.ndarray) -> None:
+        self._mins.append(mins)
+        self._maxs.append(maxs)
+        self._buckets += len(mins)
+
+    def _halve(self) -> None:
+        mins, maxs = np.concatenate(self._mins), np.concatenate(self._maxs)
+        even = len(mins) // 2 * 2
+        if even < len(mins):
+            # the odd last bucket becomes the start of the next (double) one
+            count, lo, hi = self._carry or (0, int(mins[-1]), int(maxs[-1]))
+            self._carry = (
+                count + self.samples_per_bucket,
+                min(lo, int(mins[-1])),
+                max(hi, int(maxs[-1])),
+            )
+        self._mins = [np.minimum(mins[0:even:2], mins[1:even:2])]
+        self._maxs = [np.maximum(maxs[0:even:2], maxs[1:even:2])]
+        self._buckets = even // 2
+        self.samples_per_bucket *= 2
+
+    def peaks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(mins, maxs) of every bucket, the unfinished one included."""
+        mins, maxs = list(self._mins), list(self._maxs)
+        if self._carry:
+            mins.append(np.array([self._carry[1]], np.int16))
+            maxs.append(np.array([self._carry[2]], np.int16))
+        if not mins:
+            return np.zeros(1, np.int16), np.zeros(1, np.int16)
+        return np.concatenate(mins), np.concatenate(maxs)
+
+
+def decode_peaks(url: str) -> PeakDecimator:
+    """Decode *url* to mono PCM through an ffmpeg pipe, folding it into peaks."""
+    decimator = PeakDecimator(PEAK_BUCKETS)
+    cmd = [
+        FFMPEG_BIN,
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        url,
+        "-map",
+        "0:a:0",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "-",
     ]
-    subprocess.run(command, check=True)
-    logger.info(f"Generated waveform thumbnail: {thumbnail_output_path}")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Drain stderr alongside stdout so a chatty ffmpeg never blocks on it
+    stderr: List[str] = []
+
+    def _drain():
+        for line in io.TextIOWrapper(proc.stderr, errors="replace"):
+            stderr.append(line)
+
+    drain = threading.Thread(target=_drain, daemon=True)
+    drain.start()
+    odd = b""
+    while True:
+        block = proc.stdout.read(READ_BYTES)
+        if not block:
+            break
+        block = odd + block
+        odd = block[len(block) // 2 * 2 :]
+        decimator.feed(np.frombuffer(block[: len(block) // 2 * 2], dtype="<i2"))
+    returncode = proc.wait()
+    drain.join()
+    if returncode:
+        raise RuntimeError(f"ffmpeg decode failed: {''.join(stderr).strip()}")
+    return decimator
+
+
+def resample_peaks(
+    mins: np.ndarray, maxs: np.ndarray, width: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Min/max peaks regrouped into exactly *width* columns."""
+    n = len(mins)
+    if n >= width:
+        edges = np.linspace(0, n, width + 1).astype(int)[:-1]
+        return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+    index = (np.arange(width) * n // width).astype(int)
+    return mins[index], maxs[index]
+
+
+def render_png(mins: np.ndarray, maxs: np.ndarray, width: int, height: int) -> bytes:
+    """Waveform PNG: one vertical min→max line per column, transparent ground."""
+    cols_min, cols_max = resample_peaks(mins, maxs, width)
+    mid = (height - 1) / 2
+    top = np.floor(mid - cols_max.astype(np.float32) / 32768 * mid)
+    bottom = np.ceil(mid - cols_min.astype(np.float32) / 32768 * mid)
+    rows = np.arange(height, dtype=np.float32)[:, None]
+    mask = (rows >= top[None, :]) & (rows <= bottom[None, :])
+    pixels = np.zeros((height, width, 4), np.uint8)
+    pixels[mask] = WAVEFORM_COLOR
+    buf = io.BytesIO()
+    Image.fromarray(pixels, "RGBA").save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def encode_dat(decimator: PeakDecimator, bits: int = PEAK_BITS) -> bytes:
+    """audiowaveform .dat (version 1): header, then min/max pairs."""
+    mins, maxs = decimator.peaks()
+    pairs = np.empty(len(mins) * 2, np.int16)
+    pairs[0::2], pairs[1::2] = mins, maxs
+    if bits == 8:
+        body, flags = (pairs >> 8).astype(np.int8).tobytes(), 1
+    else:
+        body, flags = pairs.astype("<i2").tobytes(), 0
+    header = struct.pack(
+        "<iIiiI", 1, flags, SAMPLE_RATE, decimator.samples_per_bucket, len(mins)
+    )
+    return header + body
 
 
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
 def lambda_handler(event, context: LambdaContext):
+    clean_inventory_id = None
     try:
-        table_name = os.environ["MEDIALAKE_ASSET_TABLE"]
-        dynamodb = boto3.resource("dynamodb")
-        table = dynamodb.Table(table_name)
+        asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
+        # No middleware here: start every invocation with an empty cache
+        asset_cache.begin_execution(None)
 
         input_data = event.get("input", {}).get("DigitalSourceAsset", {})
         inventory_id = event.get("input", {}).get("InventoryID")
@@ -60,8 +238,8 @@ def lambda_handler(event, context: LambdaContext):
         key = primary_location.get("ObjectKey", {}).get("FullPath")
 
         output_bucket = event.get("output_bucket")
-        width = event.get("width", 800)
-        height = event.get("height", 100)
+        width = int(event.get("width", 800))
+        height = int(event.get("height", 100))
 
         if not all([key, bucket, output_bucket]):
             return {
@@ -71,77 +249,99 @@ def lambda_handler(event, context: LambdaContext):
 
         s3 = boto3.client("s3")
 
-        # Create temporary files for processing
-        with tempfile.NamedTemporaryFile(
-            suffix=".mp3"
-        ) as temp_input_file, tempfile.NamedTemporaryFile(
-            suffix=".png"
-        ) as temp_output_file:
-
-            # Download the audio file
-            logger.info(f"Downloading audio file from s3://{bucket}/{key}")
-            s3.download_file(bucket, key, temp_input_file.name)
-
-            # Generate the waveform thumbnail
-            logger.info(
-                f"Generating waveform thumbnail with dimensions {width}x{height}"
-            )
-            generate_waveform_thumbnail(
-                temp_input_file.name, temp_output_file.name, width=width, height=height
-            )
+        # Stream-decode the source straight from S3 into peaks
+        logger.info(f"Decoding peaks from s3://{bucket}/{key}")
+        url = s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=SIGNED_URL_TIMEOUT,
+        )
+        decimator = decode_peaks(url)
+        mins, maxs = decimator.peaks()
+        logger.info(
+            "Decoded peaks",
+            extra={
+                "samples": decimator.samples,
+                "buckets": len(mins),
+                "samples_per_bucket": decimator.samples_per_bucket,
+            },
+        )
 
-            # Upload the thumbnail to S3
-            output_key = f"{bucket}/{key.rsplit('.', 1)[0]}_waveform.png"
-            logger.info(f"Uploading thumbnail to s3://{output_bucket}/{output_key}")
-            s3.upload_file(
-                temp_output_file.name,
-                output_bucket,
-                output_key,
-                ExtraArgs={"ContentType": "image/png"},
-            )
+        # Render the thumbnail and the peaks file from the same peaks
+        stem = f"{bucket}/{key.rsplit('.', 1)[0]}"
+        output_key = f"{stem}_waveform.png"
+        peaks_key = f"{stem}_waveform.dat"
+        png = render_png(mins, maxs, width, height)
+        dat = encode_dat(decimator)
+        logger.info(f"Uploading thumbnail to s3://{output_bucket}/{output_key}")
+        s3.put_object(
+            Bucket=output_bucket, Key=output_key, Body=png, ContentType="image/png"
+        )
+        s3.put_object(
+            Bucket=output_bucket,
+            Key=peaks_key,
+            Body=dat,
+            ContentType="application/octet-stream",
+        )
 
-        # Create a new representation for the thumbnail
-        thumbnail_asset_id = f"{asset_id}:waveform"
-        new_representation = {
-            "ID": thumbnail_asset_id,
-            "Type": "Image",
-            "Format": "PNG",
-            "Purpose": "waveform",
-            "StorageInfo": {
+        def _location(object_key: str, size: int) -> dict:
+            return {
                 "PrimaryLocation": {
                     "StorageType": "s3",
                     "Provider": "aws",
                     "Bucket": output_bucket,
-                    "ObjectKey": {"FullPath": output_key},
+                    "ObjectKey": {"FullPath": object_key},
                     "Status": "active",
+                    "FileInfo": {"Size": size},
                 }
+            }
+
+        # Create the new representations for the thumbnail and the peaks
+        thumbnail_asset_id = f"{asset_id}:waveform"
+        new_representations = [
+            {
+                "ID": thumbnail_asset_id,
+                "Type": "Image",
+                "Format": "PNG",
+                "Purpose": "waveform",
+                "StorageInfo": _location(output_key, len(png)),
+                "ImageSpec": {"Resolution": {"Width": width, "Height": height}},
             },
-            "ImageSpec": {"Resolution": {"Width": width, "Height": height}},
-        }
+            {
+                "ID": f"{asset_id}:waveformPeaks",
+                "Type": "Data",
+                "Format": "AudiowaveformDat",
+                "Purpose": "waveformPeaks",
+                "StorageInfo": _location(peaks_key, len(dat)),
+                "WaveformSpec": {
+                    "SampleRate": SAMPLE_RATE,
+                    "SamplesPerPixel": decimator.samples_per_bucket,
+                    "Length": len(mins),
+                    "Bits": PEAK_BITS,
+                },
+            },
+        ]
+        purposes = {rep["Purpose"] for rep in new_representations}
 
-        # Update DynamoDB with the new representation
+        def _replace_reps(current):
+            reps = (current or {}).get("DerivedRepresentations", [])
+            kept = [r for r in reps if r.get("Purpose") not in purposes]
+            return {
+                "UpdateExpression": "SET #dr = :dr",
+                "ExpressionAttributeNames": {"#dr": "DerivedRepresentations"},
+                "ExpressionAttributeValues": {":dr": kept + new_representations},
+            }
+
+        # Update DynamoDB with the new representations
         try:
             logger.info(
                 "Attempting DynamoDB update",
                 extra={
                     "inventory_id": clean_inventory_id,
-                    "new_representation": new_representation,
-                },
-            )
-            response = table.update_item(
-                Key={"InventoryID": clean_inventory_id},
-                UpdateExpression="SET #dr = list_append(if_not_exists(#dr, :empty_list), :new_rep)",
-                ExpressionAttributeNames={"#dr": "DerivedRepresentations"},
-                ExpressionAttributeValues={
-                    ":new_rep": [new_representation],
-                    ":empty_list": [],
+                    "new_representations": new_representations,
                 },
-                ReturnValues="UPDATED_NEW",
-            )
-            logger.info(
-                "DynamoDB update response",
-                extra={"response": response, "inventory_id": clean_inventory_id},
             )
+            asset_cache.modify(clean_inventory_id, _replace_reps)
         except Exception as e:
             logger.exception(
                 "Error updating DynamoDB",
@@ -171,6 +371,11 @@ def lambda_handler(event, context: LambdaContext):
                         }
                     },
                     "location": {"bucket": output_bucket, "key": output_key},
+                    "peaks": {
+                        "bucket": output_bucket,
+                        "key": peaks_key,
+                        "size": len(dat),
+                    },
                 }
             ),
         }
@@ -6,6 +6,7 @@ import re
 from decimal import Decimal
 
 import boto3
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from botocore.exceptions import ClientError
 from jinja2 import Environment, FileSystemLoader
@@ -18,7 +19,7 @@ tracer = Tracer()
 # Initialize AWS clients
 s3 = boto3.resource("s3")
 s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 transcribe_client = boto3.client("transcribe")
 
 
@@ -180,9 +181,8 @@ def lambda_handler(event, context):
         transcript_uri = status["TranscriptionJob"]["Transcript"]["TranscriptFileUri"]
         bucket, s3_key = http_to_s3_comps(transcript_uri)
 
-        table = dynamodb.Table(os.getenv("MEDIALAKE_ASSET_TABLE"))
-        table.update_item(
-            Key={"InventoryID": inventory_id},
+        updated_item = asset_cache.update(
+            inventory_id,
             UpdateExpression="SET TranscriptionS3Uri = :val",
             ExpressionAttributeValues={":val": f"s3://{bucket}/{s3_key}"},
         )
@@ -192,8 +192,6 @@ def lambda_handler(event, context):
             "transcript"
         ]
 
-        updated_item = table.get_item(Key={"InventoryID": inventory_id}).get("Item", {})
-
     logger.info("Creating response output")
     result = create_response_output(
         s3_templates, api_template_bucket, status, event, mapping
@@ -8,6 +8,7 @@ from typing import Any, Callable, Dict, Union
 from urllib.parse import urlparse
 
 import boto3
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from botocore.exceptions import ClientError
 from jinja2 import Environment, FileSystemLoader
@@ -21,8 +22,7 @@ tracer = Tracer()
 
 s3 = boto3.resource("s3")
 bedrock_rt = boto3.client("bedrock-runtime")
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 
 # ────────────────────────────────────────────────────────────
 # Constants
@@ -496,15 +496,14 @@ def lambda_handler(event, context):
         logger.info(
             f"DynamoDB key formatting: prompt_name='{prompt_name}' -> formatted='{formatted_prompt_name}' -> dynamo_key='{dynamo_key}'"
         )
-        table.update_item(
-            Key={"InventoryID": asset_id},
+        updated = asset_cache.update(
+            asset_id,
             UpdateExpression="SET #k = :v",
             ExpressionAttributeNames={"#k": dynamo_key},
             ExpressionAttributeValues={":v": result},
         )
 
         final = create_response_output(tpl_paths, bucket, data, event, mapping)
-        updated = table.get_item(Key={"InventoryID": asset_id}).get("Item", {})
         final["updatedAsset"] = _strip_decimals(updated)
         return final
 
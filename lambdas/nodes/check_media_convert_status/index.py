@@ -4,10 +4,11 @@ import json
 import os
 import random
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import boto3
 import botocore
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
@@ -78,6 +79,61 @@ def load_and_execute_function_from_s3(bucket: str, key: str, fn: str, event: dic
     return getattr(mod, fn)(event)
 
 
+def hls_representation(job: Dict[str, Any], asset_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Representation of the CMAF HLS output group, if the job had one: the
+    master playlist, plus every file of the ladder (relative to it) so the
+    asset API can presign them all.
+    """
+    for group in job["Settings"]["OutputGroups"]:
+        settings = group["OutputGroupSettings"]
+        if settings.get("Type") == "CMAF_GROUP_SETTINGS":
+            break
+    else:
+        return None
+    cmaf = settings["CmafGroupSettings"]
+    bucket, base = cmaf["Destination"].split("s3://", 1)[1].split("/", 1)
+    prefix = f"{base.rsplit('/', 1)[0]}/"
+
+    files, size = [], 0
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            files.append(obj["Key"][len(prefix) :])
+            size += obj["Size"]
+
+    renditions = []
+    for out in group.get("Outputs", []):
+        video = out.get("VideoDescription")
+        if video:
+            h264 = video["CodecSettings"].get("H264Settings", {})
+            renditions.append(
+                {"Height": video.get("Height"), "MaxBitrate": h264.get("MaxBitrate")}
+            )
+    return {
+        "ID": f"{asset_id}:hls",
+        "Type": "Video",
+        "Format": "HLS",
+        "Purpose": "hls",
+        "StorageInfo": {
+            "PrimaryLocation": {
+                "Bucket": bucket,
+                "ObjectKey": {"FullPath": f"{base}.m3u8"},
+                "FileInfo": {"Size": size},
+                "Provider": "aws",
+                "Status": "active",
+                "StorageType": "s3",
+            }
+        },
+        "HlsSpec": {
+            "Container": "CMAF",
+            "SegmentSeconds": cmaf.get("SegmentLength"),
+            "Renditions": renditions,
+            "Files": sorted(files),
+        },
+    }
+
+
 def build_s3_templates_path(service: str, resource: str, method: str) -> dict:
     base = f"{resource.split('/')[-1]}_{method.lower()}"
     return {
@@ -116,7 +172,7 @@ def create_response_output(tmpls, bucket, resp, event):
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
 def lambda_handler(event: Dict[str, Any], _: LambdaContext):
-    table = boto3.resource("dynamodb").Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+    asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
     api_template_bucket = os.environ.get("API_TEMPLATE_BUCKET", "medialake-assets")
 
     # ── pull job-id ──
@@ -200,6 +256,9 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext):
                     },
                 ]
             )
+            hls = hls_representation(response["Job"], asset_id)
+            if hls:
+                reps.append(hls)
         else:
             # AUDIO
             for grp in response["Job"]["Settings"]["OutputGroups"]:
@@ -233,8 +292,8 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext):
             )
 
         try:
-            table.update_item(
-                Key={"InventoryID": clean_inv_id},
+            asset_cache.update(
+                clean_inv_id,
                 UpdateExpression="SET DerivedRepresentations = list_append(if_not_exists(DerivedRepresentations, :empty), :r)",
                 ConditionExpression="attribute_not_exists(DerivedRepresentations) OR NOT contains(DerivedRepresentations, :proxy_id)",
                 ExpressionAttributeValues={
@@ -242,7 +301,6 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext):
                     ":empty": [],
                     ":proxy_id": reps[0]["ID"],
                 },
-                ReturnValues="UPDATED_NEW",
             )
         except botocore.exceptions.ClientError as e:
             if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
@@ -250,8 +308,8 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext):
             else:
                 raise
 
-    # ── FETCH UPDATED DYNAMO RECORD & strip Decimals ───────────────────────
-    updated_item = table.get_item(Key={"InventoryID": clean_inv_id}).get("Item", {})
+    # ── UPDATED RECORD (kept by the cache from the write) & strip Decimals ──
+    updated_item = asset_cache.get(clean_inv_id) or {}
     result["updatedAsset"] = _strip_decimals(updated_item)
 
     return result
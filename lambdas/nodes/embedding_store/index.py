@@ -1,8 +1,11 @@
 """
 Store embedding vectors in OpenSearch.
 
-* Clip/audio segments are indexed as new documents with SMPTE time-codes.
-* Master video documents are updated in-place when a whole-file embedding arrives.
+* Clip/audio segments are indexed as new documents with SMPTE time-codes,
+  batched through the _bulk API, into the clip index (``<INDEX_NAME>-clips``
+  alias) routed by asset ID.
+* Master video documents are updated in-place when a whole-file embedding arrives;
+  all video-scope embeddings of an invocation go out as one partial update.
 """
 
 from __future__ import annotations
@@ -14,8 +17,14 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from embedding_utils import (
+    EmbeddingValidationError,
+    prepare_embedding,
+    prepare_embeddings,
+)
 from lambda_middleware import lambda_middleware
 from lambda_utils import _truncate_floats
 from nodes_utils import seconds_to_smpte
@@ -25,15 +34,28 @@ from opensearchpy import AWSV4SignerAuth, OpenSearch, RequestsHttpConnection, ex
 # Powertools
 logger = Logger()
 tracer = Tracer(disabled=False)
+metrics = Metrics(namespace="MediaLake", service="embedding_store")
 
 # Environment
 OPENSEARCH_ENDPOINT = os.getenv("OPENSEARCH_ENDPOINT", "")
 INDEX_NAME = os.getenv("INDEX_NAME", "media")
+CLIP_INDEX_NAME = os.getenv("CLIP_INDEX_NAME") or f"{INDEX_NAME}-clips"
 CONTENT_TYPE = os.getenv("CONTENT_TYPE", "video").lower()  # "video" | "audio"
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 EVENT_BUS_NAME = os.getenv("EVENT_BUS_NAME", "default-event-bus")
 
 IS_AUDIO_CONTENT = CONTENT_TYPE == "audio"
+EMBEDDING_L2_NORMALIZE = os.getenv("EMBEDDING_L2_NORMALIZE", "false").lower() == "true"
+
+# Bulk indexing
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(5 * 1024 * 1024)))
+BULK_MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", "5"))
+BULK_RETRY_BASE_DELAY = float(os.getenv("BULK_RETRY_BASE_DELAY", "0.5"))
+_RETRYABLE_BULK_STATUSES = {429, 502, 503, 504}
+
+# Upper bound on how long to wait for the stream sync to index the master doc
+MASTER_DOC_MAX_WAIT_SECONDS = float(os.getenv("MASTER_DOC_MAX_WAIT_SECONDS", "10"))
+MASTER_UPDATE_RETRY_ON_CONFLICT = int(os.getenv("MASTER_UPDATE_RETRY_ON_CONFLICT", "10"))
 
 # OpenSearch client
 _session = boto3.Session()
@@ -100,6 +122,28 @@ def extract_asset_id(container: Dict[str, Any]) -> Optional[str]:
     return container.get("DigitalSourceAsset", {}).get("ID")
 
 
+def extract_inventory_id(container: Dict[str, Any]) -> Optional[str]:
+    # Check if data is an array (batch processing) - get from first item
+    if isinstance(container.get("data"), list) and container["data"]:
+        first_item = container["data"][0]
+        if isinstance(first_item, dict) and first_item.get("inventory_id"):
+            return first_item["inventory_id"]
+
+    itm = _item(container)
+    if itm and itm.get("inventory_id"):
+        return itm["inventory_id"]
+
+    m_itm = _map_item(container)
+    if m_itm and m_itm.get("inventory_id"):
+        return m_itm["inventory_id"]
+
+    for asset in container.get("assets", []):
+        if isinstance(asset, dict) and asset.get("InventoryID"):
+            return asset["InventoryID"]
+
+    return container.get("InventoryID")
+
+
 def extract_scope(container: Dict[str, Any]) -> Optional[str]:
     itm = _item(container)
     if itm and itm.get("embedding_scope"):
@@ -268,24 +312,16 @@ def check_opensearch_response(resp: Dict[str, Any], op: str) -> None:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# One-shot master-document cache + FPS extraction
-_master_doc_cache: Dict[str, Dict[str, Any]] = {}  # asset_id → _source
-
-
-def _get_master_doc(
-    client: OpenSearch,
-    asset_id: str,
-    is_video: bool,
-    max_retries: int = 50,
-    delay_seconds: float = 1.0,
-) -> Dict[str, Any]:
-    """
-    Fetches the master document for a given asset_id, retrying up to max_retries
-    times if no document is found.
-    """
-    # return cached if available
-    if asset_id in _master_doc_cache:
-        return _master_doc_cache[asset_id]
+# Master-document lookup + FPS extraction
+def _lookup_master_doc(
+    client: OpenSearch, asset_id: str, inventory_id: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """Single lookup attempt; returns the hit metadata or None if not indexed yet."""
+    if inventory_id:
+        try:
+            return client.get(index=INDEX_NAME, id=inventory_id, _source=False)
+        except exceptions.NotFoundError:
+            return None
 
     filters = [
         {"term": {"DigitalSourceAsset.ID": asset_id}},
@@ -297,27 +333,113 @@ def _get_master_doc(
             }
         },
     ]
+    resp = client.search(
+        index=INDEX_NAME,
+        body={
+            "query": {"bool": {"filter": filters}},
+            "_source": False,
+        },
+        size=1,
+    )
+    check_opensearch_response(resp, "search")
+    hits = resp.get("hits", {}).get("hits", [])
+    return hits[0] if hits else None
 
-    for attempt in range(1, max_retries + 1):
-        resp = client.search(
-            index=INDEX_NAME,
-            body={"query": {"bool": {"filter": filters}}},
-            size=1,
-        )
-        total_hits = resp.get("hits", {}).get("total", {}).get("value", 0)
 
-        if total_hits > 0:
-            doc = resp["hits"]["hits"][0]["_source"]
-            _master_doc_cache[asset_id] = doc
+def _get_master_doc(
+    client: OpenSearch,
+    asset_id: str,
+    inventory_id: Optional[str],
+    max_wait_seconds: float = MASTER_DOC_MAX_WAIT_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Return the hit metadata (``_id`` etc.) of the master document.
+
+    The DynamoDB → OpenSearch ingestion pipeline indexes every asset record
+    under its InventoryID, so when that is known the document is fetched by
+    ID (a realtime get – no search or index refresh needed). Otherwise we fall
+    back to a filtered search on DigitalSourceAsset.ID. Either way a missing
+    document is retried with a short, capped exponential backoff.
+    """
+    deadline = time.monotonic() + max_wait_seconds
+    delay = 0.2
+    attempt = 0
+    while True:
+        attempt += 1
+        doc = _lookup_master_doc(client, asset_id, inventory_id)
+        if doc:
             return doc
 
-        # not found, wait and retry
-        time.sleep(delay_seconds)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(
+                f"No master document for asset {asset_id} "
+                f"(InventoryID={inventory_id}) in '{INDEX_NAME}' "
+                f"after {attempt} attempts"
+            )
+        logger.info(
+            "Master doc not indexed yet – backing off",
+            extra={"asset_id": asset_id, "attempt": attempt, "delay": delay},
+        )
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 2.0)
+
 
-    # after all retries
-    raise RuntimeError(
-        f"No master document found for asset {asset_id} after {max_retries} attempts"
+def _master_update_doc(
+    embeddings: List[Tuple[List[float], Optional[str], Optional[str]]],
+) -> Dict[str, Any]:
+    """
+    Merge every (vector, embedding_option, scope) for one asset into a single
+    partial document. Audio vectors go to ``audio_embedding`` and only fill
+    ``embedding`` when no visual embedding is part of the same update.
+    """
+    doc: Dict[str, Any] = {
+        "type": CONTENT_TYPE,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    for vector, option, scope in embeddings:
+        if option == "audio":
+            doc["audio_embedding"] = vector
+            doc.setdefault("embedding", vector)
+        else:
+            doc["embedding"] = vector
+        doc["embedding_scope"] = scope
+        if option is not None:
+            doc["embedding_option"] = option
+    return doc
+
+
+def update_master_document(
+    client: OpenSearch,
+    asset_id: str,
+    inventory_id: Optional[str],
+    embeddings: List[Tuple[List[float], Optional[str], Optional[str]]],
+) -> str:
+    """
+    Apply all master-level embeddings for an asset as one partial update.
+
+    Partial ``doc`` updates are merged on the primary shard, so writers that
+    touch different fields never overwrite each other; ``retry_on_conflict``
+    lets OpenSearch re-apply the merge itself if another write lands in
+    between, instead of a client-side get/sleep loop.
+    """
+    existing_id = _get_master_doc(client, asset_id, inventory_id)["_id"]
+    res = client.update(
+        index=INDEX_NAME,
+        id=existing_id,
+        body={"doc": _master_update_doc(embeddings)},
+        retry_on_conflict=MASTER_UPDATE_RETRY_ON_CONFLICT,
+    )
+    check_opensearch_response(res, "update")
+    logger.info(
+        "Updated master document",
+        extra={
+            "asset_id": asset_id,
+            "document_id": existing_id,
+            "embeddings": len(embeddings),
+        },
     )
+    return existing_id
 
 
 def _extract_fps(master_src: Dict[str, Any], asset_id: str) -> int:
@@ -334,13 +456,21 @@ def _extract_fps(master_src: Dict[str, Any], asset_id: str) -> int:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-def process_single_embedding(
-    payload: Dict[str, Any], embedding_data: Dict[str, Any], client, asset_id: str
+# Clip documents
+def _clip_document_id(
+    asset_id: str, scope: Optional[str], option: Optional[str], start: int, end: int
+) -> str:
+    """Deterministic _id so a retried bulk item overwrites instead of duplicating."""
+    return f"{asset_id}_{scope or 'clip'}_{option or 'default'}_{start}_{end}"
+
+
+def build_clip_document(
+    payload: Dict[str, Any], embedding_data: Dict[str, Any], asset_id: str
 ) -> Dict[str, Any]:
-    """Process a single embedding object."""
+    """Build (but do not index) the OpenSearch document for one clip embedding."""
     embedding_vector = embedding_data.get("float")
     if not embedding_vector:
-        return _bad_request("No embedding vector found in embedding data")
+        raise RuntimeError("No embedding vector found in embedding data")
 
     # Create a temporary payload for this embedding
     temp_payload = {
@@ -365,10 +495,11 @@ def process_single_embedding(
     start_tc = seconds_to_smpte(start_sec, fps)
     end_tc = seconds_to_smpte(end_sec, fps)
 
+    doc_scope = "clip" if IS_AUDIO_CONTENT else scope
     document: Dict[str, Any] = {
         "type": CONTENT_TYPE,
         "embedding": embedding_vector,
-        "embedding_scope": "clip" if IS_AUDIO_CONTENT else scope,
+        "embedding_scope": doc_scope,
         "timestamp": datetime.utcnow().isoformat(),
         "DigitalSourceAsset": {"ID": asset_id},
         "start_timecode": start_tc,
@@ -377,28 +508,157 @@ def process_single_embedding(
     if embedding_option is not None:
         document["embedding_option"] = embedding_option
 
-    try:
-        res = client.index(index=INDEX_NAME, body=document)
-        check_opensearch_response(res, "index")
+    return {
+        "document_id": _clip_document_id(
+            asset_id, doc_scope, embedding_option, start_sec, end_sec
+        ),
+        "document": document,
+        "start_sec": start_sec,
+        "end_sec": end_sec,
+    }
 
-        return {
-            "document_id": res.get("_id", "unknown"),
-            "start_sec": start_sec,
-            "end_sec": end_sec,
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Bulk indexing
+def _encode_bulk_action(doc_id: str, document: Dict[str, Any]) -> bytes:
+    # Clips are routed by asset so per-asset reads and deletes hit one shard
+    action = {
+        "index": {
+            "_index": CLIP_INDEX_NAME,
+            "_id": doc_id,
+            "routing": document["DigitalSourceAsset"]["ID"],
         }
-    except Exception as e:
-        logger.error(
-            "Failed to index document in OpenSearch",
-            extra={"asset_id": asset_id, "error": str(e), "index": INDEX_NAME},
+    }
+    return (
+        json.dumps(action, separators=(",", ":"))
+        + "\n"
+        + json.dumps(document, separators=(",", ":"))
+        + "\n"
+    ).encode("utf-8")
+
+
+def _bulk_chunks(
+    actions: List[Tuple[str, bytes]], max_bytes: int
+) -> List[List[Tuple[str, bytes]]]:
+    """Split encoded actions into request bodies of at most *max_bytes* each."""
+    chunks: List[List[Tuple[str, bytes]]] = []
+    current: List[Tuple[str, bytes]] = []
+    current_size = 0
+    for doc_id, line in actions:
+        if current and current_size + len(line) > max_bytes:
+            chunks.append(current)
+            current, current_size = [], 0
+        current.append((doc_id, line))
+        current_size += len(line)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bulk_index_documents(
+    client: OpenSearch, documents: List[Tuple[str, Dict[str, Any]]], asset_id: str
+) -> List[str]:
+    """
+    Index *documents* ((doc_id, body) pairs) through the _bulk API.
+
+    Request bodies are capped at BULK_MAX_BYTES. Items rejected with a
+    retryable status (throttling / transient node errors) are resent with
+    exponential backoff; any other per-item error fails the invocation.
+    """
+    pending = [(doc_id, _encode_bulk_action(doc_id, doc)) for doc_id, doc in documents]
+    indexed: List[str] = []
+    started = time.perf_counter()
+    attempt = 0
+
+    while pending:
+        retry: List[Tuple[str, bytes]] = []
+        for chunk in _bulk_chunks(pending, BULK_MAX_BYTES):
+            body = b"".join(line for _, line in chunk)
+            request_start = time.perf_counter()
+            try:
+                resp = client.bulk(body=body)
+            except exceptions.TransportError as e:
+                if e.status_code in _RETRYABLE_BULK_STATUSES:
+                    retry.extend(chunk)
+                    continue
+                raise RuntimeError(
+                    f"Bulk request failed for asset {asset_id}: {str(e)}"
+                ) from e
+            finally:
+                metrics.add_metric(
+                    name="EmbeddingBulkLatency",
+                    unit=MetricUnit.Milliseconds,
+                    value=(time.perf_counter() - request_start) * 1000,
+                )
+
+            if not resp.get("errors"):
+                indexed.extend(doc_id for doc_id, _ in chunk)
+                continue
+
+            for (doc_id, line), item in zip(chunk, resp.get("items", [])):
+                result = item.get("index", {})
+                if "error" not in result:
+                    indexed.append(doc_id)
+                elif result.get("status") in _RETRYABLE_BULK_STATUSES:
+                    retry.append((doc_id, line))
+                else:
+                    reason = result["error"].get("reason", "Unknown error")
+                    logger.error(
+                        "Bulk item failed",
+                        extra={
+                            "asset_id": asset_id,
+                            "document_id": doc_id,
+                            "status": result.get("status"),
+                            "error": reason,
+                        },
+                    )
+                    raise RuntimeError(
+                        f"Failed to index document {doc_id} for asset {asset_id}: "
+                        f"{reason} (status {result.get('status')})"
+                    )
+
+        if not retry:
+            break
+        attempt += 1
+        if attempt > BULK_MAX_RETRIES:
+            raise RuntimeError(
+                f"{len(retry)} bulk items for asset {asset_id} still failing "
+                f"after {BULK_MAX_RETRIES} retries"
+            )
+        delay = min(BULK_RETRY_BASE_DELAY * 2 ** (attempt - 1), 5.0)
+        logger.warning(
+            "Retrying throttled bulk items",
+            extra={"asset_id": asset_id, "count": len(retry), "delay": delay},
         )
-        raise RuntimeError(
-            f"Failed to index document for asset {asset_id}: {str(e)}"
-        ) from e
+        time.sleep(delay)
+        pending = retry
+
+    elapsed = time.perf_counter() - started
+    metrics.add_metric(
+        name="EmbeddingDocsIndexed", unit=MetricUnit.Count, value=len(indexed)
+    )
+    if elapsed > 0:
+        metrics.add_metric(
+            name="EmbeddingBulkThroughput",
+            unit=MetricUnit.CountPerSecond,
+            value=len(indexed) / elapsed,
+        )
+    logger.info(
+        "Bulk indexed clip documents",
+        extra={
+            "asset_id": asset_id,
+            "count": len(indexed),
+            "seconds": round(elapsed, 3),
+            "retries": attempt,
+        },
+    )
+    return indexed
 
 
 @lambda_middleware(event_bus_name=EVENT_BUS_NAME)
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
+@metrics.log_metrics
 def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
     try:
         truncated = _truncate_floats(event, max_items=10)
@@ -431,6 +691,7 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
             logger.info(f"Processing batch of {len(payload['data'])} embeddings")
             results = []
             video_scope_embeddings = []
+            clip_documents = []
 
             # Separate video scope embeddings from clip embeddings
             for i, embedding_data in enumerate(payload["data"]):
@@ -449,19 +710,10 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                 if scope == "video" and not IS_AUDIO_CONTENT:
                     video_scope_embeddings.append((i, embedding_data, scope))
                 else:
-                    # Process clip/audio embeddings
+                    # Build clip/audio documents; they are indexed in bulk below
                     try:
-                        result = process_single_embedding(
-                            payload, embedding_data, client, asset_id
-                        )
-                        results.append(result)
-                        logger.info(
-                            f"Processed clip embedding {i+1}/{len(payload['data'])}",
-                            extra={
-                                "document_id": result["document_id"],
-                                "start_sec": result["start_sec"],
-                                "end_sec": result["end_sec"],
-                            },
+                        clip_documents.append(
+                            build_clip_document(payload, embedding_data, asset_id)
                         )
                     except Exception as e:
                         logger.error(
@@ -472,195 +724,83 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                             f"Failed to process clip embedding {i+1}: {str(e)}"
                         ) from e
 
-            # Process video scope embeddings (update master documents)
-            for i, embedding_data, scope in video_scope_embeddings:
-                try:
-                    embedding_vector = embedding_data.get("float")
-                    if not embedding_vector:
-                        logger.error(
-                            f"No embedding vector found in video embedding {i+1}"
-                        )
-                        raise RuntimeError(
-                            f"No embedding vector found in video embedding {i+1}"
-                        )
-
-                    temp_payload = {
-                        "data": embedding_data,
-                        **{k: v for k, v in payload.items() if k != "data"},
-                    }
-                    embedding_option = embedding_data.get(
-                        "embedding_option"
-                    ) or extract_embedding_option(temp_payload)
-
-                    # Update master document (similar to non-batch logic)
-                    search_query = {
-                        "query": {
-                            "bool": {
-                                "filter": [
-                                    {"term": {"DigitalSourceAsset.ID": asset_id}},
-                                    {"exists": {"field": "InventoryID"}},
-                                    {
-                                        "nested": {
-                                            "path": "DerivedRepresentations",
-                                            "query": {
-                                                "exists": {
-                                                    "field": "DerivedRepresentations.ID"
-                                                }
-                                            },
-                                        }
-                                    },
-                                ]
-                            }
-                        }
+            if clip_documents:
+                # One vectorised validation pass for every clip in the batch
+                _, vectors = prepare_embeddings(
+                    [c["document"]["embedding"] for c in clip_documents],
+                    normalize=EMBEDDING_L2_NORMALIZE,
+                    source="Clip embedding",
+                )
+                for clip, vector in zip(clip_documents, vectors):
+                    clip["document"]["embedding"] = vector
+                bulk_index_documents(
+                    client,
+                    [(c["document_id"], c["document"]) for c in clip_documents],
+                    asset_id,
+                )
+                results.extend(
+                    {
+                        "document_id": c["document_id"],
+                        "start_sec": c["start_sec"],
+                        "end_sec": c["end_sec"],
                     }
+                    for c in clip_documents
+                )
 
-                    logger.info(
-                        f"Searching for master document for video embedding {i+1}",
-                        extra={"index": INDEX_NAME, "asset_id": asset_id},
+            # Video scope embeddings → one merged master-document update
+            master_embeddings = []
+            for i, embedding_data, scope in video_scope_embeddings:
+                embedding_vector = embedding_data.get("float")
+                if not embedding_vector:
+                    logger.error(f"No embedding vector found in video embedding {i+1}")
+                    raise RuntimeError(
+                        f"No embedding vector found in video embedding {i+1}"
                     )
-                    start_time = time.time()
-                    try:
-                        search_resp = client.search(
-                            index=INDEX_NAME, body=search_query, size=1
-                        )
-                        check_opensearch_response(search_resp, "search")
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to search for master document in batch video embedding {i+1}",
-                            extra={
-                                "asset_id": asset_id,
-                                "error": str(e),
-                                "index": INDEX_NAME,
-                            },
-                        )
-                        raise RuntimeError(
-                            f"Failed to search for master document in batch video embedding {i+1} for asset {asset_id}: {str(e)}"
-                        ) from e
-
-                    while (
-                        search_resp["hits"]["total"]["value"] == 0
-                        and time.time() - start_time < 120
-                    ):
-                        logger.info(
-                            "Master doc not found – refreshing index & retrying …"
-                        )
-                        try:
-                            client.indices.refresh(index=INDEX_NAME)
-                            time.sleep(5)
-                            search_resp = client.search(
-                                index=INDEX_NAME, body=search_query, size=1
-                            )
-                            check_opensearch_response(search_resp, "search")
-                        except Exception as e:
-                            logger.error(
-                                f"Failed to refresh index and retry search in batch video embedding {i+1}",
-                                extra={
-                                    "asset_id": asset_id,
-                                    "error": str(e),
-                                    "index": INDEX_NAME,
-                                },
-                            )
-                            raise RuntimeError(
-                                f"Failed to refresh index and retry search in batch video embedding {i+1} for asset {asset_id}: {str(e)}"
-                            ) from e
-
-                    if search_resp["hits"]["total"]["value"] == 0:
-                        raise RuntimeError(
-                            f"No master doc with DigitalSourceAsset.ID={asset_id} in '{INDEX_NAME}'"
-                        )
-
-                    existing_id = search_resp["hits"]["hits"][0]["_id"]
-                    try:
-                        meta = client.get(index=INDEX_NAME, id=existing_id)
-                        check_opensearch_response(meta, "get")
-                        seq_no = meta["_seq_no"]
-                        p_term = meta["_primary_term"]
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to get document metadata in batch video embedding {i+1}",
-                            extra={
-                                "asset_id": asset_id,
-                                "document_id": existing_id,
-                                "error": str(e),
-                                "index": INDEX_NAME,
-                            },
-                        )
-                        raise RuntimeError(
-                            f"Failed to get metadata for document {existing_id} in batch video embedding {i+1} (asset {asset_id}): {str(e)}"
-                        ) from e
 
-                    update_body = {
-                        "doc": {
-                            "type": CONTENT_TYPE,
-                            "embedding": embedding_vector,
-                            "embedding_scope": scope,
-                            "timestamp": datetime.utcnow().isoformat(),
-                        }
-                    }
-                    if embedding_option == "audio":
-                        update_body["doc"]["audio_embedding"] = embedding_vector
-                    else:
-                        update_body["doc"]["embedding"] = embedding_vector
-                    if embedding_option is not None:
-                        update_body["doc"]["embedding_option"] = embedding_option
-
-                    for attempt in range(50):
-                        try:
-                            res = client.update(
-                                index=INDEX_NAME,
-                                id=existing_id,
-                                body=update_body,
-                                if_seq_no=seq_no,
-                                if_primary_term=p_term,
-                            )
-                            check_opensearch_response(res, "update")
-                            break
-                        except exceptions.ConflictError:
-                            try:
-                                meta = client.get(index=INDEX_NAME, id=existing_id)
-                                seq_no = meta["_seq_no"]
-                                p_term = meta["_primary_term"]
-                                time.sleep(1)
-                            except Exception as e:
-                                logger.error(
-                                    "Failed to resolve conflict during batch video embedding update",
-                                    extra={
-                                        "asset_id": asset_id,
-                                        "document_id": existing_id,
-                                        "error": str(e),
-                                        "attempt": attempt + 1,
-                                        "embedding_index": i + 1,
-                                    },
-                                )
-                                raise RuntimeError(
-                                    f"Failed to resolve conflict for batch video embedding {i+1} document {existing_id} (asset {asset_id}): {str(e)}"
-                                ) from e
-                    else:
-                        raise RuntimeError(
-                            "Failed to update master document after 50 retries"
-                        )
-
-                    results.append(
-                        {
-                            "document_id": existing_id,
-                            "type": "master_update",
-                            "scope": scope,
-                        }
-                    )
-                    logger.info(
-                        f"Updated master document for video embedding {i+1}/{len(payload['data'])}",
-                        extra={"document_id": existing_id, "scope": scope},
+                temp_payload = {
+                    "data": embedding_data,
+                    **{k: v for k, v in payload.items() if k != "data"},
+                }
+                embedding_option = embedding_data.get(
+                    "embedding_option"
+                ) or extract_embedding_option(temp_payload)
+                master_embeddings.append((embedding_vector, embedding_option, scope))
+
+            if master_embeddings:
+                _, vectors = prepare_embeddings(
+                    [vector for vector, _, _ in master_embeddings],
+                    normalize=EMBEDDING_L2_NORMALIZE,
+                    source="Video embedding",
+                )
+                master_embeddings = [
+                    (vector, option, scope)
+                    for vector, (_, option, scope) in zip(vectors, master_embeddings)
+                ]
+                try:
+                    existing_id = update_master_document(
+                        client,
+                        asset_id,
+                        extract_inventory_id(payload),
+                        master_embeddings,
                     )
-
                 except Exception as e:
                     logger.error(
-                        f"Failed to process video embedding {i+1}",
-                        extra={"error": str(e)},
+                        "Failed to update master document for batch video embeddings",
+                        extra={"asset_id": asset_id, "error": str(e)},
                     )
                     raise RuntimeError(
-                        f"Failed to process video embedding {i+1}: {str(e)}"
+                        f"Failed to update master document for asset {asset_id}: {str(e)}"
                     ) from e
 
+                results.extend(
+                    {
+                        "document_id": existing_id,
+                        "type": "master_update",
+                        "scope": scope,
+                    }
+                    for _, _, scope in master_embeddings
+                )
+
             return {
                 "statusCode": 200,
                 "body": json.dumps(
@@ -685,6 +825,12 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
 
         if not embedding_vector:
             return _bad_request("No embedding vector found in event or assets")
+        try:
+            _, embedding_vector = prepare_embedding(
+                embedding_vector, normalize=EMBEDDING_L2_NORMALIZE
+            )
+        except EmbeddingValidationError as e:
+            return _bad_request(str(e))
 
         scope = extract_scope(payload)
         embedding_option = extract_embedding_option(payload)
@@ -738,7 +884,7 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
             logger.info(
                 "Indexing new clip/audio document",
                 extra={
-                    "index": INDEX_NAME,
+                    "index": CLIP_INDEX_NAME,
                     "doc_preview": {
                         **document,
                         "embedding": f"<len {len(embedding_vector)}>",
@@ -746,7 +892,18 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                 },
             )
             try:
-                res = client.index(index=INDEX_NAME, body=document)
+                res = client.index(
+                    index=CLIP_INDEX_NAME,
+                    id=_clip_document_id(
+                        asset_id,
+                        document["embedding_scope"],
+                        embedding_option,
+                        start_sec,
+                        end_sec,
+                    ),
+                    body=document,
+                    routing=asset_id,
+                )
                 check_opensearch_response(res, "index")
             except Exception as e:
                 logger.error(
@@ -754,7 +911,7 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                     extra={
                         "asset_id": asset_id,
                         "error": str(e),
-                        "index": INDEX_NAME,
+                        "index": CLIP_INDEX_NAME,
                         "scope": scope,
                     },
                 )
@@ -767,7 +924,7 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                 "body": json.dumps(
                     {
                         "message": "Embedding stored successfully",
-                        "index": INDEX_NAME,
+                        "index": CLIP_INDEX_NAME,
                         "document_id": res.get("_id", "unknown"),
                         "asset_id": asset_id,
                     }
@@ -790,136 +947,23 @@ def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
                 ),
             }
 
-        # ── MASTER-DOC UPDATE for VIDEO (existing query) ──────────────────────
-        search_query = {
-            "query": {
-                "bool": {
-                    "filter": [
-                        {"term": {"DigitalSourceAsset.ID": asset_id}},
-                        {"exists": {"field": "InventoryID"}},
-                        {
-                            "nested": {
-                                "path": "DerivedRepresentations",
-                                "query": {
-                                    "exists": {"field": "DerivedRepresentations.ID"}
-                                },
-                            }
-                        },
-                    ]
-                }
-            }
-        }
-
-        logger.info(
-            "Searching for existing master document",
-            extra={"index": INDEX_NAME, "asset_id": asset_id, "query": search_query},
-        )
-        start_time = time.time()
+        # ── MASTER-DOC UPDATE for VIDEO ───────────────────────────────────────
         try:
-            search_resp = client.search(index=INDEX_NAME, body=search_query, size=1)
-            check_opensearch_response(search_resp, "search")
-        except Exception as e:
-            logger.error(
-                "Failed to search for master document",
-                extra={"asset_id": asset_id, "error": str(e), "index": INDEX_NAME},
+            existing_id = update_master_document(
+                client,
+                asset_id,
+                extract_inventory_id(payload),
+                [(embedding_vector, embedding_option, scope)],
             )
-            raise RuntimeError(
-                f"Failed to search for master document for asset {asset_id}: {str(e)}"
-            ) from e
-
-        while (
-            search_resp["hits"]["total"]["value"] == 0
-            and time.time() - start_time < 120
-        ):
-            logger.info("Master doc not found – refreshing index & retrying …")
-            try:
-                client.indices.refresh(index=INDEX_NAME)
-                time.sleep(5)
-                search_resp = client.search(index=INDEX_NAME, body=search_query, size=1)
-                check_opensearch_response(search_resp, "search")
-            except Exception as e:
-                logger.error(
-                    "Failed to refresh index and retry search",
-                    extra={"asset_id": asset_id, "error": str(e), "index": INDEX_NAME},
-                )
-                raise RuntimeError(
-                    f"Failed to refresh index and retry search for asset {asset_id}: {str(e)}"
-                ) from e
-
-        if search_resp["hits"]["total"]["value"] == 0:
-            raise RuntimeError(
-                f"No master doc with DigitalSourceAsset.ID={asset_id} in '{INDEX_NAME}'"
-            )
-
-        existing_id = search_resp["hits"]["hits"][0]["_id"]
-        try:
-            meta = client.get(index=INDEX_NAME, id=existing_id)
-            check_opensearch_response(meta, "get")
-            seq_no = meta["_seq_no"]
-            p_term = meta["_primary_term"]
         except Exception as e:
             logger.error(
-                "Failed to get document metadata",
-                extra={
-                    "asset_id": asset_id,
-                    "document_id": existing_id,
-                    "error": str(e),
-                    "index": INDEX_NAME,
-                },
+                "Failed to update master document",
+                extra={"asset_id": asset_id, "error": str(e), "index": INDEX_NAME},
             )
             raise RuntimeError(
-                f"Failed to get metadata for document {existing_id} (asset {asset_id}): {str(e)}"
+                f"Failed to update master document for asset {asset_id}: {str(e)}"
             ) from e
 
-        update_body = {
-            "doc": {
-                "type": CONTENT_TYPE,
-                "embedding": embedding_vector,
-                "embedding_scope": scope,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        }
-        if embedding_option == "audio":
-            update_body["doc"]["audio_embedding"] = embedding_vector
-        else:
-            update_body["doc"]["embedding"] = embedding_vector
-
-        if embedding_option is not None:
-            update_body["doc"]["embedding_option"] = embedding_option
-
-        for attempt in range(50):
-            try:
-                res = client.update(
-                    index=INDEX_NAME,
-                    id=existing_id,
-                    body=update_body,
-                    if_seq_no=seq_no,
-                    if_primary_term=p_term,
-                )
-                check_opensearch_response(res, "update")
-                break
-            except exceptions.ConflictError:
-                try:
-                    meta = client.get(index=INDEX_NAME, id=existing_id)
-                    seq_no = meta["_seq_no"]
-                    p_term = meta["_primary_term"]
-                    time.sleep(1)
-                except Exception as e:
-                    logger.error(
-                        "Failed to resolve conflict during document update",
-                        extra={
-                            "asset_id": asset_id,
-                            "document_id": existing_id,
-                            "error": str(e),
-                            "attempt": attempt + 1,
-                        },
-                    )
-                    raise RuntimeError(
-                        f"Failed to resolve conflict for document {existing_id} (asset {asset_id}): {str(e)}"
-                    ) from e
-        else:
-            raise RuntimeError("Failed to update master document after 50 retries")
-
         return {
             "statusCode": 200,
             "body": json.dumps(
@@ -0,0 +1,171 @@
+// external_payload_store.js
+//
+// Node counterpart of common_libraries/external_payload_store.py: compressed,
+// content-addressed off-load objects under
+// steps/<pipelineExecutionId>/<stepName>/<sha256>.json.gz, lists written one
+// gzip member per item with a .index.json sidecar of member byte ranges so a
+// single item can be fetched with a ranged GET. Locations without `encoding`
+// (plain JSON, older steps) are read as-is.
+const crypto = require("crypto");
+const zlib = require("zlib");
+
+const KEY_PREFIX = "steps";
+
+function decompress(body, encoding) {
+  if (!encoding) return body;
+  if (encoding === "gzip") return zlib.gunzipSync(body);
+  if (encoding === "zstd" && typeof zlib.zstdDecompressSync === "function") {
+    return zlib.zstdDecompressSync(body);
+  }
+  throw new Error(`Unsupported external payload encoding: ${encoding}`);
+}
+
+const gzip = (buf) => zlib.gzipSync(buf, { level: 6 });
+
+// JSON as Python's json.dumps writes it by default (", " / ": " separators,
+// non-ASCII escaped), so both writers hash the same bytes for a payload
+function pyJson(value) {
+  if (value && typeof value.toJSON === "function") value = value.toJSON();
+  if (typeof value === "string") {
+    return JSON.stringify(value).replace(
+      /[\u0080-\uffff]/g,
+      (c) => `\\u${c.charCodeAt(0).toString(16).padStart(4, "0")}`,
+    );
+  }
+  if (value === null || typeof value !== "object") {
+    return JSON.stringify(value) ?? "null";
+  }
+  if (Array.isArray(value)) {
+    const items = value.map((v) => (v === undefined ? "null" : pyJson(v)));
+    return `[${items.join(", ")}]`;
+  }
+  const members = Object.keys(value)
+    .filter((k) => value[k] !== undefined && typeof value[k] !== "function")
+    .map((k) => `${pyJson(k)}: ${pyJson(value[k])}`);
+  return `{${members.join(", ")}}`;
+}
+
+class ExternalPayloadStore {
+  constructor(bucket, s3) {
+    this.bucket = bucket;
+    this.s3 = s3;
+    this.ranges = new Map(); // sidecar key -> member byte ranges
+  }
+
+  async _exists(key) {
+    try {
+      await this.s3.headObject({ Bucket: this.bucket, Key: key }).promise();
+      return true;
+    } catch (e) {
+      // 403 without s3:ListBucket; a real permission problem fails the put
+      if ([403, 404].includes(e.statusCode)) return false;
+      throw e;
+    }
+  }
+
+  // Store `data` (encoded once here) and return its location
+  async putJson(data, { executionId, stepName }) {
+    const items = Array.isArray(data)
+      ? data.map((item) => Buffer.from(pyJson(item)))
+      : null;
+    const raw = items
+      ? Buffer.concat([
+          Buffer.from("["),
+          ...items.flatMap((b, i) => (i ? [Buffer.from(", "), b] : [b])),
+          Buffer.from("]"),
+        ])
+      : Buffer.from(pyJson(data));
+
+    const digest = crypto.createHash("sha256").update(raw).digest("hex");
+    const key = [KEY_PREFIX, executionId, stepName, `${digest}.json.gz`].join(
+      "/",
+    );
+    const location = {
+      bucket: this.bucket,
+      key,
+      encoding: "gzip",
+      sha256: digest,
+      size: raw.length,
+    };
+    if (items) {
+      location.itemCount = items.length;
+      location.indexKey = `${key}.index.json`;
+    }
+    if (await this._exists(key)) return location;
+
+    let body;
+    if (items) {
+      const members = items.map((b, i) =>
+        gzip(Buffer.concat([Buffer.from(i ? ", " : "["), b])),
+      );
+      const ranges = [];
+      let offset = 0;
+      for (const m of members) {
+        ranges.push([offset, offset + m.length]);
+        offset += m.length;
+      }
+      members.push(gzip(Buffer.from(items.length ? "]" : "[]")));
+      body = Buffer.concat(members);
+      // sidecar first: an object that exists always has its index
+      await this.s3
+        .putObject({
+          Bucket: this.bucket,
+          Key: location.indexKey,
+          Body: JSON.stringify(ranges),
+          ContentType: "application/json",
+        })
+        .promise();
+    } else {
+      body = gzip(raw);
+    }
+    await this.s3
+      .putObject({
+        Bucket: this.bucket,
+        Key: key,
+        Body: body,
+        ContentType: "application/json",
+        ContentEncoding: "gzip",
+        Metadata: { sha256: digest, "uncompressed-size": String(raw.length) },
+      })
+      .promise();
+    return location;
+  }
+
+  async load(loc) {
+    const obj = await this.s3
+      .getObject({ Bucket: loc.bucket, Key: loc.key })
+      .promise();
+    return JSON.parse(decompress(obj.Body, loc.encoding).toString("utf-8"));
+  }
+
+  // Element `index` of a list payload; a ranged GET when stored item by item
+  async loadItem(loc, index) {
+    if (!loc.indexKey) {
+      const parsed = await this.load(loc);
+      return Array.isArray(parsed) ? parsed[index] : parsed;
+    }
+    let ranges = this.ranges.get(loc.indexKey);
+    if (!ranges) {
+      const obj = await this.s3
+        .getObject({ Bucket: loc.bucket, Key: loc.indexKey })
+        .promise();
+      ranges = JSON.parse(obj.Body.toString("utf-8"));
+      this.ranges.set(loc.indexKey, ranges);
+    }
+    if (!ranges[index]) return undefined;
+    const [start, end] = ranges[index];
+    const obj = await this.s3
+      .getObject({
+        Bucket: loc.bucket,
+        Key: loc.key,
+        Range: `bytes=${start}-${end - 1}`,
+      })
+      .promise();
+    // strip the "[" / ", " list framing that precedes the item
+    return JSON.parse(
+      decompress(obj.Body, loc.encoding).subarray(1).toString("utf-8"),
+    );
+  }
+}
+
+module.exports = { ExternalPayloadStore };
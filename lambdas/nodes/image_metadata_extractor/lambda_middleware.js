@@ -2,6 +2,7 @@
 const AWS = require("aws-sdk");
 const { v4: uuidv4 } = require("uuid");
 const { cloneDeep } = require("lodash");
+const { ExternalPayloadStore } = require("./external_payload_store");
 
 /* eslint camelcase:0 */
 class LambdaMiddleware {
@@ -21,6 +22,10 @@ class LambdaMiddleware {
 
     // ─── AWS clients ──────────────────────────────────────────────────
     this.s3 = new AWS.S3();
+    this.payloadStore = new ExternalPayloadStore(
+      this.externalPayloadBucket,
+      this.s3,
+    );
     this.eb = new AWS.EventBridge();
     this.dynamo = this.assetsTableName
       ? new AWS.DynamoDB.DocumentClient()
@@ -79,13 +84,18 @@ class LambdaMiddleware {
   async _standardizeInput(ev) {
     // ── top-level external-payload rehydration ────────────────────────────
     if (ev.metadata?.stepExternalPayload === "True") {
-      const { bucket, key } = ev.metadata.stepExternalPayloadLocation || {};
+      const loc = ev.metadata.stepExternalPayloadLocation || {};
+      const { bucket, key } = loc;
       let data = {};
-      if (bucket && key) {
-        const obj = await this.s3
-          .getObject({ Bucket: bucket, Key: key })
-          .promise();
-        const parsed = JSON.parse(obj.Body.toString("utf-8"));
+      if (bucket && key && loc.itemCount !== undefined) {
+        // list stored item by item: no need to download it here
+        data = Array.from({ length: loc.itemCount }).map((_, idx) => ({
+          s3_bucket: bucket,
+          s3_key: key,
+          index: idx,
+        }));
+      } else if (bucket && key) {
+        const parsed = await this.payloadStore.load(loc);
         if (Array.isArray(parsed)) {
           data = parsed.map((_, idx) => ({
             s3_bucket: bucket,
@@ -128,18 +138,10 @@ class LambdaMiddleware {
       const idx = ev.item.index || 0;
 
       if (hasOffload) {
-        // rehydrate just this index
-        let parsed, data;
+        // rehydrate just this index (a ranged read when stored item by item)
+        let data;
         if (loc.bucket && loc.key) {
-          const obj = await this.s3
-            .getObject({ Bucket: loc.bucket, Key: loc.key })
-            .promise();
-          parsed = JSON.parse(obj.Body.toString("utf-8"));
-        }
-        if (Array.isArray(parsed)) {
-          data = parsed[idx] || {};
-        } else {
-          data = parsed;
+          data = (await this.payloadStore.loadItem(loc, idx)) || {};
         }
         return {
           metadata: {
@@ -303,24 +305,18 @@ class LambdaMiddleware {
     // large-payload offload
     const raw = Buffer.from(JSON.stringify(payload.data));
     if (raw.length > this.maxResponseSize) {
-      const key = `${meta.pipelineExecutionId}/${uuidv4()}-payload.json`;
-      await this.s3
-        .putObject({
-          Bucket: this.externalPayloadBucket,
-          Key: key,
-          Body: raw,
-        })
-        .promise();
-
+      const offloaded = payload.data;
       meta.stepExternalPayload = "True";
-      meta.stepExternalPayloadLocation = {
-        bucket: this.externalPayloadBucket,
-        key,
-      };
+      meta.stepExternalPayloadLocation = await this.payloadStore.putJson(
+        offloaded,
+        {
+          executionId: meta.pipelineExecutionId || meta.pipelineTraceId,
+          stepName: this.stepName,
+        },
+      );
 
       // build Map‐state references
-      const parsed = JSON.parse(raw.toString());
-      const listLen = Array.isArray(parsed) ? parsed.length : 0;
+      const listLen = Array.isArray(offloaded) ? offloaded.length : 0;
       payload.data = Array.from({ length: listLen }).map((_, idx) => ({
         asset_id: assets[0]?.InventoryID || null,
         stepExternalPayload: "True",
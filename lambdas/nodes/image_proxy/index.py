@@ -5,8 +5,11 @@ import os
 import shutil
 import subprocess
 import tempfile
+from typing import Optional
 
 import boto3
+import large_image
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from lambda_middleware import lambda_middleware
@@ -16,7 +19,7 @@ logger = Logger()
 tracer = Tracer()
 
 s3 = boto3.client("s3")
-dynamo = boto3.resource("dynamodb").Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -81,9 +84,10 @@ def get_image_rotation(image: Image.Image) -> int:
 
 
 def create_thumbnail(
-    img: Image.Image, w: int, h: int, crop: bool = False
+    img: Image.Image, w: int, h: int, crop: bool = False, rot: Optional[int] = None
 ) -> Image.Image:
-    rot = get_image_rotation(img)
+    if rot is None:
+        rot = get_image_rotation(img)
     if rot:
         img = img.rotate(rot, expand=True)
 
@@ -105,8 +109,9 @@ def create_thumbnail(
     return img
 
 
-def create_proxy(img: Image.Image) -> Image.Image:
-    rot = get_image_rotation(img)
+def create_proxy(img: Image.Image, rot: Optional[int] = None) -> Image.Image:
+    if rot is None:
+        rot = get_image_rotation(img)
     return img.rotate(rot, expand=True) if rot else img
 
 
@@ -156,10 +161,7 @@ def _strip_decimals(obj):
 JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "85"))
 
 
-@lambda_middleware(event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"))
-@logger.inject_lambda_context
-@tracer.capture_lambda_handler
-def lambda_handler(event, context: LambdaContext):
+def _process(event: dict) -> dict:
     # ── parse event --------------------------------------------------------
     asset, mode, width, height, crop = _extract_from_event(event)
 
@@ -175,24 +177,36 @@ def lambda_handler(event, context: LambdaContext):
         "MEDIA_ASSETS_BUCKET_NAME missing"
     )
 
-    # ── fetch source -------------------------------------------------------
-    body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    # ── fetch source (large objects go to /tmp, not memory) ---------------
     if key.lower().endswith(".svg"):
-        body = convert_svg_to_png(body)
-
-    img = Image.open(io.BytesIO(body))
-
-    # ── process image ------------------------------------------------------
-    if mode == "thumbnail":
-        if width is None and height is None:
-            _raise("Both width and height cannot be None for thumbnail")
-        width, height = _resolve_dims(width, height, img.width, img.height)
-        proc = create_thumbnail(img, width, height, crop=crop)
-    elif mode == "proxy":
-        proc = create_proxy(img)
-        width, height = proc.size
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        source, tmp_path = io.BytesIO(convert_svg_to_png(body)), None
     else:
-        _raise(f"Invalid mode: {mode}")
+        source, tmp_path = large_image.fetch(s3, bucket, key)
+
+    try:
+        img = Image.open(source)
+
+        # ── process image --------------------------------------------------
+        if mode == "thumbnail":
+            if width is None and height is None:
+                _raise("Both width and height cannot be None for thumbnail")
+            width, height = _resolve_dims(width, height, img.width, img.height)
+            # decode no larger than the thumbnail needs (JPEG DCT scaling,
+            # banded reduce for raw TIFF); EXIF is read before decoding
+            rot = get_image_rotation(img)
+            target = (height, width) if rot in (90, 270) else (width, height)
+            img = large_image.decode(img, target)
+            proc = create_thumbnail(img, width, height, crop=crop, rot=rot)
+        elif mode == "proxy":
+            rot = get_image_rotation(img)
+            proc = create_proxy(large_image.decode(img), rot=rot)
+            width, height = proc.size
+        else:
+            _raise(f"Invalid mode: {mode}")
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
 
     # -------------------------------------------------------------------
     # Choose an efficient output encoding to avoid huge files
@@ -220,10 +234,9 @@ def lambda_handler(event, context: LambdaContext):
     new_key = f"{stem}_{mode}.{ext}"
 
     # ── fetch existing representations -----------------------------------
-    resp = dynamo.get_item(Key={"InventoryID": clean_asset_id(inv_id)})
-    existing = resp.get("Item", {}).get("DerivedRepresentations", [])
+    record = asset_cache.get(clean_asset_id(inv_id)) or {}
+    existing = record.get("DerivedRepresentations", [])
     to_delete = [r for r in existing if r.get("Purpose") == mode]
-    cur_reps = [r for r in existing if r.get("Purpose") != mode]
 
     # ── upload new image ---------------------------------------------------
     content_type = f"image/{'jpeg' if fmt == 'JPEG' else 'png'}"
@@ -273,15 +286,18 @@ def lambda_handler(event, context: LambdaContext):
         ),
     }
 
+    def _replace_rep(current):
+        # re-evaluated against the re-read record if another step wrote meanwhile
+        reps = (current or {}).get("DerivedRepresentations", [])
+        return {
+            "UpdateExpression": "SET DerivedRepresentations = :dr",
+            "ExpressionAttributeValues": {
+                ":dr": [r for r in reps if r.get("Purpose") != mode] + [new_rep]
+            },
+        }
+
     try:
-        dynamo.update_item(
-            Key={"InventoryID": clean_asset_id(inv_id)},
-            UpdateExpression="SET DerivedRepresentations = :dr",
-            ExpressionAttributeValues={":dr": cur_reps + [new_rep]},
-        )
-        updated_item = dynamo.get_item(Key={"InventoryID": clean_asset_id(inv_id)})[
-            "Item"
-        ]
+        updated_item = asset_cache.modify(clean_asset_id(inv_id), _replace_rep)
     except Exception:
         logger.exception("Error updating DynamoDB")
         raise
@@ -299,3 +315,29 @@ def lambda_handler(event, context: LambdaContext):
             }
         ),
     }
+
+
+@lambda_middleware(event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"))
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def lambda_handler(event, context: LambdaContext):
+    try:
+        return _process(event)
+    except large_image.ImageTooLargeError as exc:
+        if not large_image.large_variant_available():
+            raise
+        logger.info(
+            "Image over the pixel budget, using the large-memory variant",
+            extra={"pixels": exc.pixels, "budget": exc.budget},
+        )
+        return large_image.delegate(event)
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def large_memory_handler(event, context: LambdaContext):
+    """Entry point of the large-memory variant (event already standardised)."""
+    # No middleware in the variant: scope the cache to this execution here
+    asset_cache.begin_execution(event.get("metadata", {}).get("pipelineExecutionId"))
+    asset_cache.seed(event.get("payload", {}).get("assets") or [])
+    return _process(event)
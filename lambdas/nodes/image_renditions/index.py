@@ -0,0 +1,537 @@
+"""
+Image renditions node: decode the original once, emit the proxy and any
+number of thumbnails from the same in-memory image, upload them
+concurrently and commit all representations in one DynamoDB update.
+
+Renditions come from ``payload.renditions`` or the ``IMAGE_RENDITIONS``
+env-var (JSON list), defaulting to the proxy plus a 300 px thumbnail, i.e.
+what the separate image_proxy / image_thumbnail nodes produce. Each entry:
+
+    {"purpose": "thumbnail", "width": 300, "height": null, "crop": false,
+     "format": "PNG"}
+
+``purpose`` becomes the representation's Purpose and the object key suffix
+(keys follow the separate nodes: ``<key stem>_proxy.<ext>`` for the proxy,
+``<source bucket>/<key stem>_<purpose>.<ext>`` for everything else);
+``proxy`` keeps the full resolution (capped at ``IMAGE_PROXY_MAX_SIDE`` when
+set). ``format`` is PNG / JPEG, or ``auto`` (PNG when the image has alpha,
+JPEG otherwise).
+
+Each rendition is also written in its ``alternates`` formats (the entry's,
+else ``payload.alternates``, else ``IMAGE_ALTERNATE_FORMATS``, default
+``WEBP``; ``AVIF`` where Pillow supports it; empty for none) as
+extra DerivedRepresentations with the same Purpose; the asset and search
+APIs hand out the smallest one the client accepts (rendition_negotiation).
+Encode time and bytes saved against the primary format are emitted per
+format.
+
+The source is decoded through large_image at the smallest size that covers
+the largest rendition; an image over this function's pixel budget is handed
+to the node's large-memory variant (``large_memory_handler``).
+"""
+
+import decimal
+import io
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import boto3
+import large_image
+from asset_record_cache import get_asset_cache
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit, single_metric
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.config import Config
+from lambda_middleware import lambda_middleware
+from PIL import ExifTags, Image
+
+logger = Logger()
+tracer = Tracer()
+metrics = Metrics(namespace="MediaLake", service="image_renditions")
+
+MAX_WORKERS = int(os.getenv("RENDITION_WORKERS", "4"))
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "85"))
+PROXY_MAX_SIDE = int(os.getenv("IMAGE_PROXY_MAX_SIDE", "0"))
+WEBP_QUALITY = int(os.getenv("WEBP_QUALITY", "80"))
+AVIF_QUALITY = int(os.getenv("AVIF_QUALITY", "60"))
+ALTERNATE_FORMATS = os.getenv("IMAGE_ALTERNATE_FORMATS", "WEBP")
+
+s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_WORKERS * 2))
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
+
+DEFAULT_RENDITIONS = [
+    {"purpose": "proxy", "format": "auto"},
+    {"purpose": "thumbnail", "width": 300, "format": "PNG"},
+]
+
+# format -> (object key extension, content type)
+_FORMAT_FILES = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "WEBP": ("webp", "image/webp"),
+    "AVIF": ("avif", "image/avif"),
+}
+
+Image.init()
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def convert_svg_to_png(svg_data: bytes) -> bytes:
+    """Convert SVG → PNG using the resvg CLI shipped in a Lambda layer."""
+    with tempfile.NamedTemporaryFile(suffix=".svg", delete=False) as svg_file:
+        svg_file.write(svg_data)
+        svg_path = svg_file.name
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as png_file:
+        png_path = png_file.name
+
+    env = os.environ.copy()
+    env["PATH"] = "/opt/bin:" + env.get("PATH", "")
+
+    try:
+        if shutil.which("resvg", path=env["PATH"]) is None:
+            raise RuntimeError("resvg CLI not found in /opt/bin")
+
+        cmd = ["resvg", svg_path, png_path]
+        logger.info(f"Running: {' '.join(cmd)}")
+        proc = subprocess.run(cmd, env=env, capture_output=True, timeout=30)
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode().strip()
+            raise RuntimeError(f"resvg failed (rc={proc.returncode}): {stderr}")
+
+        if not os.path.exists(png_path) or os.path.getsize(png_path) == 0:
+            raise RuntimeError("resvg did not produce any output")
+
+        with open(png_path, "rb") as f:
+            return f.read()
+    finally:
+        for p in (svg_path, png_path):
+            try:
+                os.unlink(p)
+            except Exception:
+                pass
+
+
+def get_image_rotation(image: Image.Image) -> int:
+    """Read EXIF orientation tag and return the rotation angle."""
+    try:
+        exif = image._getexif() or {}
+        key = next(k for k, v in ExifTags.TAGS.items() if v == "Orientation")
+        return {1: 0, 3: 180, 6: 270, 8: 90}.get(exif.get(key, 1), 0)
+    except Exception as e:
+        logger.warning(f"Error reading EXIF orientation: {e}")
+        return 0
+
+
+def clean_asset_id(input_string: str) -> str:
+    parts = input_string.split(":")
+    uuid = parts[-1] if parts[-1] != "master" else parts[-2]
+    return f"asset:uuid:{uuid}"
+
+
+def _raise(msg: str):
+    raise ValueError(msg)
+
+
+def _resolve_dims(w, h, iw, ih):
+    if w is None or w <= 0:
+        w = None
+    if h is None or h <= 0:
+        h = None
+    if w is None and h is None:
+        return iw, ih
+    if w is None:
+        w = int(h * (iw / ih))
+    elif h is None:
+        h = int(w * (ih / iw))
+    return max(1, int(w)), max(1, int(h))
+
+
+def _strip_decimals(obj):
+    if isinstance(obj, list):
+        return [_strip_decimals(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _strip_decimals(v) for k, v in obj.items()}
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    return obj
+
+
+def _renditions(payload: dict) -> List[Dict[str, Any]]:
+    specs = payload.get("renditions")
+    if not specs and os.getenv("IMAGE_RENDITIONS"):
+        specs = json.loads(os.environ["IMAGE_RENDITIONS"])
+    specs = specs or DEFAULT_RENDITIONS
+    purposes = [s.get("purpose") or _raise("Rendition without purpose") for s in specs]
+    if len(set(purposes)) != len(purposes):
+        _raise(f"Duplicate rendition purposes: {purposes}")
+    if payload.get("alternates") is not None:
+        specs = [{"alternates": payload["alternates"], **s} for s in specs]
+    return specs
+
+
+def _alternates(spec: Dict[str, Any]) -> List[str]:
+    """Alternate formats of a rendition this Pillow build can encode."""
+    wanted = spec.get("alternates")
+    if wanted is None:
+        wanted = ALTERNATE_FORMATS
+    if isinstance(wanted, str):
+        wanted = wanted.split(",")
+    formats = []
+    for fmt in (f.strip().upper() for f in wanted):
+        if fmt not in ("WEBP", "AVIF") or fmt in formats:
+            continue
+        if fmt not in Image.SAVE:
+            logger.warning(f"Pillow cannot encode {fmt}; alternate skipped")
+            continue
+        formats.append(fmt)
+    return formats
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+# ---------------------------------------------------------------------------
+# Rendition pipeline
+# ---------------------------------------------------------------------------
+
+
+def _proxy_box(spec: Dict[str, Any], size) -> Any:
+    """Requested (width, height) of a rendition; None for full resolution."""
+    w, h = spec.get("width"), spec.get("height")
+    if spec["purpose"] == "proxy" and not (w or h):
+        if not PROXY_MAX_SIDE or max(size) <= PROXY_MAX_SIDE:
+            return None
+        w, h = (PROXY_MAX_SIDE, None) if size[0] >= size[1] else (None, PROXY_MAX_SIDE)
+    return _resolve_dims(w, h, *size)
+
+
+def decode_target(specs: List[Dict[str, Any]], size) -> Any:
+    """Smallest decode size covering every rendition (None: full resolution)."""
+    boxes = [_proxy_box(spec, size) for spec in specs]
+    if any(box is None for box in boxes):
+        return None
+    return max(b[0] for b in boxes), max(b[1] for b in boxes)
+
+
+def decode_source(bucket: str, key: str, specs: List[Dict[str, Any]]) -> Image.Image:
+    """
+    Fetch, rasterise (SVG) and decode the original once, at the smallest size
+    that covers every rendition, EXIF rotation applied.
+    """
+    if key.lower().endswith(".svg"):
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        source, tmp_path = io.BytesIO(convert_svg_to_png(body)), None
+    else:
+        source, tmp_path = large_image.fetch(s3, bucket, key)
+    try:
+        img = Image.open(source)
+        rot = get_image_rotation(img)
+        # renditions are sized in the rotated frame; the decode happens before
+        size = img.size[::-1] if rot in (90, 270) else img.size
+        target = decode_target(specs, size)
+        if target and rot in (90, 270):
+            target = target[::-1]
+        img = large_image.decode(img, target)
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+    return img.rotate(rot, expand=True) if rot else img
+
+
+def resize(img: Image.Image, spec: Dict[str, Any]) -> Image.Image:
+    """The rendition's pixels; never modifies *img* (shared across threads)."""
+    box = _proxy_box(spec, img.size)
+    if box is None:
+        return img
+    w, h = box
+    if spec.get("crop"):
+        tgt_ratio, img_ratio = w / h, img.width / img.height
+        if img_ratio > tgt_ratio:
+            new_w = int(h * img_ratio)
+            left = (new_w - w) // 2
+            return img.resize((new_w, h)).crop((left, 0, left + w, h))
+        new_h = int(w / img_ratio)
+        top = (new_h - h) // 2
+        return img.resize((w, new_h)).crop((0, top, w, top + h))
+    out = img.copy()
+    out.thumbnail((w, h))
+    return out
+
+
+def encode(img: Image.Image, fmt: str) -> tuple[bytes, str]:
+    """Encode *img*; ``auto`` picks PNG for alpha, JPEG otherwise."""
+    fmt = (fmt or "auto").upper()
+    if fmt == "AUTO":
+        has_alpha = img.mode in ("RGBA", "LA") or ("transparency" in img.info)
+        fmt = "PNG" if has_alpha else "JPEG"
+
+    if fmt == "PNG":
+        save_kwargs = dict(optimize=True, compress_level=9)
+        if img.mode not in ("RGB", "RGBA", "LA", "L"):
+            img = img.convert("RGBA")
+    elif fmt == "JPEG":
+        save_kwargs = dict(quality=JPEG_QUALITY, optimize=True, progressive=True)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+    elif fmt in ("WEBP", "AVIF"):
+        if fmt == "WEBP":
+            save_kwargs = dict(quality=WEBP_QUALITY, method=4)
+        else:
+            save_kwargs = dict(quality=AVIF_QUALITY, speed=6)
+        has_alpha = img.mode in ("RGBA", "LA") or ("transparency" in img.info)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if has_alpha else "RGB")
+    else:
+        _raise(f"Unsupported rendition format: {fmt}")
+
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **save_kwargs)
+    return buf.getvalue(), fmt
+
+
+def _upload(
+    out: Image.Image,
+    fmt: str,
+    stem: str,
+    purpose: str,
+    out_bucket: str,
+    asset_id: str,
+) -> Dict[str, Any]:
+    """Encode and upload *out* as *fmt*; returns rep + timings."""
+    t = time.perf_counter()
+    data, fmt = encode(out, fmt)
+    encode_ms = _ms(t)
+
+    ext, content_type = _FORMAT_FILES[fmt]
+    alternate = fmt in ("WEBP", "AVIF")
+    key = f"{stem}_{purpose}.{ext}"
+    t = time.perf_counter()
+    s3.put_object(Bucket=out_bucket, Key=key, Body=data, ContentType=content_type)
+    upload_ms = _ms(t)
+
+    rep = {
+        "ID": f"{asset_id}:{purpose}:{ext}" if alternate else f"{asset_id}:{purpose}",
+        "Type": "Image",
+        "Format": fmt,
+        "Purpose": purpose,
+        "StorageInfo": {
+            "PrimaryLocation": {
+                "StorageType": "s3",
+                "Provider": "aws",
+                "Bucket": out_bucket,
+                "ObjectKey": {"FullPath": key},
+                "Status": "active",
+                "FileInfo": {"Size": len(data)},
+            }
+        },
+        "ImageSpec": {"Resolution": {"Width": out.width, "Height": out.height}},
+    }
+    timing = {
+        "purpose": purpose,
+        "format": fmt,
+        "encodeMs": encode_ms,
+        "uploadMs": upload_ms,
+        "bytes": len(data),
+    }
+    return {"rep": rep, "timing": timing}
+
+
+def _key_stem(bucket: str, key: str, purpose: str) -> str:
+    """Output key stem; as image_proxy / image_thumbnail laid them out."""
+    stem = key.rsplit(".", 1)[0]
+    return stem if purpose == "proxy" else f"{bucket}/{stem}"
+
+
+def render(
+    img: Image.Image,
+    spec: Dict[str, Any],
+    stem: str,
+    out_bucket: str,
+    asset_id: str,
+) -> List[Dict[str, Any]]:
+    """
+    Resize once, then encode and upload the rendition in its primary and
+    alternate formats; returns rep + timings per format, primary first.
+    """
+    purpose = spec["purpose"]
+
+    t = time.perf_counter()
+    out = resize(img, spec)
+    resize_ms = _ms(t)
+
+    results = [
+        _upload(out, fmt, stem, purpose, out_bucket, asset_id)
+        for fmt in [spec.get("format", "auto")] + _alternates(spec)
+    ]
+    primary_bytes = results[0]["timing"]["bytes"]
+    for result in results:
+        timing = result["timing"]
+        timing["resizeMs"] = resize_ms
+        timing["bytesSaved"] = primary_bytes - timing["bytes"]
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Lambda handlers
+# ---------------------------------------------------------------------------
+
+
+def _render_all(event: dict) -> dict:
+    # ── parse event --------------------------------------------------------
+    payload = event.get("payload") or _raise("Missing payload")
+    assets = payload.get("assets") or _raise("Missing payload.assets")
+    asset = assets[0]
+    specs = _renditions(payload)
+
+    loc = asset["DigitalSourceAsset"]["MainRepresentation"]["StorageInfo"][
+        "PrimaryLocation"
+    ]
+    bucket = loc.get("Bucket") or _raise("PrimaryLocation.Bucket missing")
+    key = loc.get("ObjectKey", {}).get("FullPath") or _raise(
+        "PrimaryLocation.ObjectKey.FullPath missing"
+    )
+    inv_id = asset.get("InventoryID") or _raise("InventoryID missing")
+    asset_id = clean_asset_id(inv_id)
+
+    out_bucket = os.environ.get("MEDIA_ASSETS_BUCKET_NAME") or _raise(
+        "MEDIA_ASSETS_BUCKET_NAME missing"
+    )
+
+    # ── decode once ---------------------------------------------------------
+    t = time.perf_counter()
+    img = decode_source(bucket, key, specs)
+    decode_ms = _ms(t)
+    logger.info(
+        "Decoded source image",
+        extra={"size": img.size, "mode": img.mode, "decodeMs": decode_ms},
+    )
+
+    # ── resize / encode / upload every rendition concurrently --------------
+    def _render(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        stem = _key_stem(bucket, key, spec["purpose"])
+        return render(img, spec, stem, out_bucket, asset_id)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(specs))) as pool:
+        results = list(pool.map(_render, specs))
+    new_reps = [r["rep"] for per_spec in results for r in per_spec]
+    timings = [r["timing"] for per_spec in results for r in per_spec]
+    purposes = {rep["Purpose"] for rep in new_reps}
+
+    metrics.add_metric(
+        name="ImageDecodeTime", unit=MetricUnit.Milliseconds, value=decode_ms
+    )
+    for timing in timings:
+        per_format = [("ImageEncodeTime", MetricUnit.Milliseconds, "encodeMs")]
+        if timing["format"] in ("WEBP", "AVIF"):
+            per_format.append(("ImageBytesSaved", MetricUnit.Bytes, "bytesSaved"))
+        for name, unit, field in per_format:
+            with single_metric(
+                name=name, unit=unit, value=timing[field], namespace="MediaLake"
+            ) as metric:
+                metric.add_dimension(name="Format", value=timing["format"])
+    logger.info(
+        "Renditions written", extra={"decodeMs": decode_ms, "renditions": timings}
+    )
+
+    # ── commit all representations in one update ---------------------------
+    superseded: List[Dict[str, Any]] = []
+
+    def _replace_reps(current):
+        # re-evaluated against the re-read record if another step wrote meanwhile
+        reps = (current or {}).get("DerivedRepresentations", [])
+        superseded[:] = [r for r in reps if r.get("Purpose") in purposes]
+        kept = [r for r in reps if r.get("Purpose") not in purposes]
+        return {
+            "UpdateExpression": "SET DerivedRepresentations = :dr",
+            "ExpressionAttributeValues": {":dr": kept + new_reps},
+        }
+
+    try:
+        updated_item = asset_cache.modify(asset_id, _replace_reps)
+    except Exception:
+        logger.exception("Error updating DynamoDB")
+        raise
+
+    # ── delete superseded objects (same key was overwritten in place) ------
+    written = {
+        (out_bucket, r["StorageInfo"]["PrimaryLocation"]["ObjectKey"]["FullPath"])
+        for r in new_reps
+    }
+    for old in superseded:
+        ob = old["StorageInfo"]["PrimaryLocation"]["Bucket"]
+        ok = old["StorageInfo"]["PrimaryLocation"]["ObjectKey"]["FullPath"]
+        if (ob, ok) in written:
+            continue
+        try:
+            s3.delete_object(Bucket=ob, Key=ok)
+            logger.info(
+                "Deleted old representation",
+                extra={"purpose": old.get("Purpose"), "bucket": ob, "key": ok},
+            )
+        except Exception as err:
+            logger.warning(
+                "Failed to delete old representation",
+                extra={"error": str(err), "bucket": ob, "key": ok},
+            )
+
+    # ── response ----------------------------------------------------------
+    return {
+        "statusCode": 200,
+        "body": json.dumps(
+            {
+                "bucket": out_bucket,
+                "renditions": [
+                    {
+                        "purpose": r["Purpose"],
+                        "key": r["StorageInfo"]["PrimaryLocation"]["ObjectKey"][
+                            "FullPath"
+                        ],
+                        "format": r["Format"],
+                    }
+                    for r in new_reps
+                ],
+                "decodeMs": decode_ms,
+                "timings": timings,
+            }
+        ),
+        "updatedAsset": _strip_decimals(updated_item),
+    }
+
+
+@lambda_middleware(event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"))
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def lambda_handler(event, context: LambdaContext):
+    try:
+        return _render_all(event)
+    except large_image.ImageTooLargeError as exc:
+        if not large_image.large_variant_available():
+            raise
+        logger.info(
+            "Image over the pixel budget, using the large-memory variant",
+            extra={"pixels": exc.pixels, "budget": exc.budget},
+        )
+        return large_image.delegate(event)
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def large_memory_handler(event, context: LambdaContext):
+    """Entry point of the large-memory variant (event already standardised)."""
+    # No middleware in the variant: scope the cache to this execution here
+    asset_cache.begin_execution(event.get("metadata", {}).get("pipelineExecutionId"))
+    asset_cache.seed(event.get("payload", {}).get("assets") or [])
+    return _render_all(event)
@@ -8,6 +8,8 @@ import tempfile
 from decimal import Decimal
 
 import boto3
+import large_image
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
@@ -18,7 +20,7 @@ logger = Logger()
 tracer = Tracer()
 
 s3 = boto3.client("s3")
-dynamo = boto3.resource("dynamodb").Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 
 
 def convert_svg_to_png(svg_data: bytes) -> bytes:
@@ -83,10 +85,11 @@ def get_image_rotation(image):
         return 0
 
 
-def create_thumbnail(img, w, h, crop=False):
+def create_thumbnail(img, w, h, crop=False, rot=None):
     if w < 1 or h < 1:
         raise ValueError(f"Invalid thumbnail size {w}×{h}")
-    rot = get_image_rotation(img)
+    if rot is None:
+        rot = get_image_rotation(img)
     if rot:
         img = img.rotate(rot, expand=True)
     if crop:
@@ -160,12 +163,7 @@ def _convert_decimals(obj):
     return obj
 
 
-@lambda_middleware(
-    event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"),
-)
-@logger.inject_lambda_context
-@tracer.capture_lambda_handler
-def lambda_handler(event, context: LambdaContext):
+def _process(event):
     detail, width, height, crop = _extract_from_event(event)
 
     if width is None and height is None:
@@ -181,13 +179,24 @@ def lambda_handler(event, context: LambdaContext):
     bucket = loc.get("Bucket") or _raise("Missing bucket")
     key = loc.get("ObjectKey", {}).get("FullPath") or _raise("Missing key")
 
-    body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    # large objects are streamed to /tmp; the decode is no larger than the
+    # thumbnail needs (JPEG DCT scaling, banded reduce for raw TIFF)
     if key.lower().endswith(".svg"):
-        body = convert_svg_to_png(body)
-    img = Image.open(io.BytesIO(body))
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+        source, tmp_path = io.BytesIO(convert_svg_to_png(body)), None
+    else:
+        source, tmp_path = large_image.fetch(s3, bucket, key)
+    try:
+        img = Image.open(source)
+        width, height = _resolve_dims(width, height, img.width, img.height)
+        rot = get_image_rotation(img)
+        target = (height, width) if rot in (90, 270) else (width, height)
+        img = large_image.decode(img, target)
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
 
-    width, height = _resolve_dims(width, height, img.width, img.height)
-    thumb = create_thumbnail(img, width, height, crop=crop)
+    thumb = create_thumbnail(img, width, height, crop=crop, rot=rot)
 
     fmt, ext = "PNG", "png"
     if thumb.mode not in ("RGB", "RGBA"):
@@ -216,10 +225,6 @@ def lambda_handler(event, context: LambdaContext):
 
     # update DynamoDB record
     try:
-        resp = dynamo.get_item(Key={"InventoryID": asset_id})
-        cur_reps = resp.get("Item", {}).get("DerivedRepresentations", [])
-        cur_reps = [r for r in cur_reps if r.get("Purpose") != "thumbnail"]
-
         new_rep = {
             "ID": f"{asset_id}:thumbnail",
             "Type": "Image",
@@ -238,17 +243,20 @@ def lambda_handler(event, context: LambdaContext):
             "ImageSpec": {"Resolution": {"Width": width, "Height": height}},
         }
 
-        dynamo.update_item(
-            Key={"InventoryID": asset_id},
-            UpdateExpression="SET DerivedRepresentations = :dr",
-            ExpressionAttributeValues={":dr": cur_reps + [new_rep]},
-        )
+        def _replace_thumbnail(record):
+            cur_reps = (record or {}).get("DerivedRepresentations", [])
+            cur_reps = [r for r in cur_reps if r.get("Purpose") != "thumbnail"]
+            return {
+                "UpdateExpression": "SET DerivedRepresentations = :dr",
+                "ExpressionAttributeValues": {":dr": cur_reps + [new_rep]},
+            }
+
+        # the record as written (ALL_NEW) is returned as updatedAsset
+        updated_item = asset_cache.modify(asset_id, _replace_thumbnail)
     except Exception:
         logger.exception("Error updating DynamoDB")
         raise
 
-    # fetch back the updated record and return as updatedAsset
-    updated_item = dynamo.get_item(Key={"InventoryID": asset_id})["Item"]
     # Convert any Decimal instances so JSON serialization will work
     updated_item = _convert_decimals(updated_item)
 
@@ -264,3 +272,31 @@ def lambda_handler(event, context: LambdaContext):
         ),
         "updatedAsset": updated_item,
     }
+
+
+@lambda_middleware(
+    event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"),
+)
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def lambda_handler(event, context: LambdaContext):
+    try:
+        return _process(event)
+    except large_image.ImageTooLargeError as exc:
+        if not large_image.large_variant_available():
+            raise
+        logger.info(
+            "Image over the pixel budget, using the large-memory variant",
+            extra={"pixels": exc.pixels, "budget": exc.budget},
+        )
+        return large_image.delegate(event)
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def large_memory_handler(event, context: LambdaContext):
+    """Entry point of the large-memory variant (event already standardised)."""
+    # No middleware in the variant: scope the cache to this execution here
+    asset_cache.begin_execution(event.get("metadata", {}).get("pipelineExecutionId"))
+    asset_cache.seed(event.get("payload", {}).get("assets") or [])
+    return _process(event)
@@ -9,26 +9,54 @@ from __future__ import annotations
 
 import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import boto3
-from aws_lambda_powertools import Logger, Tracer
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from embedding_utils import prepare_embedding, prepare_embeddings
 from lambda_middleware import lambda_middleware
 from lambda_utils import _truncate_floats
 from nodes_utils import seconds_to_smpte
+from vector_metadata_schema import (
+    conform_metadata,
+    index_matches_schema,
+    metadata_configuration,
+)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Powertools
 logger = Logger()
 tracer = Tracer(disabled=False)
+metrics = Metrics(namespace="MediaLake", service="s3_vector_store")
 
 # Environment
 VECTOR_BUCKET_NAME = os.getenv("VECTOR_BUCKET_NAME", "media-vectors")
 INDEX_NAME = os.getenv("INDEX_NAME", "media-vectors")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 EVENT_BUS_NAME = os.getenv("EVENT_BUS_NAME", "default-event-bus")
+EMBEDDING_L2_NORMALIZE = os.getenv("EMBEDDING_L2_NORMALIZE", "false").lower() == "true"
+
+# put_vectors writer
+PUT_VECTORS_BATCH_SIZE = int(os.getenv("PUT_VECTORS_BATCH_SIZE", "500"))
+PUT_VECTORS_MAX_CONCURRENCY = int(os.getenv("PUT_VECTORS_MAX_CONCURRENCY", "4"))
+PUT_VECTORS_MAX_RETRIES = int(os.getenv("PUT_VECTORS_MAX_RETRIES", "6"))
+PUT_VECTORS_RETRY_BASE_DELAY = float(os.getenv("PUT_VECTORS_RETRY_BASE_DELAY", "0.2"))
+_RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "SlowDown",
+}
 
 # Content type will be determined dynamically from payload data
 
@@ -235,16 +263,8 @@ def extract_embedding_vector(container: Dict[str, Any]) -> Optional[List[float]]
         raise ValueError("Container must be a dictionary")
 
     def validate_vector(vector, source: str) -> List[float]:
-        if not isinstance(vector, list):
-            raise ValueError(f"Embedding vector from {source} must be a list")
-        if not vector:
-            raise ValueError(f"Embedding vector from {source} cannot be empty")
-        for i, val in enumerate(vector):
-            if not isinstance(val, (int, float)):
-                raise ValueError(
-                    f"Embedding vector element {i} from {source} must be a number, got {type(val)}"
-                )
-        return [float(v) for v in vector]
+        # Normalisation (if enabled) happens once, in build_vector_records
+        return prepare_embedding(vector, source=f"Embedding from {source}")[1]
 
     itm = _item(container)
     if itm and isinstance(itm.get("float"), list) and itm["float"]:
@@ -379,7 +399,16 @@ def _get_segment_bounds(payload: Dict[str, Any]) -> Tuple[int, int]:
 def get_s3_vector_client():
     try:
         session = boto3.Session()
-        return session.client("s3vectors", region_name=AWS_REGION)
+        # Throttling is retried by the put_vectors writer, which also adapts
+        # its concurrency; the pool must fit all concurrent batches.
+        return session.client(
+            "s3vectors",
+            region_name=AWS_REGION,
+            config=Config(
+                retries={"max_attempts": 2, "mode": "standard"},
+                max_pool_connections=max(10, PUT_VECTORS_MAX_CONCURRENCY * 2),
+            ),
+        )
     except Exception as e:
         logger.error(f"Failed to initialize S3 Vector client: {e}")
         raise
@@ -406,35 +435,76 @@ def _ok_no_op(vector_len: int, inventory_id: Optional[str]):
 
 
 # ─────────────────────────────────────────────────────────────────────────────
+# Container-lifetime cache of control-plane lookups. A warm container checks
+# (and if needed creates) each bucket / index once; only a NotFound from a
+# data-plane call (put_vectors) drops the entry again.
+_known_buckets: set = set()
+_known_indexes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_resource_locks: Dict[Any, threading.Lock] = {}
+_resource_locks_guard = threading.Lock()
+
+
+def _resource_lock(key: Any) -> threading.Lock:
+    """Single-flight lock per bucket / index, so threads don't race to create."""
+    with _resource_locks_guard:
+        return _resource_locks.setdefault(key, threading.Lock())
+
+
+def invalidate_vector_resources(bucket_name: str, index_name: str) -> None:
+    _known_indexes.pop((bucket_name, index_name), None)
+    _known_buckets.discard(bucket_name)
+    logger.info(
+        "Dropped cached vector bucket/index state",
+        extra={"bucket": bucket_name, "index": index_name},
+    )
+
+
+def _error_code(error: Exception) -> str:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code", "")
+    return ""
+
+
 def ensure_vector_bucket_exists(client, bucket_name: str) -> None:
     """Ensure vector bucket exists or raise exception."""
     if not bucket_name:
         raise RuntimeError(
             "Vector bucket name cannot be empty - check VECTOR_BUCKET_NAME environment variable"
         )
+    if bucket_name in _known_buckets:
+        return
 
-    try:
-        client.get_vector_bucket(vectorBucketName=bucket_name)
-        logger.info(f"Vector bucket {bucket_name} already exists")
-    except client.exceptions.NotFoundException:
+    with _resource_lock(("bucket", bucket_name)):
+        if bucket_name in _known_buckets:
+            return
         try:
-            client.create_vector_bucket(
-                vectorBucketName=bucket_name,
-                encryptionConfiguration={"sseType": "AES256"},
-            )
-            logger.info(f"Created vector bucket {bucket_name}")
+            client.get_vector_bucket(vectorBucketName=bucket_name)
+            logger.info(f"Vector bucket {bucket_name} already exists")
+        except client.exceptions.NotFoundException:
+            try:
+                client.create_vector_bucket(
+                    vectorBucketName=bucket_name,
+                    encryptionConfiguration={"sseType": "AES256"},
+                )
+                logger.info(f"Created vector bucket {bucket_name}")
+            except client.exceptions.ConflictException:
+                # Created concurrently by another container
+                logger.info(f"Vector bucket {bucket_name} was created concurrently")
+            except Exception as e:
+                logger.error(f"Failed to create vector bucket {bucket_name}: {e}")
+                raise RuntimeError(
+                    f"Cannot create vector bucket {bucket_name}: {e}"
+                ) from e
         except Exception as e:
-            logger.error(f"Failed to create vector bucket {bucket_name}: {e}")
-            raise RuntimeError(f"Cannot create vector bucket {bucket_name}: {e}") from e
-    except Exception as e:
-        logger.error(f"Error checking vector bucket {bucket_name}: {e}")
-        raise RuntimeError(f"Cannot access vector bucket {bucket_name}: {e}") from e
+            logger.error(f"Error checking vector bucket {bucket_name}: {e}")
+            raise RuntimeError(f"Cannot access vector bucket {bucket_name}: {e}") from e
+        _known_buckets.add(bucket_name)
 
 
 def ensure_index_exists(
     client, bucket_name: str, index_name: str, vector_dimension: int
 ) -> None:
-    """Ensure vector index exists or raise exception."""
+    """Ensure vector index exists (with a matching dimension) or raise exception."""
     if not bucket_name:
         raise RuntimeError(
             "Vector bucket name cannot be empty - check VECTOR_BUCKET_NAME environment variable"
@@ -446,31 +516,240 @@ def ensure_index_exists(
     if vector_dimension <= 0:
         raise ValueError(f"Invalid vector dimension: {vector_dimension}")
 
+    key = (bucket_name, index_name)
+    info = _known_indexes.get(key)
+    if info is None:
+        with _resource_lock(("index",) + key):
+            info = _known_indexes.get(key)
+            if info is None:
+                info = _load_or_create_index(
+                    client, bucket_name, index_name, vector_dimension
+                )
+                _known_indexes[key] = info
+
+    if info.get("dimension") and info["dimension"] != vector_dimension:
+        raise ValueError(
+            f"Vector dimension {vector_dimension} does not match index "
+            f"{index_name} ({info['dimension']}, {info.get('distanceMetric')})"
+        )
+
+
+def _load_or_create_index(
+    client, bucket_name: str, index_name: str, vector_dimension: int
+) -> Dict[str, Any]:
+    """Fetch the index's dimension/metric, creating the index if it is missing."""
     try:
-        client.get_index(vectorBucketName=bucket_name, indexName=index_name)
+        index = client.get_index(vectorBucketName=bucket_name, indexName=index_name)
         logger.info(f"Index {index_name} already exists in bucket {bucket_name}")
+        index = index.get("index", {})
+        if not index_matches_schema(index):
+            logger.warning(
+                f"Index {index_name} predates the vector metadata schema; all "
+                "metadata is filterable until it is migrated",
+                extra={"metadataConfiguration": index.get("metadataConfiguration")},
+            )
+        return {
+            "dimension": index.get("dimension"),
+            "distanceMetric": index.get("distanceMetric"),
+        }
     except client.exceptions.NotFoundException:
+        pass
+    except Exception as e:
+        logger.error(f"Error checking index {index_name}: {e}")
+        raise RuntimeError(f"Cannot access index {index_name}: {e}") from e
+
+    try:
+        client.create_index(
+            vectorBucketName=bucket_name,
+            indexName=index_name,
+            dimension=vector_dimension,
+            dataType="float32",
+            distanceMetric="cosine",
+            metadataConfiguration=metadata_configuration(),
+        )
+        logger.info(f"Created index {index_name} (dim={vector_dimension})")
+    except client.exceptions.ConflictException:
+        # Created concurrently by another container; re-read its settings
+        return _load_or_create_index(client, bucket_name, index_name, vector_dimension)
+    except Exception as e:
+        logger.error(f"Failed to create index {index_name}: {e}")
+        raise RuntimeError(f"Cannot create index {index_name}: {e}") from e
+    return {"dimension": vector_dimension, "distanceMetric": "cosine"}
+
+
+def _vector_key(meta: Dict[str, Any], i: int) -> str:
+    """Deterministic key, so a re-sent vector overwrites instead of duplicating."""
+    embedding_option = meta.get("embedding_option", "default")
+
+    # Start with inventory_id, only add embedding_option if it's not "default"
+    if embedding_option == "default":
+        key = meta["inventory_id"]
+    else:
+        key = f"{meta['inventory_id']}_{embedding_option}"
+
+    scope = meta.get("embedding_scope")
+    content_type = meta.get("content_type", "video")
+
+    # Handle different content types and scopes
+    if content_type == "audio":
+        # Audio content: always include time segments with audio_clip prefix
+        start_sec = meta.get("start_offset_sec")
+        end_sec = meta.get("end_offset_sec")
+        if start_sec is None or end_sec is None:
+            raise ValueError(
+                f"Audio embedding at index {i} missing start/end offset seconds"
+            )
+        key = f"{key}_audio_clip_{start_sec}_{end_sec}"
+    elif content_type == "video" and scope == "clip":
+        # Video clip content: include time segments with video_clip prefix
+        start_sec = meta.get("start_offset_sec")
+        end_sec = meta.get("end_offset_sec")
+        if start_sec is None or end_sec is None:
+            raise ValueError(
+                f"Video clip embedding at index {i} missing start/end offset seconds"
+            )
+        key = f"{key}_video_clip_{start_sec}_{end_sec}"
+    elif content_type == "image":
+        # Image content: just add image suffix, no time segments
+        key = f"{key}_image"
+    # For video master/other scopes, keep the key as is (inventory_id or inventory_id_embedding_option)
+    return key
+
+
+def build_vector_records(vectors_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate *vectors_data* and turn it into put_vectors records, one per key."""
+    for i, vd in enumerate(vectors_data):
+        if not isinstance(vd, dict):
+            raise ValueError(f"Vector data at index {i} must be a dictionary")
+        if "vector" not in vd:
+            raise ValueError(f"Vector data at index {i} missing 'vector' field")
+
+    # Numeric type, dimension, NaN/Inf and norm checks for the whole batch at once
+    _, values = prepare_embeddings(
+        [vd["vector"] for vd in vectors_data],
+        normalize=EMBEDDING_L2_NORMALIZE,
+        source="Vector",
+    )
+
+    records: Dict[str, Dict[str, Any]] = {}
+    for i, (vd, vector) in enumerate(zip(vectors_data, values)):
+        if "metadata" not in vd:
+            raise ValueError(f"Vector data at index {i} missing 'metadata' field")
+
+        meta = vd["metadata"]
+
+        if not isinstance(meta, dict):
+            raise ValueError(f"Metadata at index {i} must be a dictionary")
+        if not meta.get("inventory_id"):
+            raise ValueError(f"Metadata at index {i} missing required 'inventory_id'")
+
+        key = _vector_key(meta, i)
+        meta, dropped = conform_metadata(meta)
+        if dropped:
+            logger.warning(
+                "Dropped metadata keys outside the vector metadata schema",
+                extra={"key": key, "dropped": dropped},
+            )
+        # Last write wins for a repeated key, as it would on the service, but
+        # keeping one record per key stops concurrent batches racing on it.
+        records[key] = {"key": key, "data": {"float32": vector}, "metadata": meta}
+    return list(records.values())
+
+
+def _is_retryable(error: Exception) -> bool:
+    if not isinstance(error, ClientError):
+        return False
+    code = _error_code(error)
+    status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+    return code in _RETRYABLE_ERROR_CODES or status == 429 or status >= 500
+
+
+class _AdaptiveLimiter:
+    """
+    Concurrency gate for put_vectors calls (AIMD).
+
+    Throttling halves the number of calls allowed in flight; every success
+    lets one more through again, up to *max_concurrency*.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.throttles = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttles += 1
+                self.limit = max(1, self.limit // 2)
+            elif self.limit < self.max_concurrency:
+                self.limit += 1
+            self._cond.notify_all()
+
+
+def _put_batch(
+    client,
+    bucket_name: str,
+    index_name: str,
+    batch: List[Dict[str, Any]],
+    batch_no: int,
+    limiter: _AdaptiveLimiter,
+) -> None:
+    """Store one batch, retrying only this batch on throttling / transient errors."""
+    for attempt in range(PUT_VECTORS_MAX_RETRIES + 1):
+        limiter.acquire()
         try:
-            client.create_index(
+            client.put_vectors(
                 vectorBucketName=bucket_name,
                 indexName=index_name,
-                dimension=vector_dimension,
-                dataType="float32",
-                distanceMetric="cosine",
+                vectors=batch,
             )
-            logger.info(f"Created index {index_name} (dim={vector_dimension})")
         except Exception as e:
-            logger.error(f"Failed to create index {index_name}: {e}")
-            raise RuntimeError(f"Cannot create index {index_name}: {e}") from e
-    except Exception as e:
-        logger.error(f"Error checking index {index_name}: {e}")
-        raise RuntimeError(f"Cannot access index {index_name}: {e}") from e
+            retryable = _is_retryable(e)
+            limiter.release(throttled=retryable)
+            if _error_code(e) == "NotFoundException":
+                # Bucket or index deleted behind our back: forget the cached
+                # state so the next invocation re-checks / re-creates it
+                invalidate_vector_resources(bucket_name, index_name)
+            if not retryable or attempt == PUT_VECTORS_MAX_RETRIES:
+                logger.error(f"Failed to store batch {batch_no}: {e}")
+                raise RuntimeError(
+                    f"Failed to store vector batch {batch_no}: {e}"
+                ) from e
+            # Full-jitter exponential backoff, capped at 5 s
+            delay = random.uniform(
+                0, min(PUT_VECTORS_RETRY_BASE_DELAY * 2**attempt, 5.0)
+            )
+            logger.warning(
+                f"Batch {batch_no} throttled, retrying in {delay:.2f}s",
+                extra={"attempt": attempt + 1, "error": str(e)},
+            )
+            time.sleep(delay)
+            continue
+        limiter.release(throttled=False)
+        logger.info(f"Stored batch {batch_no} of {len(batch)} vectors")
+        return
 
 
 def store_vectors(
     client, bucket_name: str, index_name: str, vectors_data: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
-    """Store vectors in S3 Vector Store with strict validation."""
+    """
+    Store vectors in S3 Vector Store with strict validation.
+
+    Batches of PUT_VECTORS_BATCH_SIZE are written concurrently, at most
+    PUT_VECTORS_MAX_CONCURRENCY at a time and fewer while the service throttles.
+    Keys are deterministic, so a retried batch overwrites what it already wrote.
+    """
     if not bucket_name:
         raise RuntimeError(
             "Vector bucket name cannot be empty - check VECTOR_BUCKET_NAME environment variable"
@@ -483,90 +762,54 @@ def store_vectors(
         raise ValueError("No vectors provided for storage")
 
     try:
-        vectors = []
-        for i, vd in enumerate(vectors_data):
-            if not isinstance(vd, dict):
-                raise ValueError(f"Vector data at index {i} must be a dictionary")
-            if "vector" not in vd:
-                raise ValueError(f"Vector data at index {i} missing 'vector' field")
-            if "metadata" not in vd:
-                raise ValueError(f"Vector data at index {i} missing 'metadata' field")
-
-            vector = vd["vector"]
-            meta = vd["metadata"]
-
-            if not isinstance(vector, list) or not vector:
-                raise ValueError(f"Vector at index {i} must be a non-empty list")
-            if not isinstance(meta, dict):
-                raise ValueError(f"Metadata at index {i} must be a dictionary")
-            if not meta.get("inventory_id"):
-                raise ValueError(
-                    f"Metadata at index {i} missing required 'inventory_id'"
-                )
-
-            embedding_option = meta.get("embedding_option", "default")
-
-            # Start with inventory_id, only add embedding_option if it's not "default"
-            if embedding_option == "default":
-                key = meta["inventory_id"]
-            else:
-                key = f"{meta['inventory_id']}_{embedding_option}"
-
-            scope = meta.get("embedding_scope")
-            content_type = meta.get("content_type", "video")
-
-            # Handle different content types and scopes
-            if content_type == "audio":
-                # Audio content: always include time segments with audio_clip prefix
-                start_sec = meta.get("start_offset_sec")
-                end_sec = meta.get("end_offset_sec")
-                if start_sec is None or end_sec is None:
-                    raise ValueError(
-                        f"Audio embedding at index {i} missing start/end offset seconds"
-                    )
-                key = f"{key}_audio_clip_{start_sec}_{end_sec}"
-            elif content_type == "video" and scope == "clip":
-                # Video clip content: include time segments with video_clip prefix
-                start_sec = meta.get("start_offset_sec")
-                end_sec = meta.get("end_offset_sec")
-                if start_sec is None or end_sec is None:
-                    raise ValueError(
-                        f"Video clip embedding at index {i} missing start/end offset seconds"
+        vectors = build_vector_records(vectors_data)
+        batches = [
+            vectors[i : i + PUT_VECTORS_BATCH_SIZE]
+            for i in range(0, len(vectors), PUT_VECTORS_BATCH_SIZE)
+        ]
+        limiter = _AdaptiveLimiter(PUT_VECTORS_MAX_CONCURRENCY)
+        started = time.perf_counter()
+
+        if len(batches) == 1:
+            _put_batch(client, bucket_name, index_name, batches[0], 1, limiter)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(len(batches), limiter.max_concurrency)
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _put_batch, client, bucket_name, index_name, b, n, limiter
                     )
-                key = f"{key}_video_clip_{start_sec}_{end_sec}"
-            elif content_type == "image":
-                # Image content: just add image suffix, no time segments
-                key = f"{key}_image"
-            # For video master/other scopes, keep the key as is (inventory_id or inventory_id_embedding_option)
-
-            vectors.append(
-                {
-                    "key": key,
-                    "data": {"float32": vector},
-                    "metadata": meta,
-                }
+                    for n, b in enumerate(batches, start=1)
+                ]
+                # Surface the first failure after the other batches finish
+                for future in futures:
+                    future.result()
+
+        elapsed = time.perf_counter() - started
+        metrics.add_metric(
+            name="VectorsStored", unit=MetricUnit.Count, value=len(vectors)
+        )
+        metrics.add_metric(
+            name="VectorPutThrottles", unit=MetricUnit.Count, value=limiter.throttles
+        )
+        if elapsed > 0:
+            metrics.add_metric(
+                name="VectorPutThroughput",
+                unit=MetricUnit.CountPerSecond,
+                value=len(vectors) / elapsed,
             )
-
-        batch_size = 500
-        stored_keys = []
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i : i + batch_size]
-            try:
-                client.put_vectors(
-                    vectorBucketName=bucket_name,
-                    indexName=index_name,
-                    vectors=batch,
-                )
-                stored_keys.extend(v["key"] for v in batch)
-                logger.info(f"Stored batch of {len(batch)} vectors")
-
-            except Exception as e:
-                logger.error(f"Failed to store batch {i//batch_size + 1}: {e}")
-                raise RuntimeError(
-                    f"Failed to store vector batch {i//batch_size + 1}: {e}"
-                ) from e
-
-        return {"stored_keys": stored_keys}
+        logger.info(
+            f"Stored {len(vectors)} vectors in {len(batches)} batches",
+            extra={
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "vectors_per_second": (
+                    round(len(vectors) / elapsed, 1) if elapsed > 0 else None
+                ),
+                "throttles": limiter.throttles,
+            },
+        )
+        return {"stored_keys": [v["key"] for v in vectors]}
     except Exception as e:
         if isinstance(e, (ValueError, RuntimeError)):
             raise
@@ -575,13 +818,12 @@ def store_vectors(
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-def process_single_embedding(
+def build_segment_vector(
     payload: Dict[str, Any],
     embedding_data: Dict[str, Any],
-    client,
     inventory_id: str,
 ) -> Dict[str, Any]:
-    """Process single embedding with strict validation."""
+    """Build (but do not store) the vector record for one clip/audio/image embedding."""
     if not isinstance(payload, dict):
         raise ValueError("Payload must be a dictionary")
     if not isinstance(embedding_data, dict):
@@ -631,18 +873,35 @@ def process_single_embedding(
     if opt is not None:
         metadata["embedding_option"] = opt
 
-    vectors_data = [{"vector": embedding_vector, "metadata": metadata}]
+    return {
+        "vector_data": {"vector": embedding_vector, "metadata": metadata},
+        "start_sec": start_sec,
+        "end_sec": end_sec,
+    }
+
+
+def process_single_embedding(
+    payload: Dict[str, Any],
+    embedding_data: Dict[str, Any],
+    client,
+    inventory_id: str,
+) -> Dict[str, Any]:
+    """Process single embedding with strict validation."""
+    segment = build_segment_vector(payload, embedding_data, inventory_id)
+    embedding_vector = segment["vector_data"]["vector"]
 
     # These now raise exceptions instead of returning booleans
     ensure_vector_bucket_exists(client, VECTOR_BUCKET_NAME)
     dim = len(embedding_vector)
     ensure_index_exists(client, VECTOR_BUCKET_NAME, INDEX_NAME, dim)
-    store_result = store_vectors(client, VECTOR_BUCKET_NAME, INDEX_NAME, vectors_data)
+    store_result = store_vectors(
+        client, VECTOR_BUCKET_NAME, INDEX_NAME, [segment["vector_data"]]
+    )
 
     return {
         "document_id": f"{inventory_id}_{int(datetime.utcnow().timestamp())}",
-        "start_sec": start_sec,
-        "end_sec": end_sec,
+        "start_sec": segment["start_sec"],
+        "end_sec": segment["end_sec"],
         **store_result,
     }
 
@@ -674,6 +933,7 @@ def process_store_action(payload: Dict[str, Any]) -> Dict[str, Any]:
 
         results = []
         video_scope = []
+        segment_vectors = []
         for i, emb in enumerate(data_list):
             if not isinstance(emb, dict):
                 raise ValueError(f"Embedding data at index {i} must be a dictionary")
@@ -692,12 +952,30 @@ def process_store_action(payload: Dict[str, Any]) -> Dict[str, Any]:
                 video_scope.append((i, emb))
             else:
                 try:
-                    res = process_single_embedding(payload, emb, client, inventory_id)
-                    results.append(res)
+                    segment_vectors.append(
+                        build_segment_vector(payload, emb, inventory_id)
+                    )
                 except Exception as e:
                     logger.error(f"Failed to process embedding {i}: {e}")
                     raise RuntimeError(f"Failed to process embedding {i}: {e}") from e
 
+        # All segment embeddings of the batch go out in one concurrent write
+        if segment_vectors:
+            ensure_vector_bucket_exists(client, bucket)
+            dim = len(segment_vectors[0]["vector_data"]["vector"])
+            ensure_index_exists(client, bucket, index, dim)
+            store_vectors(
+                client, bucket, index, [sv["vector_data"] for sv in segment_vectors]
+            )
+            results.extend(
+                {
+                    "document_id": f"{inventory_id}_{int(datetime.utcnow().timestamp())}",
+                    "start_sec": sv["start_sec"],
+                    "end_sec": sv["end_sec"],
+                }
+                for sv in segment_vectors
+            )
+
         # Check if this is primarily audio content processing
         first_embedding = data_list[0] if data_list else {}
         primary_content_type = detect_content_type(payload, first_embedding)
@@ -842,6 +1120,7 @@ def process_store_action(payload: Dict[str, Any]) -> Dict[str, Any]:
 @lambda_middleware(event_bus_name=EVENT_BUS_NAME)
 @logger.inject_lambda_context
 @tracer.capture_lambda_handler
+@metrics.log_metrics
 def lambda_handler(event: Dict[str, Any], _context: LambdaContext):
     """Main Lambda handler with strict error handling."""
     try:
@@ -1,56 +1,26 @@
 import json
 import os
 import re
-import subprocess
-from pathlib import Path
 from typing import Any, Dict
 
 import boto3
+import media_probe
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from lambda_middleware import lambda_middleware  # your decorator
-from pymediainfo import MediaInfo
 
 # ─── constants ──────────────────────────────────────────────────────────
 SIGNED_URL_TIMEOUT = 60
-FFPROBE_BIN = "/opt/bin/ffprobe"
-TMP_DIR = Path("/tmp")
 
 logger = Logger()
 tracer = Tracer()
 
 s3 = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
-asset_table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
 
 
 # ─── helpers ────────────────────────────────────────────────────────────
-def run_ffprobe(file_path: str) -> Dict[str, Any]:
-    """Return ffprobe JSON for a file, raise on error."""
-    result = subprocess.run(
-        [
-            FFPROBE_BIN,
-            "-v",
-            "error",
-            "-show_streams",
-            "-show_format",
-            "-print_format",
-            "json",
-            file_path,
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
-    if result.returncode:
-        raise RuntimeError(f"ffprobe failed: {result.stderr.decode()}")
-    return json.loads(result.stdout)
-
-
-def run_mediainfo(file_path: str) -> Dict[str, Any]:
-    """Return MediaInfo JSON for a file."""
-    return json.loads(MediaInfo.parse(file_path, output="JSON"))
-
-
 def merge_metadata(ff: Dict, mi: Dict) -> Dict[str, Any]:
     merged = {"general": {}, "video": [], "audio": []}
 
@@ -145,36 +115,29 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext):
             src = asset["DigitalSourceAsset"]["MainRepresentation"]
             bucket = src["StorageInfo"]["PrimaryLocation"]["Bucket"]
             key = src["StorageInfo"]["PrimaryLocation"]["ObjectKey"]["FullPath"]
-            local_file = TMP_DIR / Path(key).name
-
-            # 1. Download from S3
-            s3.download_file(bucket, key, str(local_file))
-            steps.setdefault(inv_id, {})["S3_download"] = "Success"
 
-            # 2. Probe with ffprobe + MediaInfo
-            ff = run_ffprobe(str(local_file))
-            mi = run_mediainfo(str(local_file))
+            # 1-2. Probe with ffprobe + MediaInfo straight from S3
+            ff, mi, probe_stats = media_probe.probe(
+                s3, bucket, key, url_expires=SIGNED_URL_TIMEOUT
+            )
+            logger.info("Probed source", extra={"key": key, **probe_stats})
+            steps.setdefault(inv_id, {})["Probe_source"] = probe_stats["source"]
             steps[inv_id]["Metadata_probe"] = "Success"
 
             merged = merge_metadata(ff, mi)
             sanitized = sanitize_metadata(merged)
 
             # 3. Update DynamoDB
-            asset_table.update_item(
-                Key={"InventoryID": inv_id},
+            #    (the written record comes back with the update)
+            updated_assets[inv_id] = asset_cache.update(
+                inv_id,
                 UpdateExpression="SET #m.#e = :v",
                 ExpressionAttributeNames={"#m": "Metadata", "#e": "EmbeddedMetadata"},
                 ExpressionAttributeValues={":v": sanitized},
             )
             steps[inv_id]["DDB_update"] = "Success"
 
-            # 4. Fetch the updated record back
-            get_resp = asset_table.get_item(Key={"InventoryID": inv_id})
-            updated_item = get_resp.get("Item", {})
-            updated_assets[inv_id] = updated_item
-            steps[inv_id]["DDB_get"] = "Success"
-
-            # 5. Build minimal video spec
+            # 4. Build minimal video spec
             v0 = merged.get("video", [{}])[0]
             video_specs[inv_id] = {
                 "Resolution": {"Width": v0.get("width"), "Height": v0.get("height")},
@@ -5,6 +5,10 @@ Video-proxy + thumbnail trigger Lambda (no DynamoDB cache)
 • Renders a MediaConvert job (proxy MP4 + FRAME_CAPTURE JPEG) from Jinja in S3
 • Retries describe_endpoints with exponential back-off
 • Cleans up any existing proxy or thumbnail before submitting a new job
+• STREAMING_OUTPUT=hls adds a CMAF HLS ladder (HLS_SEGMENT_SECONDS segments,
+  one byte-ranged file per rendition) under ``<output_key>_hls/``; HLS_LADDER
+  (JSON ``[{"height": 720, "max_bitrate": 3500000}, …]``) replaces the default
+  360/540/720p ladder, rungs taller than the source are dropped
 """
 
 import decimal
@@ -17,6 +21,7 @@ import time
 from typing import Any, Dict, List
 
 import boto3
+from asset_record_cache import get_asset_cache
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from botocore.exceptions import ClientError
@@ -27,8 +32,10 @@ from lambda_middleware import lambda_middleware
 logger = Logger()
 tracer = Tracer()
 s3 = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
-asset_table = dynamodb.Table(os.environ["MEDIALAKE_ASSET_TABLE"])
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
+
+STREAMING_OUTPUT = os.getenv("STREAMING_OUTPUT", "off").lower()
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", "4"))
 
 
 def _raise(msg: str):
@@ -189,6 +196,13 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext) -> Dict[str, Any]:
                 "mediaconvert_queue_arn": os.environ["MEDIACONVERT_QUEUE_ARN"],
                 "thumbnail_width": event.get("thumbnail_width", 300),
                 "thumbnail_height": event.get("thumbnail_height", 400),
+                "hls": STREAMING_OUTPUT == "hls",
+                "hls_segment_seconds": HLS_SEGMENT_SECONDS,
+                "hls_ladder": (
+                    json.loads(os.environ["HLS_LADDER"])
+                    if os.getenv("HLS_LADDER")
+                    else None
+                ),
             }
         )
 
@@ -212,8 +226,7 @@ def lambda_handler(event: Dict[str, Any], _: LambdaContext) -> Dict[str, Any]:
         # ── FETCH UPDATED DYNAMODB RECORD ────────────────────────────────────
         try:
             inv_id = asset["InventoryID"]
-            ddb_resp = asset_table.get_item(Key={"InventoryID": inv_id})
-            updated_item = ddb_resp.get("Item", {})
+            updated_item = asset_cache.get(inv_id) or {}
         except Exception as e:
             logger.warning(
                 "Failed to fetch updated DynamoDB item", extra={"error": str(e)}
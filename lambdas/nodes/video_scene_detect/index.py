@@ -0,0 +1,191 @@
+"""
+Video scene detection node: find shot boundaries in the video proxy so clip
+embeddings can follow shots instead of fixed-length windows.
+
+ffmpeg's ``scdet`` filter scores the difference between consecutive frames
+of a downscaled, frame-rate reduced copy of the proxy, read straight from a
+presigned URL (no download). Cuts closer than ``MIN_SHOT_SECONDS`` apart are
+merged into the previous shot. The shots are stored on the asset record as
+
+    "Shots": {"method": "scdet", "threshold": 10.0,
+              "segments": [{"start": 0.0, "end": 4.2}, …]}
+
+so later steps (the TwelveLabs embed-task result mapping pools the fixed
+clips per shot) read them from ``payload.assets[0]``. The incoming
+``payload.data`` (e.g. the pre_signed_url output) is passed through, so the
+node can sit between the URL generator and the embedding task.
+
+ENV
+───
+SCENE_THRESHOLD       default 10    (scdet score, 0–100)
+MIN_SHOT_SECONDS      default 2
+SCENE_ANALYSIS_FPS    default 5     (frames per second analysed)
+SCENE_ANALYSIS_WIDTH  default 160   (px)
+"""
+
+import decimal
+import json
+import os
+import re
+import subprocess
+import time
+from typing import Any, Dict, List, Tuple
+
+import boto3
+from asset_record_cache import get_asset_cache
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from lambda_middleware import lambda_middleware
+
+logger = Logger()
+tracer = Tracer()
+metrics = Metrics(namespace="MediaLake", service="video_scene_detect")
+
+FFMPEG_BIN = "/opt/bin/ffmpeg"
+SIGNED_URL_TIMEOUT = 3600
+
+SCENE_THRESHOLD = float(os.getenv("SCENE_THRESHOLD", "10"))
+MIN_SHOT_SECONDS = float(os.getenv("MIN_SHOT_SECONDS", "2"))
+ANALYSIS_FPS = float(os.getenv("SCENE_ANALYSIS_FPS", "5"))
+ANALYSIS_WIDTH = int(os.getenv("SCENE_ANALYSIS_WIDTH", "160"))
+
+_CUT_RE = re.compile(r"lavfi\.scd\.time:\s*(\d+(?:\.\d+)?)")
+_DURATION_RE = re.compile(r"Duration:\s+(\d+):(\d+):(\d+\.\d+)")
+
+s3 = boto3.client("s3")
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
+
+
+# ── helpers ─────────────────────────────────────────────────────────────────
+def clean_asset_id(input_string: str) -> str:
+    parts = input_string.split(":")
+    uuid = parts[-1] if parts[-1] != "master" else parts[-2]
+    return f"asset:uuid:{uuid}"
+
+
+def _strip_decimals(obj):
+    if isinstance(obj, list):
+        return [_strip_decimals(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _strip_decimals(v) for k, v in obj.items()}
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    return obj
+
+
+def _proxy_url(payload: Dict[str, Any]) -> str:
+    """The incoming presigned URL, else a fresh one for the video proxy."""
+    data = payload.get("data") or {}
+    if isinstance(data, dict) and data.get("presignedUrl"):
+        return data["presignedUrl"]
+    for rep in payload["assets"][0].get("DerivedRepresentations", []):
+        if rep.get("Purpose") == "proxy" and rep.get("Type") == "Video":
+            loc = rep["StorageInfo"]["PrimaryLocation"]
+            return s3.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": loc["Bucket"], "Key": loc["ObjectKey"]["FullPath"]},
+                ExpiresIn=SIGNED_URL_TIMEOUT,
+            )
+    raise ValueError("No presignedUrl in payload.data and no video proxy found")
+
+
+def detect_cuts(url: str) -> Tuple[List[float], float]:
+    """Scene-change times (s) and the duration of the video at *url*."""
+    cmd = [
+        FFMPEG_BIN,
+        "-hide_banner",
+        "-nostats",
+        "-i",
+        url,
+        "-map",
+        "0:v:0",
+        "-an",
+        "-vf",
+        f"fps={ANALYSIS_FPS},scale={ANALYSIS_WIDTH}:-2,"
+        f"scdet=threshold={SCENE_THRESHOLD}:sc_pass=1",
+        "-f",
+        "null",
+        "-",
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"ffmpeg scdet failed: {proc.stderr.strip()[-2000:]}")
+    match = _DURATION_RE.search(proc.stderr)
+    duration = (
+        int(match[1]) * 3600 + int(match[2]) * 60 + float(match[3]) if match else 0.0
+    )
+    cuts = sorted({float(t) for t in _CUT_RE.findall(proc.stderr)})
+    return cuts, duration
+
+
+def build_shots(
+    cuts: List[float], duration: float, min_shot: float = MIN_SHOT_SECONDS
+) -> List[Dict[str, float]]:
+    """Shots between the cuts; cuts within *min_shot* of the last are dropped."""
+    end = max(duration, cuts[-1] if cuts else 0.0)
+    bounds = [0.0]
+    for cut in cuts:
+        if cut - bounds[-1] >= min_shot and end - cut >= min_shot:
+            bounds.append(cut)
+    bounds.append(end)
+    return [
+        {"start": round(a, 3), "end": round(b, 3)}
+        for a, b in zip(bounds, bounds[1:])
+        if b > a
+    ]
+
+
+# ── handler ─────────────────────────────────────────────────────────────────
+@lambda_middleware(event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"))
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def lambda_handler(event: Dict[str, Any], context: LambdaContext):
+    payload = event.get("payload") or {}
+    assets = payload.get("assets") or []
+    if not assets:
+        raise ValueError("Missing payload.assets")
+    inv_id = clean_asset_id(assets[0]["InventoryID"])
+
+    t = time.perf_counter()
+    cuts, duration = detect_cuts(_proxy_url(payload))
+    shots = build_shots(cuts, duration)
+    detect_ms = round((time.perf_counter() - t) * 1000, 1)
+    logger.info(
+        "Detected shots",
+        extra={
+            "cuts": len(cuts),
+            "shots": len(shots),
+            "duration": duration,
+            "detectMs": detect_ms,
+        },
+    )
+    metrics.add_metric(name="ShotsDetected", unit=MetricUnit.Count, value=len(shots))
+    metrics.add_metric(
+        name="SceneDetectTime", unit=MetricUnit.Milliseconds, value=detect_ms
+    )
+
+    record = {
+        "method": "scdet",
+        "threshold": SCENE_THRESHOLD,
+        "minShotSeconds": MIN_SHOT_SECONDS,
+        "segments": shots,
+    }
+    updated = asset_cache.update(
+        inv_id,
+        UpdateExpression="SET #shots = :shots",
+        ExpressionAttributeNames={"#shots": "Shots"},
+        ExpressionAttributeValues={
+            ":shots": json.loads(json.dumps(record), parse_float=decimal.Decimal)
+        },
+    )
+
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else {}
+    return {
+        **data,
+        "statusCode": 200,
+        "shotCount": len(shots),
+        "shots": shots,
+        "updatedAsset": _strip_decimals(updated),
+    }
@@ -0,0 +1,553 @@
+"""
+Video sprites node: hover-scrub and timeline previews without proxy bytes.
+
+One ffmpeg pass over the video proxy (read from a presigned URL) samples a
+frame every ``SPRITE_INTERVAL`` seconds (``interval`` mode) or the keyframes
+at least that far apart (``keyframes`` mode, only keyframes are decoded),
+letterboxes each into a fixed ``SPRITE_TILE_WIDTH`` x ``SPRITE_TILE_HEIGHT``
+tile and pipes raw RGB out. Tiles are packed into ``SPRITE_COLUMNS`` x
+``SPRITE_ROWS`` sheets that are encoded and uploaded while ffmpeg keeps
+decoding, so at most a few sheets are held in memory. ``showinfo`` gives the
+timestamp of every tile.
+
+DerivedRepresentations written (re-runs replace them):
+
+* ``spriteSheet``  – one per sheet (JPEG / WEBP), ``SpriteSpec`` holds its
+  grid and time range;
+* ``scrubSheet``   – a single row of ``SPRITE_SCRUB_TILES`` tiles spread
+  over the whole video, for hover-scrubbing in the search grid;
+* ``spriteIndex``  – WebVTT thumbnail track (``sheet.jpg#xywh=x,y,w,h``,
+  sheet names relative to the track) and a JSON index (tile time, sheet,
+  x, y) for the clip timeline.
+
+ENV
+───
+SPRITE_MODE          default interval  (interval | keyframes)
+SPRITE_INTERVAL      default 5         (s between tiles / min keyframe gap)
+SPRITE_FORMAT        default JPEG      (JPEG | WEBP)
+SPRITE_QUALITY       default 70
+SPRITE_TILE_WIDTH    default 160       (px)
+SPRITE_TILE_HEIGHT   default 90        (px)
+SPRITE_COLUMNS       default 10
+SPRITE_ROWS          default 10
+SPRITE_SCRUB_TILES   default 10
+"""
+
+import decimal
+import io
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+import numpy as np
+from asset_record_cache import get_asset_cache
+from aws_lambda_powertools import Logger, Metrics, Tracer
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.config import Config
+from lambda_middleware import lambda_middleware
+from PIL import Image
+
+logger = Logger()
+tracer = Tracer()
+metrics = Metrics(namespace="MediaLake", service="video_sprites")
+
+FFMPEG_BIN = "/opt/bin/ffmpeg"
+SIGNED_URL_TIMEOUT = 3600
+UPLOAD_WORKERS = 4
+
+SPRITE_MODE = os.getenv("SPRITE_MODE", "interval").lower()
+SPRITE_INTERVAL = float(os.getenv("SPRITE_INTERVAL", "5"))
+SPRITE_FORMAT = os.getenv("SPRITE_FORMAT", "JPEG").upper()
+SPRITE_QUALITY = int(os.getenv("SPRITE_QUALITY", "70"))
+TILE_WIDTH = int(os.getenv("SPRITE_TILE_WIDTH", "160"))
+TILE_HEIGHT = int(os.getenv("SPRITE_TILE_HEIGHT", "90"))
+COLUMNS = int(os.getenv("SPRITE_COLUMNS", "10"))
+ROWS = int(os.getenv("SPRITE_ROWS", "10"))
+SCRUB_TILES = int(os.getenv("SPRITE_SCRUB_TILES", "10"))
+
+# format -> (object key extension, content type)
+_FORMAT_FILES = {
+    "JPEG": ("jpg", "image/jpeg"),
+    "WEBP": ("webp", "image/webp"),
+}
+_PTS_RE = re.compile(r"\bpts_time:\s*(-?\d+(?:\.\d+)?)")
+_DURATION_RE = re.compile(r"Duration:\s+(\d+):(\d+):(\d+\.\d+)")
+PURPOSES = {"spriteSheet", "scrubSheet", "spriteIndex"}
+
+s3 = boto3.client("s3", config=Config(max_pool_connections=UPLOAD_WORKERS * 2))
+asset_cache = get_asset_cache(os.environ["MEDIALAKE_ASSET_TABLE"])
+
+
+# ── helpers ─────────────────────────────────────────────────────────────────
+def clean_asset_id(input_string: str) -> str:
+    parts = input_string.split(":")
+    uuid = parts[-1] if parts[-1] != "master" else parts[-2]
+    return f"asset:uuid:{uuid}"
+
+
+def _strip_decimals(obj):
+    if isinstance(obj, list):
+        return [_strip_decimals(v) for v in obj]
+    if isinstance(obj, dict):
+        return {k: _strip_decimals(v) for k, v in obj.items()}
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    return obj
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+def _proxy_location(asset: Dict[str, Any]) -> Tuple[str, str]:
+    """Bucket and key of the video proxy, else of the original."""
+    for rep in asset.get("DerivedRepresentations", []):
+        if rep.get("Purpose") == "proxy" and rep.get("Type") == "Video":
+            loc = rep["StorageInfo"]["PrimaryLocation"]
+            return loc["Bucket"], loc["ObjectKey"]["FullPath"]
+    loc = asset["DigitalSourceAsset"]["MainRepresentation"]["StorageInfo"][
+        "PrimaryLocation"
+    ]
+    return loc["Bucket"], loc["ObjectKey"]["FullPath"]
+
+
+def _vtt_time(seconds: float) -> str:
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    return f"{hours:02d}:{minutes:02d}:{ms // 1000:02d}.{ms % 1000:03d}"
+
+
+def ffmpeg_command(url: str, mode: str = SPRITE_MODE) -> List[str]:
+    """ffmpeg args that write the sampled, letterboxed tiles as raw RGB."""
+    tile = (
+        f"scale={TILE_WIDTH}:{TILE_HEIGHT}:force_original_aspect_ratio=decrease,"
+        f"pad={TILE_WIDTH}:{TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,showinfo"
+    )
+    if mode == "keyframes":
+        decode = ["-skip_frame", "nokey"]
+        sample = (
+            "select='isnan(prev_selected_t)"
+            f"+gte(t-prev_selected_t,{SPRITE_INTERVAL})'"
+        )
+        sync = ["-fps_mode", "passthrough"]
+    else:
+        decode, sample, sync = [], f"fps=1/{SPRITE_INTERVAL}", []
+    return [
+        FFMPEG_BIN,
+        "-nostdin",
+        "-hide_banner",
+        "-nostats",
+        *decode,
+        "-i",
+        url,
+        "-map",
+        "0:v:0",
+        "-an",
+        "-vf",
+        f"{sample},{tile}",
+        *sync,
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-",
+    ]
+
+
+def encode(pixels: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    kwargs = {"quality": SPRITE_QUALITY}
+    if SPRITE_FORMAT == "JPEG":
+        kwargs.update(optimize=True, progressive=True)
+    else:
+        kwargs.update(method=4)
+    Image.fromarray(pixels, "RGB").save(buf, format=SPRITE_FORMAT, **kwargs)
+    return buf.getvalue()
+
+
+class ScrubReservoir:
+    """
+    Every k-th tile, k doubling whenever twice *size* tiles are held, so an
+    even spread over the whole video is kept without knowing its length.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.step = 1
+        self.tiles: List[Tuple[int, np.ndarray]] = []
+
+    def offer(self, index: int, tile: np.ndarray) -> None:
+        if index % self.step:
+            return
+        self.tiles.append((index, tile))
+        if len(self.tiles) >= 2 * self.size:
+            self.step *= 2
+            self.tiles = [t for t in self.tiles if t[0] % self.step == 0]
+
+    def pick(self) -> List[Tuple[int, np.ndarray]]:
+        if len(self.tiles) <= self.size:
+            return self.tiles
+        picks = np.linspace(0, len(self.tiles) - 1, self.size).round().astype(int)
+        return [self.tiles[i] for i in picks]
+
+
+class SpriteWriter:
+    """Packs tiles into sheets and uploads each sheet as soon as it is full."""
+
+    def __init__(self, bucket: str, stem: str, pool: ThreadPoolExecutor):
+        self.bucket = bucket
+        self.stem = stem
+        self.pool = pool
+        self.per_sheet = COLUMNS * ROWS
+        self.count = 0
+        self.sheets: List[Future] = []
+        self._sheet = np.zeros((ROWS * TILE_HEIGHT, COLUMNS * TILE_WIDTH, 3), np.uint8)
+
+    def add(self, tile: np.ndarray) -> None:
+        slot = self.count % self.per_sheet
+        y, x = slot // COLUMNS * TILE_HEIGHT, slot % COLUMNS * TILE_WIDTH
+        self._sheet[y : y + TILE_HEIGHT, x : x + TILE_WIDTH] = tile
+        self.count += 1
+        if slot == self.per_sheet - 1:
+            self._flush(self.per_sheet)
+
+    def close(self) -> List[Dict[str, Any]]:
+        if self.count % self.per_sheet:
+            self._flush(self.count % self.per_sheet)
+        return [f.result() for f in self.sheets]
+
+    def _flush(self, tiles: int) -> None:
+        rows = -(-tiles // COLUMNS)
+        pixels = self._sheet[: rows * TILE_HEIGHT].copy()
+        if tiles < COLUMNS:
+            pixels = pixels[:, : tiles * TILE_WIDTH]
+        ext = _FORMAT_FILES[SPRITE_FORMAT][0]
+        key = f"{self.stem}_sprite_{len(self.sheets):03d}.{ext}"
+        self.sheets.append(self.pool.submit(self._upload, pixels, key, tiles))
+        self._sheet[:] = 0
+
+    def _upload(self, pixels: np.ndarray, key: str, tiles: int) -> Dict[str, Any]:
+        body = encode(pixels)
+        s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ContentType=_FORMAT_FILES[SPRITE_FORMAT][1],
+        )
+        return {"key": key, "size": len(body), "tiles": tiles}
+
+
+def render_sprites(
+    url: str, bucket: str, stem: str
+) -> Tuple[List[Dict[str, Any]], List[float], float, ScrubReservoir]:
+    """Run the ffmpeg pass; returns sheets, tile times, duration, scrub tiles."""
+    frame_bytes = TILE_WIDTH * TILE_HEIGHT * 3
+    proc = subprocess.Popen(
+        ffmpeg_command(url), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    stderr: List[str] = []
+
+    def _drain():
+        for line in io.TextIOWrapper(proc.stderr, errors="replace"):
+            stderr.append(line)
+
+    drain = threading.Thread(target=_drain, daemon=True)
+    drain.start()
+
+    scrub = ScrubReservoir(SCRUB_TILES)
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as pool:
+        writer = SpriteWriter(bucket, stem, pool)
+        while True:
+            frame = proc.stdout.read(frame_bytes)
+            if len(frame) < frame_bytes:
+                break
+            tile = np.frombuffer(frame, np.uint8).reshape(TILE_HEIGHT, TILE_WIDTH, 3)
+            scrub.offer(writer.count, tile)
+            writer.add(tile)
+        returncode = proc.wait()
+        drain.join()
+        if returncode:
+            tail = "".join(stderr)[-2000:]
+            raise RuntimeError(f"ffmpeg sprite pass failed: {tail}")
+        sheets = writer.close()
+
+    log = "".join(stderr)
+    times = [float(t) for t in _PTS_RE.findall(log)][: writer.count]
+    if len(times) < writer.count:
+        logger.warning("showinfo times missing, assuming the sampling interval")
+        times = [i * SPRITE_INTERVAL for i in range(writer.count)]
+    match = _DURATION_RE.search(log)
+    duration = (
+        int(match[1]) * 3600 + int(match[2]) * 60 + float(match[3])
+        if match
+        else (times[-1] + SPRITE_INTERVAL if times else 0.0)
+    )
+    return sheets, times, duration, scrub
+
+
+def tile_position(index: int) -> Tuple[int, int, int]:
+    """Sheet number and x, y offset of tile *index*."""
+    sheet, slot = divmod(index, COLUMNS * ROWS)
+    return sheet, slot % COLUMNS * TILE_WIDTH, slot // COLUMNS * TILE_HEIGHT
+
+
+def build_vtt(sheets: List[Dict[str, Any]], times: List[float], duration: float) -> str:
+    """WebVTT thumbnail track; sheet names are relative to the track."""
+    cues = ["WEBVTT", ""]
+    for i, start in enumerate(times):
+        end = times[i + 1] if i + 1 < len(times) else max(duration, start)
+        sheet, x, y = tile_position(i)
+        name = sheets[sheet]["key"].rsplit("/", 1)[-1]
+        cues += [
+            f"{_vtt_time(start)} --> {_vtt_time(end)}",
+            f"{name}#xywh={x},{y},{TILE_WIDTH},{TILE_HEIGHT}",
+            "",
+        ]
+    return "\n".join(cues)
+
+
+def build_index(
+    sheets: List[Dict[str, Any]], times: List[float], duration: float
+) -> Dict[str, Any]:
+    """JSON index: grid geometry, sheet names and [time, sheet, x, y] per tile."""
+    return {
+        "version": 1,
+        "mode": SPRITE_MODE,
+        "interval": SPRITE_INTERVAL,
+        "duration": round(duration, 3),
+        "format": SPRITE_FORMAT,
+        "tileWidth": TILE_WIDTH,
+        "tileHeight": TILE_HEIGHT,
+        "columns": COLUMNS,
+        "rows": ROWS,
+        "sheets": [s["key"].rsplit("/", 1)[-1] for s in sheets],
+        "tiles": [[round(t, 3), *tile_position(i)] for i, t in enumerate(times)],
+    }
+
+
+def _rep(
+    rep_id: str,
+    purpose: str,
+    fmt: str,
+    bucket: str,
+    key: str,
+    size: int,
+    rep_type: str = "Image",
+    spec: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    rep = {
+        "ID": rep_id,
+        "Type": rep_type,
+        "Format": fmt,
+        "Purpose": purpose,
+        "StorageInfo": {
+            "PrimaryLocation": {
+                "StorageType": "s3",
+                "Provider": "aws",
+                "Bucket": bucket,
+                "ObjectKey": {"FullPath": key},
+                "Status": "active",
+                "FileInfo": {"Size": size},
+            }
+        },
+    }
+    if spec:
+        rep["SpriteSpec"] = spec
+    return rep
+
+
+# ── handler ─────────────────────────────────────────────────────────────────
+@lambda_middleware(event_bus_name=os.environ.get("EVENT_BUS_NAME", "default-event-bus"))
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def lambda_handler(event: Dict[str, Any], context: LambdaContext):
+    payload = event.get("payload") or {}
+    assets = payload.get("assets") or []
+    if not assets:
+        raise ValueError("Missing payload.assets")
+    if SPRITE_FORMAT not in _FORMAT_FILES:
+        raise ValueError(f"Unsupported SPRITE_FORMAT: {SPRITE_FORMAT}")
+    asset = assets[0]
+    asset_id = clean_asset_id(asset["InventoryID"])
+    out_bucket = os.environ["MEDIA_ASSETS_BUCKET_NAME"]
+
+    bucket, key = _proxy_location(asset)
+    url = s3.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket, "Key": key},
+        ExpiresIn=SIGNED_URL_TIMEOUT,
+    )
+    stem = key.rsplit(".", 1)[0]
+    ext, _ = _FORMAT_FILES[SPRITE_FORMAT]
+
+    # ── one pass: sample, tile, pack and upload ----------------------------
+    t = time.perf_counter()
+    sheets, times, duration, scrub = render_sprites(url, out_bucket, stem)
+    render_ms = _ms(t)
+    if not times:
+        raise RuntimeError(f"No frames sampled from s3://{bucket}/{key}")
+
+    # ── scrub strip and indexes -------------------------------------------
+    picks = scrub.pick()
+    strip = np.concatenate([tile for _, tile in picks], axis=1)
+    scrub_body = encode(strip)
+    scrub_key = f"{stem}_scrub.{ext}"
+    s3.put_object(
+        Bucket=out_bucket,
+        Key=scrub_key,
+        Body=scrub_body,
+        ContentType=_FORMAT_FILES[SPRITE_FORMAT][1],
+    )
+    vtt = build_vtt(sheets, times, duration).encode()
+    index = json.dumps(build_index(sheets, times, duration)).encode()
+    vtt_key, index_key = f"{stem}_sprites.vtt", f"{stem}_sprites.json"
+    s3.put_object(Bucket=out_bucket, Key=vtt_key, Body=vtt, ContentType="text/vtt")
+    s3.put_object(
+        Bucket=out_bucket, Key=index_key, Body=index, ContentType="application/json"
+    )
+
+    # ── representations ----------------------------------------------------
+    new_reps = []
+    first = 0
+    for n, sheet in enumerate(sheets):
+        last = first + sheet["tiles"] - 1
+        new_reps.append(
+            _rep(
+                f"{asset_id}:spriteSheet:{n}",
+                "spriteSheet",
+                SPRITE_FORMAT,
+                out_bucket,
+                sheet["key"],
+                sheet["size"],
+                spec={
+                    "Sheet": n,
+                    "Start": round(times[first], 3),
+                    "End": round(
+                        times[last + 1] if last + 1 < len(times) else duration, 3
+                    ),
+                    "Tiles": sheet["tiles"],
+                    "Columns": COLUMNS,
+                    "TileWidth": TILE_WIDTH,
+                    "TileHeight": TILE_HEIGHT,
+                },
+            )
+        )
+        first = last + 1
+    new_reps.append(
+        _rep(
+            f"{asset_id}:scrubSheet",
+            "scrubSheet",
+            SPRITE_FORMAT,
+            out_bucket,
+            scrub_key,
+            len(scrub_body),
+            spec={
+                "Tiles": len(picks),
+                "Columns": len(picks),
+                "TileWidth": TILE_WIDTH,
+                "TileHeight": TILE_HEIGHT,
+                "Times": [round(times[i], 3) for i, _ in picks],
+            },
+        )
+    )
+    spec = {
+        "Mode": SPRITE_MODE,
+        "Interval": SPRITE_INTERVAL,
+        "Tiles": len(times),
+        "Sheets": len(sheets),
+        "Duration": round(duration, 3),
+    }
+    new_reps += [
+        _rep(
+            f"{asset_id}:spriteIndex:vtt",
+            "spriteIndex",
+            "VTT",
+            out_bucket,
+            vtt_key,
+            len(vtt),
+            rep_type="Data",
+            spec=spec,
+        ),
+        _rep(
+            f"{asset_id}:spriteIndex:json",
+            "spriteIndex",
+            "JSON",
+            out_bucket,
+            index_key,
+            len(index),
+            rep_type="Data",
+            spec=spec,
+        ),
+    ]
+
+    stored = json.loads(json.dumps(new_reps), parse_float=decimal.Decimal)
+
+    superseded: List[Dict[str, Any]] = []
+
+    def _replace_reps(current):
+        # re-evaluated against the re-read record if another step wrote meanwhile
+        reps = (current or {}).get("DerivedRepresentations", [])
+        superseded[:] = [r for r in reps if r.get("Purpose") in PURPOSES]
+        kept = [r for r in reps if r.get("Purpose") not in PURPOSES]
+        return {
+            "UpdateExpression": "SET DerivedRepresentations = :dr",
+            "ExpressionAttributeValues": {":dr": kept + stored},
+        }
+
+    updated = asset_cache.modify(asset_id, _replace_reps)
+
+    # Sheets of an earlier run that were not overwritten (fewer sheets now, or
+    # another SPRITE_FORMAT) are no longer referenced
+    def _location(rep: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        location = rep.get("StorageInfo", {}).get("PrimaryLocation", {})
+        return location.get("Bucket"), location.get("ObjectKey", {}).get("FullPath")
+
+    written = {_location(rep) for rep in new_reps}
+    for old in superseded:
+        old_key = _location(old)
+        if not all(old_key) or old_key in written:
+            continue
+        try:
+            s3.delete_object(Bucket=old_key[0], Key=old_key[1])
+        except Exception as err:  # noqa: BLE001
+            logger.warning(
+                "Failed to delete old sprite object",
+                extra={"error": str(err), "bucket": old_key[0], "key": old_key[1]},
+            )
+
+    sprite_bytes = sum(s["size"] for s in sheets)
+    logger.info(
+        "Sprites written",
+        extra={
+            "tiles": len(times),
+            "sheets": len(sheets),
+            "spriteBytes": sprite_bytes,
+            "scrubBytes": len(scrub_body),
+            "renderMs": render_ms,
+        },
+    )
+    metrics.add_metric(name="SpriteTiles", unit=MetricUnit.Count, value=len(times))
+    metrics.add_metric(name="SpriteBytes", unit=MetricUnit.Bytes, value=sprite_bytes)
+    metrics.add_metric(
+        name="SpriteRenderTime", unit=MetricUnit.Milliseconds, value=render_ms
+    )
+
+    return {
+        "statusCode": 200,
+        "bucket": out_bucket,
+        "tiles": len(times),
+        "sheets": [s["key"] for s in sheets],
+        "scrub": scrub_key,
+        "index": {"vtt": vtt_key, "json": index_key},
+        "renderMs": render_ms,
+        "updatedAsset": _strip_decimals(updated),
+    }
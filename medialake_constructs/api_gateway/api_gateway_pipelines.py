@@ -278,6 +278,13 @@ class ApiGatewayPipelinesConstruct(Construct):
                 "VECTOR_BUCKET_NAME": props.s3_vector_bucket_name,
                 "INDEX_NAME": props.s3_vector_index_name,
                 "VECTOR_DIMENSION": str(props.s3_vector_dimension),
+                # Passed on to node functions (see step_profiler.should_profile)
+                "STEP_PROFILE_PIPELINES": ",".join(config.step_profile.pipelines),
+                "STEP_PROFILE_SAMPLE_RATE": str(config.step_profile.sample_rate),
+                # Passed on to embedding nodes; required by faiss/innerproduct
+                "EMBEDDING_L2_NORMALIZE": str(
+                    config.opensearch_vector_index.normalize_embeddings
+                ).lower(),
             },
         )
 
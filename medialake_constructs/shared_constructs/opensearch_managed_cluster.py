@@ -1,4 +1,5 @@
 import hashlib
+import json
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -326,6 +327,11 @@ class OpenSearchCluster(Construct):
                         "INDEX_NAMES": ",".join(props.collection_indexes),
                         "REGION": self.region,
                         "SCOPE": "es",
+                        "VECTOR_INDEX_PROFILE": json.dumps(
+                            config.opensearch_vector_index.model_dump(
+                                exclude_none=True
+                            )
+                        ),
                     },
                 ),
             )
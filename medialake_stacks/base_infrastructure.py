@@ -139,6 +139,12 @@ class BaseInfrastructureStack(Stack):
                 destroy_on_delete=True,
                 access_logs=True,
                 access_logs_bucket=self.access_logs_bucket,
+                # content-addressed step payloads are only read while the
+                # pipeline execution runs; step profiles are kept as long
+                lifecycle_rules=[
+                    s3.LifecycleRule(expiration=Duration.days(30), prefix="steps/"),
+                    s3.LifecycleRule(expiration=Duration.days(30), prefix="profiles/"),
+                ],
             ),
         )
 
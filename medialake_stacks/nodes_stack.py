@@ -99,6 +99,14 @@ class NodesStack(cdk.NestedStack):
             code_path=["lambdas", "nodes", "image_thumbnail"],
         )
 
+        self.image_renditions_lambda_deployment = LambdaDeployment(
+            self,
+            "ImageRenditionsLambdaDeployment",
+            destination_bucket=props.iac_bucket.bucket,
+            parent_folder="nodes/utility",
+            code_path=["lambdas", "nodes", "image_renditions"],
+        )
+
         self.video_proxy_lambda_deployment = LambdaDeployment(
             self,
             "VideoProxyAndThumbnailLambdaDeployment",
@@ -229,6 +237,22 @@ class NodesStack(cdk.NestedStack):
             code_path=["lambdas", "nodes", "audio_splitter"],
         )
 
+        self.video_scene_detect_lambda_deployment = LambdaDeployment(
+            self,
+            "VideoSceneDetectLambdaDeployment",
+            destination_bucket=props.iac_bucket.bucket,
+            parent_folder="nodes/utility",
+            code_path=["lambdas", "nodes", "video_scene_detect"],
+        )
+
+        self.video_sprites_lambda_deployment = LambdaDeployment(
+            self,
+            "VideoSpritesLambdaDeployment",
+            destination_bucket=props.iac_bucket.bucket,
+            parent_folder="nodes/utility",
+            code_path=["lambdas", "nodes", "video_sprites"],
+        )
+
         self.s3_vector_store_lambda_deployment = LambdaDeployment(
             self,
             "S3VectorStoreLambdaDeployment",
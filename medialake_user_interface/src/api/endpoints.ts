@@ -63,3 +63,7 @@ export const API_ENDPOINTS = {
       `/users/favorites/${itemType}/${itemId}`,
   },
 };
+
+// Image formats the UI can display beyond JPEG/PNG; lets the search and asset
+// APIs return WebP renditions where they are smaller
+export const IMAGE_FORMATS = "webp";
@@ -1,7 +1,7 @@
 import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { QUERY_KEYS } from "@/api/queryKeys";
 import { apiClient } from "@/api/apiClient";
-import { API_ENDPOINTS } from "@/api/endpoints";
+import { API_ENDPOINTS, IMAGE_FORMATS } from "@/api/endpoints";
 import { logger } from "@/common/helpers/logger";
 import { useErrorModal } from "@/hooks/useErrorModal";
 import { useFeatureFlag } from "@/utils/featureFlags";
@@ -264,6 +264,7 @@ export const useAsset = (inventoryId: string) => {
       try {
         const response = await apiClient.get<AssetResponse>(
           `assets/${inventoryId}`,
+          { params: { imageFormats: IMAGE_FORMATS } },
         );
         return response.data;
       } catch (error) {
@@ -1,6 +1,6 @@
 import { useQuery } from "@tanstack/react-query";
 import { apiClient } from "@/api/apiClient";
-import { API_ENDPOINTS } from "@/api/endpoints";
+import { API_ENDPOINTS, IMAGE_FORMATS } from "@/api/endpoints";
 import { logger } from "@/common/helpers/logger";
 import { useErrorModal } from "@/hooks/useErrorModal";
 import { QUERY_KEYS } from "@/api/queryKeys";
@@ -80,6 +80,7 @@ export const useConnectorAssets = ({
           page,
           pageSize,
           semantic: false,
+          imageFormats: IMAGE_FORMATS,
         };
 
         if (sort) {
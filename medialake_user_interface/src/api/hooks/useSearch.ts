@@ -1,6 +1,6 @@
 import { useQuery, keepPreviousData } from "@tanstack/react-query";
 import { apiClient } from "@/api/apiClient";
-import { API_ENDPOINTS } from "@/api/endpoints";
+import { API_ENDPOINTS, IMAGE_FORMATS } from "@/api/endpoints";
 import { logger } from "@/common/helpers/logger";
 import { useErrorModal } from "@/hooks/useErrorModal";
 import { QUERY_KEYS } from "@/api/queryKeys";
@@ -84,6 +84,7 @@ export const useSearch = (query: string, params?: SearchParams) => {
         queryParams.append("page", page.toString());
         queryParams.append("pageSize", pageSize.toString());
         queryParams.append("semantic", isSemantic.toString());
+        queryParams.append("imageFormats", IMAGE_FORMATS);
 
         // Add facet parameters if they exist
         if (params?.type) queryParams.append("type", params.type);
@@ -2,7 +2,32 @@
 Mapping script – returns the variables consumed by the Jinja request template.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+
+# HLS renditions (height in px, QVBR max bitrate in bit/s), smallest first
+DEFAULT_HLS_LADDER = [
+    {"height": 360, "max_bitrate": 1_000_000},
+    {"height": 540, "max_bitrate": 2_000_000},
+    {"height": 720, "max_bitrate": 3_500_000},
+]
+
+
+def source_height(inp: Dict[str, Any]) -> Optional[int]:
+    """Height of the first video stream, if the metadata extractor ran."""
+    embedded = (inp.get("Metadata") or {}).get("EmbeddedMetadata") or {}
+    try:
+        return int((embedded.get("video") or [{}])[0]["height"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def hls_ladder(event: Dict[str, Any], height: Optional[int]) -> List[Dict[str, int]]:
+    """The configured ladder without rungs taller than the source (keeps one)."""
+    ladder = sorted(
+        event.get("hls_ladder") or DEFAULT_HLS_LADDER, key=lambda r: r["height"]
+    )
+    fitting = [r for r in ladder if not height or r["height"] <= height]
+    return fitting or ladder[:1]
 
 
 def clean_asset_id(asset_str: str) -> str:
@@ -23,6 +48,8 @@ def translate_event_to_request(event: Dict[str, Any]) -> Dict[str, Any]:
         "FrameCount"
     )  # or dig it out of metadata
 
+    segment_seconds = int(event.get("hls_segment_seconds") or 4)
+
     return {
         # ── required by Jinja template ────────────────────────────────
         "input_bucket": loc["Bucket"],
@@ -35,6 +62,11 @@ def translate_event_to_request(event: Dict[str, Any]) -> Dict[str, Any]:
         "thumbnail_width": event.get("thumbnail_width", 300),
         "thumbnail_height": event.get("thumbnail_height", 400),
         "duration_frames": duration_frames,  # may be None
+        # HLS (CMAF) ladder, only rendered when enabled on the node
+        "hls": bool(event.get("hls")),
+        "hls_segment_seconds": segment_seconds,
+        "hls_fragment_seconds": max(1, segment_seconds // 2),  # = GOP length
+        "hls_ladder": hls_ladder(event, source_height(inp)),
         # ── handy for logs / future use ───────────────────────────────
         "inventory_id": inp["InventoryID"],
         "asset_id": clean_asset_id(dsa["ID"]),
@@ -1,3 +1,51 @@
+import math
+
+
+def _shot_segments(asset: dict) -> list:
+    """(start, end) shots stored on the asset by video_scene_detect, if any."""
+    try:
+        segments = (asset.get("Shots") or {}).get("segments") or []
+        return [(float(s["start"]), float(s["end"])) for s in segments]
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return []
+
+
+def _pool_by_shot(vectors: list, shots: list) -> list:
+    """
+    Replace the fixed-length clip vectors with one vector per shot: the
+    L2-normalised mean of the clips whose midpoint falls in the shot, timed
+    from the first to the last of those clips. Other scopes pass through.
+    """
+    groups = {}
+    pooled = []
+    for vec in vectors:
+        start, end = vec["start_offset_sec"], vec["end_offset_sec"]
+        if vec["embedding_scope"] != "clip" or start is None or end is None:
+            pooled.append(vec)
+            continue
+        mid = (start + end) / 2
+        shot = next(
+            (i for i, (a, b) in enumerate(shots) if a <= mid < b), len(shots) - 1
+        )
+        groups.setdefault((vec["embedding_option"], shot), []).append(vec)
+
+    for (_option, _shot), clips in sorted(
+        groups.items(), key=lambda kv: kv[1][0]["start_offset_sec"]
+    ):
+        dims = len(clips[0]["float"])
+        mean = [sum(c["float"][d] for c in clips) / len(clips) for d in range(dims)]
+        norm = math.sqrt(sum(v * v for v in mean)) or 1.0
+        pooled.append(
+            {
+                **clips[0],
+                "float": [v / norm for v in mean],
+                "end_offset_sec": clips[-1]["end_offset_sec"],
+                "pooled_clips": len(clips),
+            }
+        )
+    return pooled
+
+
 def translate_event_to_request(response_body_and_event):
     """
     Build a list of segment embeddings from GET /embed/tasks/{task_id}.
@@ -97,4 +145,9 @@ def translate_event_to_request(response_body_and_event):
     if not vectors:
         raise ValueError("No float vectors on returned segments")
 
+    # ── Shot-based clips (video_scene_detect ran earlier) ──────────
+    shots = _shot_segments(assets[0]) if assets else []
+    if shots:
+        vectors = _pool_by_shot(vectors, shots)
+
     return {"vectors": vectors}
@@ -0,0 +1,171 @@
+"""
+Offline benchmark for the S3 Vectors code paths, run against LocalS3VectorsClient.
+
+    python tools/benchmark_s3_vectors.py --vectors 5000 --put-latency 0.05 \\
+        --max-concurrent 4 --assets 20 --query-latency 0.02
+
+Write throughput drives the real ``store_vectors`` from the s3_vector_store
+node (so its batching, concurrency limit and throttling backoff are what get
+measured) once sequentially and once at the configured concurrency. The
+query part replays the fan-out of ``S3VectorEmbeddingStore.execute_search``:
+one unfiltered query, then one ``inventory_id``-filtered query per asset.
+
+Needs the node's dependencies (numpy, boto3, aws-lambda-powertools) installed.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from s3vectors_local import LocalS3VectorsClient
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUCKET, INDEX = "bench-vectors", "bench-index"
+
+
+def load_vector_store_node():
+    """Import lambdas/nodes/s3_vector_store/index.py with the common layer on the path."""
+    sys.path.insert(0, os.path.join(_ROOT, "lambdas", "common_libraries"))
+    path = os.path.join(_ROOT, "lambdas", "nodes", "s3_vector_store", "index.py")
+    spec = importlib.util.spec_from_file_location("s3_vector_store_node", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_vectors_data(
+    count: int, dim: int, assets: int, rng: np.random.Generator
+) -> List[Dict[str, Any]]:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        {
+            "vector": vectors[i].tolist(),
+            "metadata": {
+                "inventory_id": f"asset-{i % assets}",
+                "content_type": "video",
+                "embedding_scope": "clip",
+                "start_offset_sec": (i // assets) * 6,
+                "end_offset_sec": (i // assets) * 6 + 6,
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {"p50_ms": round(pick(0.5), 2), "p95_ms": round(pick(0.95), 2)}
+
+
+def bench_writes(node, vectors_data, dim: int, args) -> Dict[str, Any]:
+    report = {}
+    for label, concurrency in (("sequential", 1), ("concurrent", args.concurrency)):
+        client = LocalS3VectorsClient(
+            latency={"put_vectors": args.put_latency},
+            max_concurrent_requests=args.max_concurrent,
+            throttle_probability=args.throttle_probability,
+            seed=args.seed,
+        )
+        client.create_vector_bucket(vectorBucketName=BUCKET)
+        client.create_index(
+            vectorBucketName=BUCKET,
+            indexName=INDEX,
+            dimension=dim,
+            distanceMetric="cosine",
+        )
+        node.PUT_VECTORS_MAX_CONCURRENCY = concurrency
+        start = time.perf_counter()
+        node.store_vectors(client, BUCKET, INDEX, vectors_data)
+        elapsed = time.perf_counter() - start
+        report[label] = {
+            "concurrency": concurrency,
+            "seconds": round(elapsed, 3),
+            "vectors_per_second": round(len(vectors_data) / elapsed, 1),
+            "put_calls": client.calls.get("put_vectors", 0),
+            "throttled": client.throttled,
+        }
+    report["client"] = client  # populated index, reused by the query benchmark
+    return report
+
+
+def bench_queries(client: LocalS3VectorsClient, dim: int, args, rng) -> Dict[str, Any]:
+    client.latency = {"query_vectors": args.query_latency}
+    client.max_concurrent_requests = None
+    client.throttle_probability = 0.0
+
+    unfiltered, filtered, fan_out = [], [], []
+    for _ in range(args.queries):
+        query = rng.standard_normal(dim, dtype=np.float32).tolist()
+        total_start = time.perf_counter()
+
+        start = time.perf_counter()
+        resp = client.query_vectors(
+            vectorBucketName=BUCKET,
+            indexName=INDEX,
+            queryVector={"float32": query},
+            topK=30,
+            returnMetadata=True,
+        )
+        unfiltered.append((time.perf_counter() - start) * 1000)
+
+        for inventory_id in {v["metadata"]["inventory_id"] for v in resp["vectors"]}:
+            start = time.perf_counter()
+            client.query_vectors(
+                vectorBucketName=BUCKET,
+                indexName=INDEX,
+                queryVector={"float32": query},
+                topK=30,
+                filter={"inventory_id": {"$eq": inventory_id}},
+                returnMetadata=True,
+                returnDistance=True,
+            )
+            filtered.append((time.perf_counter() - start) * 1000)
+        fan_out.append((time.perf_counter() - total_start) * 1000)
+
+    return {
+        "queries": args.queries,
+        "unfiltered": _percentiles(unfiltered),
+        "filtered": _percentiles(filtered),
+        "calls_per_search": round(1 + len(filtered) / args.queries, 1),
+        "search_total": _percentiles(fan_out),
+        "search_mean_ms": round(statistics.mean(fan_out), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--put-latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrent", type=int, default=None)
+    parser.add_argument("--throttle-probability", type=float, default=0.0)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--query-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    node = load_vector_store_node()
+    vectors_data = make_vectors_data(args.vectors, args.dimension, args.assets, rng)
+
+    writes = bench_writes(node, vectors_data, args.dimension, args)
+    client = writes.pop("client")
+    queries = bench_queries(client, args.dimension, args, rng)
+    print(json.dumps({"writes": writes, "queries": queries}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
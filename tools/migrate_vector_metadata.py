@@ -0,0 +1,219 @@
+"""
+Move an existing S3 Vectors index onto the vector metadata schema.
+
+S3 Vectors fixes an index's non-filterable metadata keys at creation, so an
+index created before the schema keeps every key filterable until it is
+rebuilt. This tool rebuilds it under the same name:
+
+    python tools/migrate_vector_metadata.py --bucket media-vectors \\
+        --index media-vectors --benchmark-queries 50
+
+Steps:
+    1. create ``<index>-migrating`` with the schema and copy every vector
+       (data + metadata restricted to the schema) into it;
+    2. benchmark filtered queries (``inventory_id`` filter, as search uses)
+       on the old index and on the copy;
+    3. copy vectors written meanwhile, delete the old index, re-create it
+       with the schema and copy everything back;
+    4. delete ``<index>-migrating``.
+
+Between the delete and the re-create the vector store node may re-create the
+index itself – it uses the same schema, so the tool just continues. Vectors
+deleted from the old index during the copy reappear; run it while asset
+deletion is quiet. Requires boto3 with the ``s3vectors`` client and numpy.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import boto3
+import numpy as np
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "lambdas",
+        "common_libraries",
+    ),
+)
+from vector_metadata_schema import (  # noqa: E402
+    conform_metadata,
+    index_matches_schema,
+    metadata_configuration,
+)
+
+PUT_BATCH = 500
+_THROTTLE_CODES = {"TooManyRequestsException", "ThrottlingException", "SlowDown"}
+
+
+def iter_vectors(client, bucket: str, index: str) -> Iterator[Dict[str, Any]]:
+    token: Optional[str] = None
+    while True:
+        params = {
+            "vectorBucketName": bucket,
+            "indexName": index,
+            "maxResults": 500,
+            "returnData": True,
+            "returnMetadata": True,
+        }
+        if token:
+            params["nextToken"] = token
+        response = client.list_vectors(**params)
+        yield from response.get("vectors", [])
+        token = response.get("nextToken")
+        if not token:
+            return
+
+
+def _put(client, bucket: str, index: str, batch: List[Dict[str, Any]]) -> None:
+    for attempt in range(8):
+        try:
+            client.put_vectors(vectorBucketName=bucket, indexName=index, vectors=batch)
+            return
+        except client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in _THROTTLE_CODES:
+                raise
+            time.sleep(random.uniform(0, min(0.2 * 2**attempt, 10)))
+    raise RuntimeError(f"put_vectors to {index} kept being throttled")
+
+
+def copy_vectors(
+    client, bucket: str, source: str, target: str, skip: Optional[Set[str]] = None
+) -> Set[str]:
+    """Copy vectors (metadata conformed to the schema); returns the copied keys."""
+    copied: Set[str] = set()
+    batch: List[Dict[str, Any]] = []
+    for vector in iter_vectors(client, bucket, source):
+        if skip and vector["key"] in skip:
+            continue
+        metadata, _ = conform_metadata(vector.get("metadata") or {})
+        batch.append(
+            {"key": vector["key"], "data": vector["data"], "metadata": metadata}
+        )
+        if len(batch) == PUT_BATCH:
+            _put(client, bucket, target, batch)
+            copied.update(v["key"] for v in batch)
+            batch = []
+            print(f"  {source} -> {target}: {len(copied)} vectors", file=sys.stderr)
+    if batch:
+        _put(client, bucket, target, batch)
+        copied.update(v["key"] for v in batch)
+    return copied
+
+
+def benchmark_filtered_queries(
+    client, bucket: str, index: str, queries: int, seed: int = 42
+) -> Dict[str, Any]:
+    """p50/p95 latency of inventory_id-filtered top-30 queries on *index*."""
+    samples = []
+    for vector in iter_vectors(client, bucket, index):
+        if (vector.get("metadata") or {}).get("inventory_id"):
+            samples.append(vector)
+        if len(samples) >= 10 * queries:
+            break
+    if not samples:
+        return {"index": index, "queries": 0}
+
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(queries):
+        probe = rng.choice(samples)
+        start = time.perf_counter()
+        client.query_vectors(
+            vectorBucketName=bucket,
+            indexName=index,
+            queryVector={"float32": probe["data"]["float32"]},
+            topK=30,
+            filter={"inventory_id": {"$eq": probe["metadata"]["inventory_id"]}},
+            returnMetadata=True,
+            returnDistance=True,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "index": index,
+        "queries": queries,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+def _create_index(client, bucket: str, index: str, source: Dict[str, Any]) -> None:
+    try:
+        client.create_index(
+            vectorBucketName=bucket,
+            indexName=index,
+            dimension=source["dimension"],
+            dataType=source.get("dataType", "float32"),
+            distanceMetric=source.get("distanceMetric", "cosine"),
+            metadataConfiguration=metadata_configuration(),
+        )
+    except client.exceptions.ConflictException:
+        existing = client.get_index(vectorBucketName=bucket, indexName=index)["index"]
+        if not index_matches_schema(existing):
+            raise RuntimeError(f"{index} was re-created without the schema")
+        print(f"{index} was re-created concurrently with the schema", file=sys.stderr)
+
+
+def _wait_deleted(client, bucket: str, index: str, timeout: int = 120) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            client.get_index(vectorBucketName=bucket, indexName=index)
+        except client.exceptions.NotFoundException:
+            return
+        time.sleep(2)
+    raise TimeoutError(f"{index} still exists after {timeout}s")
+
+
+def migrate(client, bucket: str, index: str, benchmark_queries: int = 0) -> dict:
+    source = client.get_index(vectorBucketName=bucket, indexName=index)["index"]
+    if index_matches_schema(source):
+        return {"index": index, "migrated": False, "reason": "already on schema"}
+
+    staging = f"{index}-migrating"
+    _create_index(client, bucket, staging, source)
+    copied = copy_vectors(client, bucket, index, staging)
+    print(f"Copied {len(copied)} vectors to {staging}", file=sys.stderr)
+
+    report: Dict[str, Any] = {"index": index, "vectors": len(copied)}
+    if benchmark_queries:
+        report["filtered_query_before"] = benchmark_filtered_queries(
+            client, bucket, index, benchmark_queries
+        )
+        report["filtered_query_after"] = benchmark_filtered_queries(
+            client, bucket, staging, benchmark_queries
+        )
+
+    # Catch up on vectors written while copying, then swap the index out
+    copied |= copy_vectors(client, bucket, index, staging, skip=copied)
+    client.delete_index(vectorBucketName=bucket, indexName=index)
+    _wait_deleted(client, bucket, index)
+    _create_index(client, bucket, index, source)
+    restored = copy_vectors(client, bucket, staging, index)
+    client.delete_index(vectorBucketName=bucket, indexName=staging)
+
+    report.update({"migrated": True, "restored": len(restored)})
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--index", required=True)
+    parser.add_argument("--region", default=boto3.Session().region_name)
+    parser.add_argument("--benchmark-queries", type=int, default=0)
+    args = parser.parse_args()
+
+    client = boto3.client("s3vectors", region_name=args.region)
+    report = migrate(client, args.bucket, args.index, args.benchmark_queries)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+"""
+In-process stand-in for the ``s3vectors`` boto3 client.
+
+Implements the part of the client surface MediaLake uses – vector bucket and
+index create/get/delete (including ``metadataConfiguration``), ``put_vectors``,
+``get_vectors``, ``query_vectors`` (with metadata ``filter``), ``list_vectors``
+and ``delete_vectors`` – on top of a float32 NumPy matrix per index with
+brute-force cosine / euclidean top-K.
+
+Errors are raised as botocore ``ClientError`` subclasses with the service's
+error codes, reachable as ``client.exceptions.<Name>`` like on a real client,
+so the retry / NotFound handling in the Lambdas behaves the same. Latency and
+throttling can be injected to exercise backoff and concurrency limits:
+
+    client = LocalS3VectorsClient(
+        latency={"put_vectors": 0.05, "query_vectors": 0.02},
+        max_concurrent_requests=4,      # more in flight -> TooManyRequestsException
+        throttle_probability=0.01,      # plus random throttling
+    )
+
+Usable wherever the Lambdas call ``boto3.client("s3vectors")`` – patch the
+factory (``get_s3_vector_client`` / ``_get_s3_vector_client``) to return it.
+Requires ``numpy`` and ``botocore``.
+"""
+
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+# Service limits the Lambdas are written against
+MAX_PUT_BATCH = 500
+MAX_TOP_K = 30
+MAX_LIST_RESULTS = 1000
+DISTANCE_METRICS = ("cosine", "euclidean")
+
+
+class _ServiceError(ClientError):
+    code = "ServiceError"
+    status = 400
+
+    def __init__(self, message: str, operation: str):
+        super().__init__(
+            {
+                "Error": {"Code": self.code, "Message": message},
+                "ResponseMetadata": {"HTTPStatusCode": self.status},
+            },
+            operation,
+        )
+
+
+class NotFoundException(_ServiceError):
+    code, status = "NotFoundException", 404
+
+
+class ConflictException(_ServiceError):
+    code, status = "ConflictException", 409
+
+
+class ValidationException(_ServiceError):
+    code, status = "ValidationException", 400
+
+
+class TooManyRequestsException(_ServiceError):
+    code, status = "TooManyRequestsException", 429
+
+
+class ServiceUnavailableException(_ServiceError):
+    code, status = "ServiceUnavailableException", 503
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Metadata filters
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda v, x: v == x,
+    "$ne": lambda v, x: v != x,
+    "$gt": lambda v, x: v is not None and v > x,
+    "$gte": lambda v, x: v is not None and v >= x,
+    "$lt": lambda v, x: v is not None and v < x,
+    "$lte": lambda v, x: v is not None and v <= x,
+    "$in": lambda v, x: v in x,
+    "$nin": lambda v, x: v not in x,
+}
+
+
+def _field_matches(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    for op, operand in condition.items():
+        if op == "$exists":
+            if (value is not None) != bool(operand):
+                return False
+            continue
+        if op not in _COMPARATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        # Array-valued metadata matches when any element does
+        if isinstance(value, list) and op in ("$eq", "$in"):
+            if not any(_COMPARATORS[op](v, operand) for v in value):
+                return False
+        elif not _COMPARATORS[op](value, operand):
+            return False
+    return True
+
+
+def _filter_keys(flt: Dict[str, Any]) -> set:
+    keys = set()
+    for key, condition in flt.items():
+        if key in ("$and", "$or"):
+            for sub in condition:
+                keys |= _filter_keys(sub)
+        else:
+            keys.add(key)
+    return keys
+
+
+def metadata_matches(metadata: Dict[str, Any], flt: Dict[str, Any]) -> bool:
+    """Evaluate an S3 Vectors metadata filter against one vector's metadata."""
+    for key, condition in flt.items():
+        if key == "$and":
+            if not all(metadata_matches(metadata, f) for f in condition):
+                return False
+        elif key == "$or":
+            if not any(metadata_matches(metadata, f) for f in condition):
+                return False
+        elif not _field_matches(metadata.get(key), condition):
+            return False
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+class _VectorIndex:
+    """Dense float32 matrix with key -> row mapping; deletes swap in the last row."""
+
+    def __init__(self, name: str, dimension: int, distance_metric: str, **config):
+        self.name = name
+        self.dimension = dimension
+        self.distance_metric = distance_metric
+        self.config = config
+        self.non_filterable = set(
+            (config.get("metadataConfiguration") or {}).get(
+                "nonFilterableMetadataKeys", ()
+            )
+        )
+        self.creation_time = time.time()
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.keys: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.rows: Dict[str, int] = {}
+        self.size = 0
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        if needed <= len(self.matrix):
+            return
+        capacity = max(needed, 2 * len(self.matrix), 1024)
+        matrix = np.empty((capacity, self.dimension), dtype=np.float32)
+        norms = np.empty(capacity, dtype=np.float32)
+        matrix[: self.size] = self.matrix[: self.size]
+        norms[: self.size] = self.norms[: self.size]
+        self.matrix, self.norms = matrix, norms
+
+    def put(self, keys: List[str], data: np.ndarray, metadata: List[Dict]) -> None:
+        self._reserve(len(keys))
+        norms = np.linalg.norm(data, axis=1)
+        for key, vector, norm, meta in zip(keys, data, norms, metadata):
+            row = self.rows.get(key)
+            if row is None:
+                row = self.size
+                self.rows[key] = row
+                self.keys.append(key)
+                self.metadata.append(meta)
+                self.size += 1
+            else:
+                self.metadata[row] = meta
+            self.matrix[row] = vector
+            self.norms[row] = norm
+
+    def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            row = self.rows.pop(key, None)
+            if row is None:
+                continue
+            last = self.size - 1
+            if row != last:
+                moved = self.keys[last]
+                self.matrix[row] = self.matrix[last]
+                self.norms[row] = self.norms[last]
+                self.keys[row] = moved
+                self.metadata[row] = self.metadata[last]
+                self.rows[moved] = row
+            self.keys.pop()
+            self.metadata.pop()
+            self.size = last
+
+    def distances(self, query: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        matrix = self.matrix[: self.size] if rows is None else self.matrix[rows]
+        if self.distance_metric == "cosine":
+            norms = self.norms[: self.size] if rows is None else self.norms[rows]
+            denom = norms * max(float(np.linalg.norm(query)), 1e-12)
+            return 1.0 - (matrix @ query) / np.maximum(denom, 1e-12)
+        return np.linalg.norm(matrix - query, axis=1)
+
+    def describe(self, bucket: str) -> Dict[str, Any]:
+        return {
+            "vectorBucketName": bucket,
+            "indexName": self.name,
+            "indexArn": f"arn:aws:s3vectors:local:000000000000:bucket/{bucket}/index/{self.name}",
+            "creationTime": self.creation_time,
+            "dataType": "float32",
+            "dimension": self.dimension,
+            "distanceMetric": self.distance_metric,
+            **self.config,
+        }
+
+
+class LocalS3VectorsClient:
+    """Thread-safe in-memory implementation of the ``s3vectors`` client calls we use."""
+
+    def __init__(
+        self,
+        latency: Union[float, Dict[str, float], None] = None,
+        throttle_probability: float = 0.0,
+        max_concurrent_requests: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency or 0.0
+        self.throttle_probability = throttle_probability
+        self.max_concurrent_requests = max_concurrent_requests
+        self.exceptions = SimpleNamespace(
+            ClientError=ClientError,
+            NotFoundException=NotFoundException,
+            ConflictException=ConflictException,
+            ValidationException=ValidationException,
+            TooManyRequestsException=TooManyRequestsException,
+            ServiceUnavailableException=ServiceUnavailableException,
+        )
+        self.calls: Dict[str, int] = {}
+        self.throttled = 0
+        self._buckets: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, Dict[str, _VectorIndex]] = {}
+        self._lock = threading.RLock()
+        self._in_flight = 0
+        self._random = random.Random(seed)
+
+    # ── request plumbing ────────────────────────────────────────────────────
+    def _enter(self, operation: str) -> None:
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            over_limit = (
+                self.max_concurrent_requests is not None
+                and self._in_flight >= self.max_concurrent_requests
+            )
+            if over_limit or (
+                self.throttle_probability
+                and self._random.random() < self.throttle_probability
+            ):
+                self.throttled += 1
+                raise TooManyRequestsException("Rate exceeded", operation)
+            self._in_flight += 1
+        delay = (
+            self.latency.get(operation, 0.0)
+            if isinstance(self.latency, dict)
+            else self.latency
+        )
+        if delay:
+            time.sleep(delay)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, operation: str, fn: Callable[[], Any]) -> Any:
+        self._enter(operation)
+        try:
+            with self._lock:
+                return fn()
+        finally:
+            self._exit()
+
+    def _index(self, operation: str, bucket: str, index: str) -> _VectorIndex:
+        if bucket not in self._buckets:
+            raise NotFoundException(f"Vector bucket {bucket} not found", operation)
+        found = self._indexes[bucket].get(index)
+        if found is None:
+            raise NotFoundException(f"Index {index} not found", operation)
+        return found
+
+    # ── buckets ─────────────────────────────────────────────────────────────
+    def create_vector_bucket(self, vectorBucketName: str, **kwargs) -> Dict[str, Any]:
+        def run():
+            if vectorBucketName in self._buckets:
+                raise ConflictException(
+                    f"Vector bucket {vectorBucketName} already exists",
+                    "CreateVectorBucket",
+                )
+            self._buckets[vectorBucketName] = {
+                "vectorBucketName": vectorBucketName,
+                "creationTime": time.time(),
+                **kwargs,
+            }
+            self._indexes[vectorBucketName] = {}
+            return {}
+
+        return self._call("create_vector_bucket", run)
+
+    def get_vector_bucket(self, vectorBucketName: str) -> Dict[str, Any]:
+        def run():
+            if vectorBucketName not in self._buckets:
+                raise NotFoundException(
+                    f"Vector bucket {vectorBucketName} not found", "GetVectorBucket"
+                )
+            return {"vectorBucket": dict(self._buckets[vectorBucketName])}
+
+        return self._call("get_vector_bucket", run)
+
+    # ── indexes ─────────────────────────────────────────────────────────────
+    def create_index(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        dimension: int,
+        distanceMetric: str,
+        dataType: str = "float32",
+        **config,
+    ) -> Dict[str, Any]:
+        def run():
+            if vectorBucketName not in self._buckets:
+                raise NotFoundException(
+                    f"Vector bucket {vectorBucketName} not found", "CreateIndex"
+                )
+            if indexName in self._indexes[vectorBucketName]:
+                raise ConflictException(
+                    f"Index {indexName} already exists", "CreateIndex"
+                )
+            if dataType != "float32" or distanceMetric not in DISTANCE_METRICS:
+                raise ValidationException(
+                    f"Unsupported dataType/distanceMetric {dataType}/{distanceMetric}",
+                    "CreateIndex",
+                )
+            self._indexes[vectorBucketName][indexName] = _VectorIndex(
+                indexName, int(dimension), distanceMetric, **config
+            )
+            return {}
+
+        return self._call("create_index", run)
+
+    def get_index(self, vectorBucketName: str, indexName: str) -> Dict[str, Any]:
+        def run():
+            index = self._index("GetIndex", vectorBucketName, indexName)
+            return {"index": index.describe(vectorBucketName)}
+
+        return self._call("get_index", run)
+
+    def delete_index(self, vectorBucketName: str, indexName: str) -> Dict[str, Any]:
+        def run():
+            self._index("DeleteIndex", vectorBucketName, indexName)
+            del self._indexes[vectorBucketName][indexName]
+            return {}
+
+        return self._call("delete_index", run)
+
+    # ── vectors ─────────────────────────────────────────────────────────────
+    def put_vectors(
+        self, vectorBucketName: str, indexName: str, vectors: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        def run():
+            index = self._index("PutVectors", vectorBucketName, indexName)
+            if not vectors or len(vectors) > MAX_PUT_BATCH:
+                raise ValidationException(
+                    f"put_vectors takes 1-{MAX_PUT_BATCH} vectors, got {len(vectors)}",
+                    "PutVectors",
+                )
+            data = np.asarray(
+                [v["data"]["float32"] for v in vectors], dtype=np.float32
+            )
+            if data.ndim != 2 or data.shape[1] != index.dimension:
+                raise ValidationException(
+                    f"Vectors must have dimension {index.dimension}", "PutVectors"
+                )
+            if not np.isfinite(data).all():
+                raise ValidationException("Vectors contain NaN/Inf", "PutVectors")
+            index.put(
+                [v["key"] for v in vectors],
+                data,
+                [dict(v.get("metadata") or {}) for v in vectors],
+            )
+            return {}
+
+        return self._call("put_vectors", run)
+
+    def get_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        keys: List[str],
+        returnData: bool = False,
+        returnMetadata: bool = False,
+    ) -> Dict[str, Any]:
+        def run():
+            index = self._index("GetVectors", vectorBucketName, indexName)
+            found = []
+            for key in keys:
+                row = index.rows.get(key)
+                if row is not None:
+                    found.append(self._vector_out(index, row, returnData, returnMetadata))
+            return {"vectors": found}
+
+        return self._call("get_vectors", run)
+
+    def query_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        queryVector: Dict[str, List[float]],
+        topK: int,
+        filter: Optional[Dict[str, Any]] = None,
+        returnMetadata: bool = False,
+        returnDistance: bool = False,
+    ) -> Dict[str, Any]:
+        def run():
+            index = self._index("QueryVectors", vectorBucketName, indexName)
+            if not 1 <= topK <= MAX_TOP_K:
+                raise ValidationException(
+                    f"topK must be between 1 and {MAX_TOP_K}", "QueryVectors"
+                )
+            query = np.asarray(queryVector["float32"], dtype=np.float32)
+            if query.shape != (index.dimension,):
+                raise ValidationException(
+                    f"Query vector must have dimension {index.dimension}",
+                    "QueryVectors",
+                )
+
+            rows = None
+            if filter:
+                stored_only = _filter_keys(filter) & index.non_filterable
+                if stored_only:
+                    raise ValidationException(
+                        f"Non-filterable metadata in filter: {sorted(stored_only)}",
+                        "QueryVectors",
+                    )
+                rows = np.fromiter(
+                    (
+                        i
+                        for i in range(index.size)
+                        if metadata_matches(index.metadata[i], filter)
+                    ),
+                    dtype=np.int64,
+                )
+                if rows.size == 0:
+                    return {"vectors": [], "distanceMetric": index.distance_metric}
+            if index.size == 0:
+                return {"vectors": [], "distanceMetric": index.distance_metric}
+
+            dist = index.distances(query, rows)
+            k = min(topK, len(dist))
+            top = np.argpartition(dist, k - 1)[:k]
+            top = top[np.argsort(dist[top], kind="stable")]
+
+            results = []
+            for pos in top:
+                row = int(pos if rows is None else rows[pos])
+                out = self._vector_out(index, row, False, returnMetadata)
+                if returnDistance:
+                    out["distance"] = float(dist[pos])
+                results.append(out)
+            return {"vectors": results, "distanceMetric": index.distance_metric}
+
+        return self._call("query_vectors", run)
+
+    def list_vectors(
+        self,
+        vectorBucketName: str,
+        indexName: str,
+        maxResults: int = 500,
+        nextToken: Optional[str] = None,
+        returnData: bool = False,
+        returnMetadata: bool = False,
+        segmentCount: Optional[int] = None,
+        segmentIndex: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        def run():
+            index = self._index("ListVectors", vectorBucketName, indexName)
+            keys = sorted(index.rows)
+            if segmentCount:
+                keys = keys[segmentIndex::segmentCount]
+            start = int(nextToken) if nextToken else 0
+            page = keys[start : start + min(maxResults, MAX_LIST_RESULTS)]
+            response: Dict[str, Any] = {
+                "vectors": [
+                    self._vector_out(
+                        index, index.rows[key], returnData, returnMetadata
+                    )
+                    for key in page
+                ]
+            }
+            if start + len(page) < len(keys):
+                response["nextToken"] = str(start + len(page))
+            return response
+
+        return self._call("list_vectors", run)
+
+    def delete_vectors(
+        self, vectorBucketName: str, indexName: str, keys: List[str]
+    ) -> Dict[str, Any]:
+        def run():
+            self._index("DeleteVectors", vectorBucketName, indexName).delete(keys)
+            return {}
+
+        return self._call("delete_vectors", run)
+
+    @staticmethod
+    def _vector_out(
+        index: _VectorIndex, row: int, data: bool, metadata: bool
+    ) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"key": index.keys[row]}
+        if data:
+            out["data"] = {"float32": index.matrix[row].tolist()}
+        if metadata:
+            out["metadata"] = dict(index.metadata[row])
+        return out